@@ -1,15 +1,86 @@
 #!/usr/bin/env python3
+import hashlib
+import json
 import os
 import platform
 import re
+import selectors
 import shutil
 import subprocess
-import tempfile
+import time
 from abc import ABC, abstractmethod
 from typing import Optional
 
 
+PROBE_WINDOW_SECONDS = 0.55
+PROBE_CONCURRENCY = 6
+
+
+def default_source_cache_path() -> str:
+    configured = (os.environ.get("VOICE_CLAUDE_SOURCE_CACHE_FILE") or "").strip()
+    if configured:
+        return configured
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "voice-bridge", "capture-sources.json")
+
+
+def sources_fingerprint(sources: list[str]) -> str:
+    return hashlib.sha1("\n".join(sources).encode("utf-8")).hexdigest()
+
+
+class CaptureSourceCache:
+    """On-disk record of the last source that produced audio, per backend and sample rate.
+
+    An entry only counts while the host's source list still hashes to the stored fingerprint.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    @staticmethod
+    def _key(backend_name: str, sample_rate: int) -> str:
+        return f"{backend_name}:{sample_rate}"
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as cache_file:
+                data = json.load(cache_file)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _write(self, data: dict) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as cache_file:
+                json.dump(data, cache_file, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+    def lookup(self, backend_name: str, sample_rate: int, fingerprint: str) -> Optional[str]:
+        entry = self._read().get(self._key(backend_name, sample_rate))
+        if not isinstance(entry, dict) or entry.get("fingerprint") != fingerprint:
+            return None
+        source = entry.get("source")
+        return source if isinstance(source, str) and source else None
+
+    def store(self, backend_name: str, sample_rate: int, fingerprint: str, source: str) -> None:
+        data = self._read()
+        data[self._key(backend_name, sample_rate)] = {"fingerprint": fingerprint, "source": source}
+        self._write(data)
+
+    def forget(self, backend_name: str, sample_rate: int) -> None:
+        data = self._read()
+        if data.pop(self._key(backend_name, sample_rate), None) is not None:
+            self._write(data)
+
+
 class AudioCaptureBackend(ABC):
+    def __init__(self, source_cache: Optional[CaptureSourceCache] = None):
+        self.source_cache = source_cache
+
     @property
     @abstractmethod
     def backend_name(self) -> str:
@@ -44,42 +115,119 @@ class AudioCaptureBackend(ABC):
         if not candidates:
             return self.default_source()
 
-        for source in candidates:
-            if self.source_supports_capture(source=source, sample_rate=sample_rate):
-                return source
-        return candidates[0]
+        fingerprint = sources_fingerprint(candidates)
+        if self.source_cache is not None:
+            cached = self.source_cache.lookup(self.backend_name, sample_rate, fingerprint)
+            if cached in candidates:
+                return cached
+
+        source = self.probe_sources(candidates, sample_rate=sample_rate)
+        if source is None:
+            return candidates[0]
+        if self.source_cache is not None:
+            self.source_cache.store(self.backend_name, sample_rate, fingerprint, source)
+        return source
+
+    def forget_cached_source(self, sample_rate: int) -> None:
+        if self.source_cache is not None:
+            self.source_cache.forget(self.backend_name, sample_rate)
 
     def source_supports_capture(self, source: str, sample_rate: int) -> bool:
-        fd, probe_path = tempfile.mkstemp(prefix="voice-claude-probe-", suffix=".raw")
-        os.close(fd)
-        try:
-            with open(probe_path, "wb") as output_file:
-                proc = subprocess.Popen(
-                    self.build_record_command(source=source, sample_rate=sample_rate),
-                    stdout=output_file,
-                    stderr=subprocess.DEVNULL,
-                    text=False,
-                )
-            try:
-                proc.wait(timeout=0.55)
-            except subprocess.TimeoutExpired:
+        return self.probe_sources([source], sample_rate=sample_rate) == source
+
+    def probe_sources(
+        self,
+        sources: list[str],
+        sample_rate: int,
+        window: float = PROBE_WINDOW_SECONDS,
+        concurrency: int = PROBE_CONCURRENCY,
+    ) -> Optional[str]:
+        """Return the highest-priority source whose recorder produces bytes within `window`.
+
+        Up to `concurrency` recorders run at once. A probe succeeds on its first byte and fails
+        on EOF or when its window expires, so the call returns as soon as every source ahead
+        of a successful one has been ruled out.
+        """
+        results: dict[int, bool] = {}
+        running: dict[int, tuple[subprocess.Popen, float]] = {}
+        launched: list[subprocess.Popen] = []
+        selector = selectors.DefaultSelector()
+        next_index = 0
+
+        def finish(index: int, captured: bool) -> None:
+            results[index] = captured
+            entry = running.pop(index, None)
+            if entry is None:
+                return
+            proc = entry[0]
+            if proc.stdout is not None:
+                try:
+                    selector.unregister(proc.stdout)
+                except (KeyError, ValueError):
+                    pass
+            if proc.poll() is None:
                 proc.terminate()
+
+        try:
+            while True:
+                for index in range(len(sources)):
+                    captured = results.get(index)
+                    if captured is None:
+                        break
+                    if captured:
+                        return sources[index]
+                else:
+                    return None
+
+                while next_index < len(sources) and len(running) < max(1, concurrency):
+                    index = next_index
+                    next_index += 1
+                    try:
+                        proc = subprocess.Popen(
+                            self.build_record_command(source=sources[index], sample_rate=sample_rate),
+                            stdout=subprocess.PIPE,
+                            stderr=subprocess.DEVNULL,
+                            bufsize=0,
+                            text=False,
+                        )
+                    except OSError:
+                        results[index] = False
+                        continue
+                    launched.append(proc)
+                    os.set_blocking(proc.stdout.fileno(), False)
+                    selector.register(proc.stdout, selectors.EVENT_READ, index)
+                    running[index] = (proc, time.monotonic() + window)
+
+                if not running:
+                    continue
+                timeout = max(0.0, min(deadline for _, deadline in running.values()) - time.monotonic())
+                for key, _ in selector.select(timeout=timeout):
+                    index = key.data
+                    try:
+                        chunk = os.read(key.fd, 4096)
+                    except BlockingIOError:
+                        continue
+                    except OSError:
+                        chunk = b""
+                    finish(index, bool(chunk))
+
+                now = time.monotonic()
+                for index, (_, deadline) in list(running.items()):
+                    if now >= deadline:
+                        finish(index, False)
+        finally:
+            selector.close()
+            for proc in launched:
+                if proc.poll() is None:
+                    proc.terminate()
+            for proc in launched:
                 try:
                     proc.wait(timeout=0.5)
                 except subprocess.TimeoutExpired:
                     proc.kill()
-            try:
-                return os.getsize(probe_path) > 0
-            except (OSError, AttributeError): # Handle os.path.getsize vs os.getsize
-                try:
-                    return os.path.getsize(probe_path) > 0
-                except OSError:
-                    return False
-        finally:
-            try:
-                os.remove(probe_path)
-            except OSError:
-                pass
+                    proc.wait()
+                if proc.stdout is not None:
+                    proc.stdout.close()
 
 
 class PulseAudioBackend(AudioCaptureBackend):
@@ -246,12 +394,15 @@ class MacOSAvFoundationBackend(AudioCaptureBackend):
         return sources
 
 
-def select_audio_backend(system_name: Optional[str] = None) -> AudioCaptureBackend:
+def select_audio_backend(
+    system_name: Optional[str] = None,
+    source_cache: Optional[CaptureSourceCache] = None,
+) -> AudioCaptureBackend:
     selected_system = (system_name or platform.system() or "").strip().lower()
     if selected_system == "linux":
-        return PulseAudioBackend()
+        return PulseAudioBackend(source_cache=source_cache)
     if selected_system == "darwin":
-        return MacOSAvFoundationBackend()
+        return MacOSAvFoundationBackend(source_cache=source_cache)
     raise RuntimeError(
         f"unsupported platform '{selected_system or 'unknown'}' for voice recording backend."
     )
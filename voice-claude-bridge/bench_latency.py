@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+import argparse
+import bisect
+import fcntl
+import json
+import os
+import pty
+import shlex
+import signal
+import stat
+import struct
+import subprocess
+import sys
+import tempfile
+import termios
+import threading
+import time
+import wave
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+
+MODULE_DIR = Path(__file__).resolve().parent
+HOTKEY = b"\x0b"
+STAGES = ("start", "stop", "stt", "inject", "total")
+MARKER_READY = b"stt model ready"
+MARKER_LOAD_FAILED = b"stt model preload failed"
+MARKER_RECORDING = b"recording started"
+MARKER_TRANSCRIBING = b"transcribing..."
+MARKER_UPDATED = b"transcript updated"
+MARKER_NO_SPEECH = b"no speech detected"
+MARKER_FAILED = b"transcribe failed"
+MARKER_AGENT = b"<<agent-received>>"
+DEFAULT_TIMEOUT = 120.0
+
+FAKE_PAREC = '''#!{python}
+import signal, sys, time
+rate = int(sys.argv[sys.argv.index("--rate") + 1]) if "--rate" in sys.argv else 16000
+data = open({fixture!r}, "rb").read() or b"\\x00\\x00"
+chunk = max(2, (rate // 50) * 2)
+signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+out = sys.stdout.buffer
+start = time.monotonic()
+sent = 0
+while True:
+    piece = data[sent % len(data):][:chunk]
+    out.write(piece)
+    out.flush()
+    sent += len(piece)
+    delay = start + sent / (2.0 * rate) - time.monotonic()
+    if delay > 0:
+        time.sleep(delay)
+'''
+
+FAKE_AGENT = '''#!{python}
+import os, tty
+if os.isatty(0):
+    tty.setraw(0)
+while True:
+    data = os.read(0, 65536)
+    if not data:
+        break
+    os.write(1, b"<<agent-received>>\\r\\n")
+'''
+
+BRIDGE_RUNNER = '''import sys, time
+sys.path.insert(0, {module_dir!r})
+import cli
+fake_text = {fake_text!r}
+if fake_text is not None:
+    def transcribe(self, audio, language, model=None):
+        time.sleep({fake_delay!r})
+        return fake_text
+    cli.SttEngine.transcribe = transcribe
+sys.argv = ["cli.py"] + {argv!r}
+sys.exit(cli.main())
+'''
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile; `q` is in [0, 100]."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    rank = max(1, int(np.ceil(q / 100.0 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def synthesize_fixture(seconds: float, sample_rate: int, seed: int = 7) -> bytes:
+    """Deterministic voiced-sounding s16le clip: harmonic bursts with pauses between them."""
+    rng = np.random.default_rng(seed)
+    count = int(seconds * sample_rate)
+    t = np.arange(count, dtype=np.float64) / sample_rate
+    pitch = 140.0 + 30.0 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voice = sum(np.sin(phase * harmonic) / harmonic for harmonic in range(1, 6))
+    envelope = (np.sin(2 * np.pi * 2.5 * t) > -0.3).astype(np.float64)
+    signal_ = 0.25 * voice * envelope + 0.003 * rng.standard_normal(count)
+    return (np.clip(signal_, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+
+def load_fixture(path: str, sample_rate: int) -> bytes:
+    if path.lower().endswith(".wav"):
+        with wave.open(path, "rb") as wav_file:
+            if wav_file.getnchannels() != 1 or wav_file.getsampwidth() != 2:
+                raise ValueError("fixture WAV must be 16-bit mono.")
+            if wav_file.getframerate() != sample_rate:
+                raise ValueError(f"fixture WAV must be {sample_rate} Hz (use --sample-rate).")
+            return wav_file.readframes(wav_file.getnframes())
+    return Path(path).read_bytes()
+
+
+def write_executable(path: Path, content: str) -> None:
+    path.write_text(content)
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+
+
+class PtyOutputLog:
+    """Collects bridge PTY output and the arrival time of every chunk."""
+
+    def __init__(self, master_fd: int):
+        self.master_fd = master_fd
+        self.data = bytearray()
+        self._ends: list[int] = []
+        self._times: list[float] = []
+        self._cond = threading.Condition()
+        self._closed = False
+        self._reader = threading.Thread(target=self._run, name="bench-pty-reader", daemon=True)
+        self._reader.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                chunk = os.read(self.master_fd, 65536)
+            except OSError:
+                chunk = b""
+            now = time.monotonic()
+            with self._cond:
+                if not chunk:
+                    self._closed = True
+                    self._cond.notify_all()
+                    return
+                self.data.extend(chunk)
+                self._ends.append(len(self.data))
+                self._times.append(now)
+                self._cond.notify_all()
+
+    @property
+    def offset(self) -> int:
+        with self._cond:
+            return len(self.data)
+
+    def wait_for(self, markers: tuple[bytes, ...], start: int, timeout: float) -> tuple[bytes, float, int]:
+        """Return (marker, arrival time, end offset) of the first marker found after `start`."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                found = [(self.data.find(marker, start), marker) for marker in markers]
+                found = [(index, marker) for index, marker in found if index >= 0]
+                if found:
+                    index, marker = min(found)
+                    end = index + len(marker)
+                    chunk = bisect.bisect_left(self._ends, end)
+                    return marker, self._times[chunk], end
+                remaining = deadline - time.monotonic()
+                if self._closed or remaining <= 0:
+                    tail = bytes(self.data[start:])[-400:].decode("utf-8", errors="replace")
+                    raise TimeoutError(f"waiting for {markers!r}; recent output: {tail!r}")
+                self._cond.wait(remaining)
+
+
+@dataclass
+class BenchmarkRun:
+    model: str
+    compute_type: str
+    samples: dict[str, list[float]] = field(default_factory=lambda: {stage: [] for stage in STAGES})
+    outcomes: list[str] = field(default_factory=list)
+
+    @property
+    def no_speech(self) -> int:
+        """Dictations trimmed as silence before STT; they only contribute a `start` sample."""
+        return self.outcomes.count(MARKER_NO_SPEECH.decode("ascii"))
+
+
+class LatencyBenchmark:
+    """Drives cli.py over a real PTY with a stub `parec` playing the fixture in real time and a
+    stub agent that reports when dictated text reaches it."""
+
+    def __init__(
+        self,
+        fixture: bytes,
+        sample_rate: int,
+        iterations: int,
+        bridge_args: list[str],
+        fake_text: Optional[str] = None,
+        fake_delay: float = 0.0,
+        timeout: float = DEFAULT_TIMEOUT,
+    ):
+        self.fixture = fixture
+        self.sample_rate = sample_rate
+        self.iterations = iterations
+        self.bridge_args = bridge_args
+        self.fake_text = fake_text
+        self.fake_delay = fake_delay
+        self.timeout = timeout
+
+    @property
+    def clip_seconds(self) -> float:
+        return len(self.fixture) / (2.0 * self.sample_rate)
+
+    def _prepare_stubs(self, workdir: Path) -> dict:
+        bin_dir = workdir / "bin"
+        bin_dir.mkdir()
+        fixture_path = workdir / "fixture.raw"
+        fixture_path.write_bytes(self.fixture)
+        write_executable(bin_dir / "parec", FAKE_PAREC.format(python=sys.executable, fixture=str(fixture_path)))
+        write_executable(bin_dir / "pactl", "#!/bin/sh\nexit 0\n")
+        write_executable(workdir / "agent", FAKE_AGENT.format(python=sys.executable))
+        env = os.environ.copy()
+        env["PATH"] = f"{bin_dir}{os.pathsep}{env.get('PATH', '')}"
+        env["VOICE_CLAUDE_SOURCE_CACHE"] = "0"
+        env.setdefault("HF_HUB_OFFLINE", "1")
+        return env
+
+    def run(self, model: str, compute_type: str) -> BenchmarkRun:
+        result = BenchmarkRun(model=model, compute_type=compute_type)
+        with tempfile.TemporaryDirectory(prefix="voice-bench-") as tmp:
+            workdir = Path(tmp)
+            env = self._prepare_stubs(workdir)
+            argv = [
+                "--command", shlex.quote(str(workdir / "agent")),
+                "--record-source", "bench",
+                "--record-key", "ctrl-k",
+                "--sample-rate", str(self.sample_rate),
+                "--stt-model", model,
+                "--stt-compute-type", compute_type,
+                "--no-stt-service",
+                "--preload" if self.fake_text is None else "--no-preload",
+            ] + self.bridge_args
+            runner = BRIDGE_RUNNER.format(
+                module_dir=str(MODULE_DIR),
+                fake_text=self.fake_text,
+                fake_delay=self.fake_delay,
+                argv=argv,
+            )
+            master_fd, slave_fd = pty.openpty()
+            fcntl.ioctl(slave_fd, termios.TIOCSWINSZ, struct.pack("HHHH", 50, 200, 0, 0))
+            proc = subprocess.Popen(
+                [sys.executable, "-c", runner],
+                stdin=slave_fd,
+                stdout=slave_fd,
+                stderr=slave_fd,
+                close_fds=True,
+                env=env,
+            )
+            os.close(slave_fd)
+            log = PtyOutputLog(master_fd)
+            try:
+                if self.fake_text is None:
+                    marker, _, _ = log.wait_for((MARKER_READY, MARKER_LOAD_FAILED), 0, self.timeout)
+                    if marker == MARKER_LOAD_FAILED:
+                        raise RuntimeError(f"model '{model}' ({compute_type}) failed to load; is it cached?")
+                else:
+                    log.wait_for((b"voice mode ready",), 0, self.timeout)
+                for _ in range(self.iterations):
+                    self._measure_once(master_fd, log, result)
+            finally:
+                proc.send_signal(signal.SIGTERM)
+                try:
+                    proc.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+                    proc.wait()
+                os.close(master_fd)
+        return result
+
+    def _measure_once(self, master_fd: int, log: PtyOutputLog, result: BenchmarkRun) -> None:
+        offset = log.offset
+        pressed = time.monotonic()
+        os.write(master_fd, HOTKEY)
+        _, recording, offset = log.wait_for((MARKER_RECORDING,), offset, self.timeout)
+        time.sleep(max(0.0, recording + self.clip_seconds - time.monotonic()))
+
+        offset = log.offset
+        stopped = time.monotonic()
+        os.write(master_fd, HOTKEY)
+        # Silence trimming answers a clip with no speech before any transcription starts.
+        marker, transcribing, offset = log.wait_for((MARKER_TRANSCRIBING, MARKER_NO_SPEECH), offset, self.timeout)
+        result.samples["start"].append(recording - pressed)
+        if marker == MARKER_NO_SPEECH:
+            result.outcomes.append(marker.decode("ascii"))
+            return
+        outcome, decoded, offset = log.wait_for((MARKER_UPDATED, MARKER_NO_SPEECH, MARKER_FAILED), offset, self.timeout)
+
+        result.samples["stop"].append(transcribing - stopped)
+        result.samples["stt"].append(decoded - transcribing)
+        finished = decoded
+        if outcome == MARKER_UPDATED:
+            _, delivered, _ = log.wait_for((MARKER_AGENT,), offset, self.timeout)
+            result.samples["inject"].append(delivered - decoded)
+            finished = delivered
+        result.samples["total"].append(finished - stopped)
+        result.outcomes.append(outcome.decode("ascii"))
+
+
+def summarize(result: BenchmarkRun) -> list[dict]:
+    rows = []
+    for stage in STAGES:
+        values = result.samples[stage]
+        if not values:
+            continue
+        rows.append(
+            {
+                "model": result.model,
+                "compute_type": result.compute_type,
+                "stage": stage,
+                "count": len(values),
+                "p50_ms": round(percentile(values, 50) * 1000, 1),
+                "p90_ms": round(percentile(values, 90) * 1000, 1),
+                "p99_ms": round(percentile(values, 99) * 1000, 1),
+                "mean_ms": round(float(np.mean(values)) * 1000, 1),
+            }
+        )
+    return rows
+
+
+def format_table(rows: list[dict]) -> str:
+    header = f"{'model':<14}{'compute':<10}{'stage':<8}{'n':>4}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'mean ms':>10}"
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        lines.append(
+            f"{row['model']:<14}{row['compute_type']:<10}{row['stage']:<8}{row['count']:>4}"
+            f"{row['p50_ms']:>10.1f}{row['p90_ms']:>10.1f}{row['p99_ms']:>10.1f}{row['mean_ms']:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+def parse_args(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Measure hotkey-to-text latency of the voice bridge offline.")
+    parser.add_argument("--models", default="tiny.en", help="Comma-separated faster-whisper models (must be cached).")
+    parser.add_argument("--compute-types", default="int8", help="Comma-separated compute types.")
+    parser.add_argument("--iterations", type=int, default=10, help="Dictations per model/compute type.")
+    parser.add_argument("--fixture", default="", help="16-bit mono WAV or raw s16le clip to dictate.")
+    parser.add_argument("--clip-seconds", type=float, default=3.0, help="Length of the synthetic clip (no --fixture).")
+    parser.add_argument("--sample-rate", type=int, default=16000, help="Recorder sample rate.")
+    parser.add_argument(
+        "--bridge-args",
+        default="",
+        help="Extra cli.py flags for every run, e.g. '--armed --streaming'.",
+    )
+    parser.add_argument(
+        "--fake-stt-text",
+        default=None,
+        help="Skip the model and return this text, to measure bridge overhead alone.",
+    )
+    parser.add_argument("--fake-stt-delay", type=float, default=0.0, help="Seconds the fake STT sleeps per clip.")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Per-stage timeout in seconds.")
+    parser.add_argument("--json", dest="json_path", default="", help="Also write one JSON object per row here.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.fixture:
+        fixture = load_fixture(args.fixture, args.sample_rate)
+    else:
+        fixture = synthesize_fixture(args.clip_seconds, args.sample_rate)
+    benchmark = LatencyBenchmark(
+        fixture=fixture,
+        sample_rate=args.sample_rate,
+        iterations=max(1, args.iterations),
+        bridge_args=shlex.split(args.bridge_args),
+        fake_text=args.fake_stt_text,
+        fake_delay=args.fake_stt_delay,
+        timeout=args.timeout,
+    )
+    rows = []
+    for model in [item.strip() for item in args.models.split(",") if item.strip()]:
+        for compute_type in [item.strip() for item in args.compute_types.split(",") if item.strip()]:
+            sys.stderr.write(f"[voice-bench] {model} ({compute_type}): {benchmark.iterations} dictations...\n")
+            try:
+                result = benchmark.run(model, compute_type)
+            except (RuntimeError, TimeoutError) as error:
+                sys.stderr.write(f"[voice-bench] {model} ({compute_type}) skipped: {error}\n")
+                continue
+            if result.no_speech:
+                sys.stderr.write(
+                    f"[voice-bench] {model} ({compute_type}): {result.no_speech} of {len(result.outcomes)} dictations "
+                    "skipped as no speech; use a speech --fixture or --bridge-args --no-trim-silence.\n"
+                )
+            rows.extend(summarize(result))
+    print(format_table(rows))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as handle:
+            for row in rows:
+                handle.write(json.dumps(row) + "\n")
+    return 0 if rows else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,562 +1,1677 @@
-#!/usr/bin/env python3
-import argparse
-import fcntl
-import os
-import pty
-import select
-import shlex
-import shutil
-import signal
-import struct
-import subprocess
-import sys
-import tempfile
-import termios
-import tty
-import wave
-from dataclasses import dataclass
-from typing import Optional
-
-from audio_capture import AudioCaptureBackend, select_audio_backend
-
-
-DEFAULT_LANGUAGE = (os.environ.get("STT_LANGUAGE") or os.environ.get("LANG_CODE") or "en").strip()
-DEFAULT_MODEL = os.environ.get("STT_MODEL", "tiny.en")
-DEFAULT_DEVICE = os.environ.get("STT_DEVICE", "cpu")
-DEFAULT_COMPUTE_TYPE = os.environ.get("STT_COMPUTE_TYPE", "int8")
-DEFAULT_CLAUDE_CMD = os.environ.get("CLAUDE_CMD", "claude")
-DEFAULT_RECORD_SOURCE = os.environ.get("VOICE_CLAUDE_RECORD_SOURCE", "").strip()
-DEFAULT_SAMPLE_RATE = int(os.environ.get("VOICE_CLAUDE_SAMPLE_RATE", "16000"))
-DEFAULT_RECORD_KEY = os.environ.get("VOICE_CLAUDE_RECORD_KEY", "ctrl-k").strip().lower()
-
-CTRL_K_HOTKEY_BYTE = 0x0B
-CTRL_R_HOTKEY_BYTE = 0x12
-CTRL_X_HOTKEY_BYTE = 0x18
-ENTER_HOTKEY_BYTES = {0x0D, 0x0A}
-RECORD_KEY_SEQUENCES = {
-    "f8": [b"\x1b[19~"],
-    "f9": [b"\x1b[20~"],
-}
-RECORD_KEY_CHOICES = {"ctrl-k", "ctrl-r", "ctrl-x", "enter", "f8", "f9"}
-RECORD_KEY_LABELS = {
-    "ctrl-k": "Ctrl+K",
-    "ctrl-r": "Ctrl+R",
-    "ctrl-x": "Ctrl+X",
-    "enter": "Enter",
-    "f8": "F8",
-    "f9": "F9",
-}
-
-
-def normalize_record_key(value: str) -> str:
-    normalized = (value or "").strip().lower()
-    if normalized in RECORD_KEY_CHOICES:
-        return normalized
-    return "ctrl-k"
-
-
-def record_key_matches(byte: int, record_key: str) -> bool:
-    key = normalize_record_key(record_key)
-    if key == "enter":
-        return byte in ENTER_HOTKEY_BYTES
-    if key == "ctrl-x":
-        return byte == CTRL_X_HOTKEY_BYTE
-    if key == "ctrl-k":
-        return byte == CTRL_K_HOTKEY_BYTE
-    return byte == CTRL_R_HOTKEY_BYTE
-
-
-def record_key_sequence_matches(payload: bytes, record_key: str) -> int:
-    key = normalize_record_key(record_key)
-    if key in {"ctrl-k", "ctrl-r", "ctrl-x", "enter"}:
-        if not payload:
-            return 0
-        return 1 if record_key_matches(payload[0], key) else 0
-    for seq in RECORD_KEY_SEQUENCES.get(key, []):
-        if payload.startswith(seq):
-            return len(seq)
-    return 0
-
-
-def record_key_sequence_is_partial(payload: bytes, record_key: str) -> bool:
-    key = normalize_record_key(record_key)
-    if key in {"ctrl-k", "ctrl-r", "ctrl-x", "enter"}:
-        return False
-    for seq in RECORD_KEY_SEQUENCES.get(key, []):
-        if seq.startswith(payload):
-            return True
-    return False
-
-
-def compose_claude_command(command: str, extra_args: list[str]) -> str:
-    base = (command or "").strip() or DEFAULT_CLAUDE_CMD
-    remainder = [item for item in (extra_args or []) if item and item != "--"]
-    if not remainder:
-        return base
-    return f"{base} {shlex.join(remainder)}"
-
-
-def normalize_stt_language(language: str) -> str:
-    value = (language or "").strip()
-    if not value:
-        return "en"
-    lowered = value.lower().replace("_", "-")
-    if lowered in {"zh", "zh-cn", "zh-hans", "cmn-hans-cn"}:
-        return "zh"
-    return value
-
-
-def resolve_stt_profile(language: str, model: str) -> tuple[str, str, Optional[str]]:
-    resolved_language = normalize_stt_language(language)
-    resolved_model = (model or "").strip() or DEFAULT_MODEL
-    notice: Optional[str] = None
-
-    # `.en` Whisper checkpoints are English-only; force multilingual model for Chinese.
-    if resolved_language.lower().startswith("zh") and resolved_model.lower().endswith(".en"):
-        notice = (
-            f"stt model '{resolved_model}' is English-only for language "
-            f"'{resolved_language}'; switching to 'small'."
-        )
-        resolved_model = "small"
-
-    return resolved_language, resolved_model, notice
-
-
-@dataclass
-class RecorderState:
-    process: Optional[subprocess.Popen] = None
-    raw_path: Optional[str] = None
-
-
-class SttEngine:
-    def __init__(self, model: str, device: str, compute_type: str):
-        self.model_name = model
-        self.device = device
-        self.compute_type = compute_type
-        self._model = None
-
-    def _ensure_model(self):
-        if self._model is not None:
-            return self._model
-        try:
-            from faster_whisper import WhisperModel
-        except ImportError as error:
-            raise RuntimeError(
-                "faster-whisper is not installed. Run: pip install -r requirements.txt"
-            ) from error
-        try:
-            self._model = WhisperModel(
-                self.model_name,
-                device=self.device,
-                compute_type=self.compute_type,
-            )
-        except Exception as error:
-            if self.device.lower() == "auto" and "libcublas" in str(error).lower():
-                self._model = WhisperModel(
-                    self.model_name,
-                    device="cpu",
-                    compute_type="int8",
-                )
-            else:
-                raise
-        return self._model
-
-    def transcribe_file(self, wav_path: str, language: str) -> str:
-        model = self._ensure_model()
-        segments, _info = model.transcribe(
-            wav_path,
-            language=language,
-            vad_filter=True,
-            beam_size=1,
-            condition_on_previous_text=False,
-        )
-        parts = [segment.text.strip() for segment in segments if segment.text and segment.text.strip()]
-        return " ".join(parts).strip()
-
-
-class VoiceClaudeCliBridge:
-    def __init__(
-        self,
-        claude_command: str,
-        language: str,
-        model: str,
-        device: str,
-        compute_type: str,
-        record_source: str,
-        sample_rate: int,
-        auto_send: bool,
-        record_key: str,
-        audio_backend: AudioCaptureBackend,
-    ):
-        self.claude_command = claude_command
-        self.language = language
-        self.record_source = record_source
-        self.sample_rate = sample_rate
-        self.auto_send = auto_send
-        self.record_key = normalize_record_key(record_key)
-        self.audio_backend = audio_backend
-        self.stt_engine = SttEngine(model=model, device=device, compute_type=compute_type)
-
-        self._master_fd: Optional[int] = None
-        self._proc: Optional[subprocess.Popen] = None
-        self._recorder = RecorderState()
-        self._stdin_fd = sys.stdin.fileno()
-        self._old_term = None
-        self._stdin_pending = bytearray()
-        self._transcript_draft = ""
-        self._status_message = ""
-        self._resolved_record_source: Optional[str] = None
-
-    def run(self) -> int:
-        self._ensure_prereqs()
-        self._start_claude()
-        self._sync_winsize()
-        self._enable_raw_stdin()
-
-        # Handle terminal resize
-        def sigwinch_handler(signum, frame):
-            self._sync_winsize()
-
-        signal.signal(signal.SIGWINCH, sigwinch_handler)
-
-        key_label = RECORD_KEY_LABELS.get(self.record_key, "Ctrl+K")
-        self._print_status(f"voice mode ready: press {key_label} to start/stop recording.")
-        if self.auto_send:
-            self._print_status("auto-send is enabled.")
-        else:
-            self._print_status("auto-send is disabled; transcript is printed only.")
-        if self.record_key == "enter":
-            self._print_status("warning: Enter is intercepted for voice toggle and will not submit normal prompts.")
-
-        try:
-            while True:
-                if self._proc is None or self._master_fd is None:
-                    return 1
-                if self._proc.poll() is not None:
-                    return self._proc.returncode or 0
-
-                readable, _, _ = select.select([self._stdin_fd, self._master_fd], [], [], 0.05)
-                for fd in readable:
-                    if fd == self._master_fd:
-                        self._pump_claude_output()
-                    elif fd == self._stdin_fd:
-                        self._handle_stdin_bytes()
-        finally:
-            signal.signal(signal.SIGWINCH, signal.SIG_DFL)
-            self._clear_status()
-            self._restore_stdin()
-            self._stop_recorder_if_running()
-            self._stop_claude()
-
-    def _sync_winsize(self) -> None:
-        if self._master_fd is None:
-            return
-        try:
-            # Get current terminal size
-            size = fcntl.ioctl(self._stdin_fd, termios.TIOCGWINSZ, struct.pack("HHHH", 0, 0, 0, 0))
-            # Set PTY size
-            fcntl.ioctl(self._master_fd, termios.TIOCSWINSZ, size)
-        except Exception:
-            pass
-
-    def _ensure_prereqs(self) -> None:
-        self.audio_backend.ensure_prereqs()
-        if shutil.which("bash") is None:
-            raise RuntimeError("bash not found in PATH.")
-
-    def _start_claude(self) -> None:
-        master_fd, slave_fd = pty.openpty()
-        self._master_fd = master_fd
-        self._proc = subprocess.Popen(
-            ["bash", "-c", self.claude_command],
-            stdin=slave_fd,
-            stdout=slave_fd,
-            stderr=slave_fd,
-            close_fds=True,
-            text=False,
-            env=os.environ.copy(),
-        )
-        os.close(slave_fd)
-
-    def _stop_claude(self) -> None:
-        if self._proc is not None and self._proc.poll() is None:
-            try:
-                self._proc.terminate()
-                self._proc.wait(timeout=2)
-            except subprocess.TimeoutExpired:
-                self._proc.kill()
-        self._proc = None
-        if self._master_fd is not None:
-            try:
-                os.close(self._master_fd)
-            except OSError:
-                pass
-        self._master_fd = None
-
-    def _enable_raw_stdin(self) -> None:
-        if self._old_term is None:
-            self._old_term = termios.tcgetattr(self._stdin_fd)
-            tty.setraw(self._stdin_fd)
-
-    def _restore_stdin(self) -> None:
-        if self._old_term is not None:
-            termios.tcsetattr(self._stdin_fd, termios.TCSADRAIN, self._old_term)
-            self._old_term = None
-
-    def _pump_claude_output(self) -> None:
-        if self._master_fd is None:
-            return
-        try:
-            chunk = os.read(self._master_fd, 4096)
-        except OSError:
-            return
-        if not chunk:
-            return
-        os.write(sys.stdout.fileno(), chunk)
-
-    def _handle_stdin_bytes(self) -> None:
-        data = os.read(self._stdin_fd, 1024)
-        if not data or self._master_fd is None:
-            return
-        self._stdin_pending.extend(data)
-        forward = bytearray()
-
-        while self._stdin_pending:
-            consumed = record_key_sequence_matches(bytes(self._stdin_pending), self.record_key)
-            if consumed > 0:
-                self._toggle_recording()
-                del self._stdin_pending[:consumed]
-                continue
-
-            if record_key_sequence_is_partial(bytes(self._stdin_pending), self.record_key):
-                break
-
-            forward.append(self._stdin_pending[0])
-            del self._stdin_pending[0]
-
-        if forward:
-            if self.record_key != "enter" and any(
-                key in forward for key in (0x0D, 0x0A)
-            ):
-                self._transcript_draft = ""
-            os.write(self._master_fd, bytes(forward))
-
-    def _toggle_recording(self) -> None:
-        if self._recorder.process is None:
-            self._start_recording()
-        else:
-            wav_path = self._stop_recording()
-            if not wav_path:
-                self._print_status("recording stop failed.")
-                return
-            self._transcribe_and_maybe_send(wav_path)
-
-    def _start_recording(self) -> None:
-        if self._resolved_record_source is None:
-            self._resolved_record_source = self.audio_backend.resolve_source(
-                configured_source=self.record_source,
-                sample_rate=self.sample_rate,
-            )
-        source = self._resolved_record_source
-        fd, raw_path = tempfile.mkstemp(prefix="voice-claude-", suffix=".raw")
-        os.close(fd)
-        cmd = self.audio_backend.build_record_command(
-            source=source,
-            sample_rate=self.sample_rate,
-        )
-        output_file = open(raw_path, "wb")
-        proc = subprocess.Popen(cmd, stdout=output_file, stderr=subprocess.PIPE, text=False)
-        output_file.close()
-        self._recorder = RecorderState(process=proc, raw_path=raw_path)
-        key_label = RECORD_KEY_LABELS.get(self.record_key, "Ctrl+K")
-        self._print_status(f"recording started from source '{source}' ({key_label} to stop).")
-
-    def _stop_recording(self) -> Optional[str]:
-        process = self._recorder.process
-        raw_path = self._recorder.raw_path
-        self._recorder = RecorderState()
-        if process is None or raw_path is None:
-            return None
-        try:
-            process.send_signal(signal.SIGTERM)
-            process.wait(timeout=2)
-        except subprocess.TimeoutExpired:
-            process.kill()
-            process.wait(timeout=1)
-
-        stderr_text = ""
-        if process.stderr is not None:
-            try:
-                stderr_text = process.stderr.read().decode("utf-8", errors="ignore").strip()
-            except Exception:
-                stderr_text = ""
-
-        try:
-            raw_size = os.path.getsize(raw_path)
-        except OSError:
-            return None
-        if raw_size <= 0:
-            try:
-                os.remove(raw_path)
-            except OSError:
-                pass
-            if stderr_text:
-                self._print_status(f"recorder error: {stderr_text}")
-            return None
-
-        wav_path = raw_path[:-4] + ".wav"
-        self._convert_raw_to_wav(raw_path=raw_path, wav_path=wav_path)
-        try:
-            os.remove(raw_path)
-        except OSError:
-            pass
-        return wav_path
-
-    def _stop_recorder_if_running(self) -> None:
-        if self._recorder.process is not None:
-            self._stop_recording()
-
-    def _convert_raw_to_wav(self, raw_path: str, wav_path: str) -> None:
-        with open(raw_path, "rb") as raw_file, wave.open(wav_path, "wb") as wav_file:
-            wav_file.setnchannels(1)
-            wav_file.setsampwidth(2)
-            wav_file.setframerate(self.sample_rate)
-            while True:
-                chunk = raw_file.read(8192)
-                if not chunk:
-                    break
-                wav_file.writeframes(chunk)
-
-    def _transcribe_and_maybe_send(self, wav_path: str) -> None:
-        try:
-            self._print_status("transcribing...")
-            text = self.stt_engine.transcribe_file(wav_path=wav_path, language=self.language)
-        except Exception as error:
-            self._print_status(f"transcribe failed: {error}")
-            return
-        finally:
-            try:
-                os.remove(wav_path)
-            except OSError:
-                pass
-
-        if not text:
-            self._print_status("no speech detected.")
-            return
-        self._append_transcript_draft(text)
-        self._print_status("transcript updated.")
-
-        if self.auto_send and self._master_fd is not None:
-            os.write(self._master_fd, (text + " ").encode("utf-8", errors="ignore"))
-            self._print_status("appended to claude draft; press Enter to send.")
-
-    def _append_transcript_draft(self, text: str) -> str:
-        incoming = (text or "").strip()
-        if not incoming:
-            return self._transcript_draft
-        if self._transcript_draft:
-            self._transcript_draft = f"{self._transcript_draft} {incoming}"
-        else:
-            self._transcript_draft = incoming
-        return self._transcript_draft
-
-    def _print_status(self, message: str) -> None:
-        text = f"[voice-claude] {message}".replace("\r", " ").replace("\n", " ")
-        self._status_message = text
-        self._render_status_overlay(text)
-
-    def _clear_status(self) -> None:
-        self._status_message = ""
-        self._render_status_overlay("")
-
-    def _render_status_overlay(self, text: str) -> None:
-        if not sys.stdout.isatty():
-            if text:
-                sys.stdout.write(f"\r\n{text}\r\n")
-                sys.stdout.flush()
-            return
-        try:
-            cols, rows = shutil.get_terminal_size(fallback=(120, 30))
-            clipped = text[: max(0, cols - 1)]
-            payload = (
-                "\x1b7"
-                f"\x1b[{rows};1H"
-                "\x1b[2K"
-                f"{clipped}"
-                "\x1b8"
-            )
-            os.write(sys.stdout.fileno(), payload.encode("utf-8", errors="ignore"))
-        except Exception:
-            if text:
-                sys.stdout.write(f"\r\n{text}\r\n")
-                sys.stdout.flush()
-
-
-def parse_args():
-    parser = argparse.ArgumentParser(
-        description="Run Claude in PTY with voice hotkey support.",
-        add_help=False,
-    )
-    parser.add_argument("--command", default=DEFAULT_CLAUDE_CMD, help="Command used to start Claude.")
-    parser.add_argument("--stt-language", dest="language", default=DEFAULT_LANGUAGE, help="STT language code.")
-    parser.add_argument("--lang-code", dest="language", default=argparse.SUPPRESS, help="Alias for --stt-language.")
-    parser.add_argument("--stt-model", dest="model", default=DEFAULT_MODEL, help="STT model name (for faster-whisper).")
-    parser.add_argument("--stt-device", dest="device", default=DEFAULT_DEVICE, help="STT device (cpu|auto|cuda).")
-    parser.add_argument("--stt-compute-type", dest="compute_type", default=DEFAULT_COMPUTE_TYPE, help="STT compute type.")
-    parser.add_argument(
-        "--record-source",
-        default=DEFAULT_RECORD_SOURCE,
-        help="Audio input source selector (Pulse source on Linux, audio index on macOS).",
-    )
-    parser.add_argument("--sample-rate", default=DEFAULT_SAMPLE_RATE, type=int, help="Recording sample rate.")
-    parser.add_argument(
-        "--no-auto-send",
-        action="store_true",
-        help="Do not auto-send transcript to Claude; print transcript only.",
-    )
-    parser.add_argument(
-        "--record-key",
-        choices=sorted(RECORD_KEY_CHOICES),
-        default=normalize_record_key(DEFAULT_RECORD_KEY),
-        help="Hotkey used to start/stop recording.",
-    )
-    args, unknown = parser.parse_known_args()
-    args.claude_args = unknown
-    return args
-
-
-def is_help_request(args: list[str]) -> bool:
-    return "-h" in args or "--help" in args
-
-
-def main() -> int:
-    args = parse_args()
-    language, model, stt_notice = resolve_stt_profile(language=args.language, model=args.model)
-    if stt_notice:
-        sys.stderr.write(f"[voice-claude] {stt_notice}\n")
-    claude_command = compose_claude_command(args.command, args.claude_args)
-    if is_help_request(args.claude_args):
-        result = subprocess.run(["bash", "-c", claude_command], check=False)
-        return result.returncode
-    audio_backend = select_audio_backend()
-    bridge = VoiceClaudeCliBridge(
-        claude_command=claude_command,
-        language=language,
-        model=model,
-        device=args.device,
-        compute_type=args.compute_type,
-        record_source=args.record_source,
-        sample_rate=args.sample_rate,
-        auto_send=not args.no_auto_send,
-        record_key=args.record_key,
-        audio_backend=audio_backend,
-    )
-    try:
-        return bridge.run()
-    except RuntimeError as error:
-        sys.stderr.write(f"voice-claude error: {error}\n")
-        return 2
-
-
-if __name__ == "__main__":
-    raise SystemExit(main())
+#!/usr/bin/env python3
+import argparse
+import fcntl
+import os
+import pty
+import queue
+import re
+import select
+import selectors
+import shlex
+import shutil
+import signal
+import struct
+import subprocess
+import sys
+import tempfile
+import termios
+import threading
+import time
+import tty
+import wave
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import numpy as np
+
+from cpu_budget import CpuBudget, nice_allowed, parse_cpu_list, prioritized_command
+from audio_capture import AudioCaptureBackend, CaptureSourceCache, default_source_cache_path, select_audio_backend
+from dictation_trace import DictationTrace, TraceRecorder
+from hands_free import HandsFreeListener
+from language_detect import AUTO_LANGUAGE, DEFAULT_DETECT_THRESHOLD, multilingual_model
+from load_monitor import AdaptivePolicy, LoadMonitor, default_fallback_model
+from pcm_capture import ArmedRecorder, PipeRecorder
+from streaming_stt import StreamingTranscriber
+from stt_client import default_socket_path
+from stt_engine import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_MODEL_CACHE_BYTES,
+    AudioInput,
+    SttEngine,
+    audio_duration_seconds,
+    read_wav_samples,
+)
+from stt_profiles import (
+    DECODE_PROFILES,
+    DEFAULT_PROFILE,
+    DEFAULT_PROFILE_NAME,
+    DEFAULT_PROFILE_RULE,
+    ProfileRule,
+    normalize_profile_name,
+    parse_profile_rule,
+)
+from transcription_queue import TranscriptionQueue
+from vad import FRAME_MS, SILENCE_RMS_FLOOR, StreamingEndpointer, speech_bounds
+
+
+DEFAULT_LANGUAGE = (os.environ.get("STT_LANGUAGE") or os.environ.get("LANG_CODE") or "en").strip()
+DEFAULT_MODEL = os.environ.get("STT_MODEL", "tiny.en")
+DEFAULT_DEVICE = os.environ.get("STT_DEVICE", "cpu")
+DEFAULT_COMPUTE_TYPE = os.environ.get("STT_COMPUTE_TYPE", "int8")
+DEFAULT_CLAUDE_CMD = os.environ.get("CLAUDE_CMD", "claude")
+DEFAULT_RECORD_SOURCE = os.environ.get("VOICE_CLAUDE_RECORD_SOURCE", "").strip()
+DEFAULT_SAMPLE_RATE = int(os.environ.get("VOICE_CLAUDE_SAMPLE_RATE", "16000"))
+DEFAULT_RECORD_KEY = os.environ.get("VOICE_CLAUDE_RECORD_KEY", "ctrl-k").strip().lower()
+DEFAULT_CAPTURE_MODE = os.environ.get("VOICE_CLAUDE_CAPTURE_MODE", "memory").strip().lower()
+TRUTHY_ENV_VALUES = {"1", "true", "yes", "on"}
+
+
+def env_flag(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None or not value.strip():
+        return default
+    return value.strip().lower() in TRUTHY_ENV_VALUES
+
+
+DEFAULT_STREAMING = env_flag("VOICE_CLAUDE_STREAMING", False)
+DEFAULT_LIVE_PARTIALS = env_flag("VOICE_CLAUDE_LIVE_PARTIALS", False)
+DEFAULT_PRELOAD = env_flag("VOICE_CLAUDE_STT_PRELOAD", True)
+DEFAULT_STT_SERVICE = env_flag("VOICE_STT_SERVICE", True)
+DEFAULT_SOURCE_CACHE = env_flag("VOICE_CLAUDE_SOURCE_CACHE", True)
+DEFAULT_ARMED = env_flag("VOICE_CLAUDE_ARMED", False)
+DEFAULT_TRIM_SILENCE = env_flag("VOICE_CLAUDE_TRIM_SILENCE", True)
+DEFAULT_SPEECH_RMS_FLOOR = float(os.environ.get("VOICE_CLAUDE_SPEECH_RMS_FLOOR", str(SILENCE_RMS_FLOOR)))
+DEFAULT_HANDS_FREE = env_flag("VOICE_CLAUDE_HANDS_FREE", False)
+DEFAULT_PRE_ROLL_MS = int(os.environ.get("VOICE_CLAUDE_PRE_ROLL_MS", "300"))
+DEFAULT_END_SILENCE_MS = int(os.environ.get("VOICE_CLAUDE_END_SILENCE_MS", "700"))
+DEFAULT_STT_THREADS = int(os.environ.get("VOICE_STT_THREADS", "0"))
+DEFAULT_STT_WORKERS = int(os.environ.get("VOICE_STT_WORKERS", "0"))
+DEFAULT_STT_CPUS = os.environ.get("VOICE_STT_CPUS", "").strip()
+DEFAULT_STT_NICE = int(os.environ.get("VOICE_STT_NICE", "0"))
+DEFAULT_RECORDER_NICE = int(os.environ.get("VOICE_CLAUDE_RECORDER_NICE", "0"))
+DEFAULT_STT_ADAPTIVE = env_flag("VOICE_STT_ADAPTIVE", False)
+DEFAULT_STT_FALLBACK_MODEL = os.environ.get("VOICE_STT_FALLBACK_MODEL", "").strip()
+DEFAULT_STT_BATCH_SIZE = int(os.environ.get("VOICE_STT_BATCH_SIZE", str(DEFAULT_BATCH_SIZE)))
+DEFAULT_STT_DRAFT_MODEL = os.environ.get("VOICE_STT_DRAFT_MODEL", "").strip()
+DEFAULT_STT_LANGUAGES = os.environ.get("VOICE_STT_LANGUAGES", "").strip()
+DEFAULT_STT_IDLE_UNLOAD_MINUTES = float(os.environ.get("VOICE_STT_IDLE_UNLOAD_MINUTES", "0"))
+DEFAULT_STT_DETECT_THRESHOLD = float(os.environ.get("VOICE_STT_DETECT_THRESHOLD", str(DEFAULT_DETECT_THRESHOLD)))
+DEFAULT_LANGUAGE_KEY = os.environ.get("VOICE_CLAUDE_LANGUAGE_KEY", "ctrl-^").strip().lower()
+DEFAULT_STT_MODEL_CACHE_MB = int(
+    os.environ.get("VOICE_STT_MODEL_CACHE_MB", str(DEFAULT_MODEL_CACHE_BYTES // (1024 * 1024)))
+)
+DEFAULT_TRACE_FILE = os.environ.get("VOICE_CLAUDE_TRACE_FILE", "").strip()
+DEFAULT_CHROME_TRACE = os.environ.get("VOICE_CLAUDE_CHROME_TRACE", "").strip()
+MAX_PRE_ROLL_MS = 2000
+PTY_READ_BUFFER_BYTES = 65536
+PTY_MAX_BYTES_PER_WAKEUP = 1 << 20
+STDIN_READ_BYTES = 65536
+
+CTRL_K_HOTKEY_BYTE = 0x0B
+CTRL_R_HOTKEY_BYTE = 0x12
+CTRL_X_HOTKEY_BYTE = 0x18
+ENTER_HOTKEY_BYTES = {0x0D, 0x0A}
+RECORD_KEY_SEQUENCES = {
+    "f8": [b"\x1b[19~"],
+    "f9": [b"\x1b[20~"],
+}
+RECORD_KEY_CHOICES = {"ctrl-k", "ctrl-r", "ctrl-x", "enter", "f8", "f9"}
+RECORD_KEY_LABELS = {
+    "ctrl-k": "Ctrl+K",
+    "ctrl-r": "Ctrl+R",
+    "ctrl-x": "Ctrl+X",
+    "enter": "Enter",
+    "f8": "F8",
+    "f9": "F9",
+}
+LANGUAGE_KEY_BYTES = {
+    "ctrl-^": 0x1E,
+    "ctrl-_": 0x1F,
+    "ctrl-\\": 0x1C,
+}
+CAPTURE_MODE_CHOICES = {"memory", "file"}
+
+
+def normalize_record_key(value: str) -> str:
+    normalized = (value or "").strip().lower()
+    if normalized in RECORD_KEY_CHOICES:
+        return normalized
+    return "ctrl-k"
+
+
+def record_key_matches(byte: int, record_key: str) -> bool:
+    key = normalize_record_key(record_key)
+    if key == "enter":
+        return byte in ENTER_HOTKEY_BYTES
+    if key == "ctrl-x":
+        return byte == CTRL_X_HOTKEY_BYTE
+    if key == "ctrl-k":
+        return byte == CTRL_K_HOTKEY_BYTE
+    return byte == CTRL_R_HOTKEY_BYTE
+
+
+def record_key_sequence_matches(payload: bytes, record_key: str) -> int:
+    key = normalize_record_key(record_key)
+    if key in {"ctrl-k", "ctrl-r", "ctrl-x", "enter"}:
+        if not payload:
+            return 0
+        return 1 if record_key_matches(payload[0], key) else 0
+    for seq in RECORD_KEY_SEQUENCES.get(key, []):
+        if payload.startswith(seq):
+            return len(seq)
+    return 0
+
+
+def record_key_sequence_is_partial(payload: bytes, record_key: str) -> bool:
+    key = normalize_record_key(record_key)
+    if key in {"ctrl-k", "ctrl-r", "ctrl-x", "enter"}:
+        return False
+    for seq in RECORD_KEY_SEQUENCES.get(key, []):
+        if seq.startswith(payload):
+            return True
+    return False
+
+
+class RecordKeyScanner:
+    """Finds record-hotkey presses in stdin bytes with one precompiled regex pass."""
+
+    def __init__(self, record_key: str):
+        key = normalize_record_key(record_key)
+        sequences = RECORD_KEY_SEQUENCES.get(key) or [
+            bytes([byte]) for byte in range(256) if record_key_matches(byte, key)
+        ]
+        self._pattern = re.compile(b"|".join(re.escape(seq) for seq in sequences))
+        # Longest first, so a held tail starts as early as the old byte-at-a-time scan would stop.
+        self._partials = sorted(
+            {seq[:size] for seq in sequences for size in range(1, len(seq))},
+            key=len,
+            reverse=True,
+        )
+
+    def scan(self, payload: bytes) -> tuple[bytes, int, int]:
+        """Return (bytes to forward, hotkey presses, bytes consumed).
+
+        Bytes past `consumed` are a trailing partial hotkey sequence to hold for the next read.
+        """
+        consumed = len(payload)
+        for partial in self._partials:
+            if payload.endswith(partial):
+                consumed -= len(partial)
+                break
+        view = memoryview(payload)[:consumed]
+        spans = []
+        presses = 0
+        position = 0
+        for match in self._pattern.finditer(payload, 0, consumed):
+            if match.start() > position:
+                spans.append(view[position:match.start()])
+            presses += 1
+            position = match.end()
+        if position == 0 and presses == 0:
+            return bytes(view), 0, consumed
+        spans.append(view[position:])
+        return b"".join(spans), presses, consumed
+
+
+def normalize_capture_mode(value: str) -> str:
+    normalized = (value or "").strip().lower()
+    if normalized in CAPTURE_MODE_CHOICES:
+        return normalized
+    return "memory"
+
+
+def write_all(fd: int, data) -> None:
+    """Write every byte of `data` to `fd`, resuming after partial writes and waiting out EAGAIN."""
+    view = memoryview(data)
+    while view:
+        try:
+            written = os.write(fd, view)
+        except BlockingIOError:
+            select.select([], [fd], [])
+            continue
+        view = view[written:]
+
+
+def compose_claude_command(command: str, extra_args: list[str]) -> str:
+    base = (command or "").strip() or DEFAULT_CLAUDE_CMD
+    remainder = [item for item in (extra_args or []) if item and item != "--"]
+    if not remainder:
+        return base
+    return f"{base} {shlex.join(remainder)}"
+
+
+def normalize_stt_language(language: str) -> str:
+    value = (language or "").strip()
+    if not value:
+        return "en"
+    lowered = value.lower().replace("_", "-")
+    if lowered in {"zh", "zh-cn", "zh-hans", "cmn-hans-cn"}:
+        return "zh"
+    if lowered == AUTO_LANGUAGE:
+        return AUTO_LANGUAGE
+    return value
+
+
+def resolve_stt_profile(language: str, model: str) -> tuple[str, str, Optional[str]]:
+    resolved_language = normalize_stt_language(language)
+    resolved_model = (model or "").strip() or DEFAULT_MODEL
+    notice: Optional[str] = None
+
+    # `.en` Whisper checkpoints are English-only; force multilingual model for Chinese.
+    if resolved_language.lower().startswith("zh") and resolved_model.lower().endswith(".en"):
+        notice = (
+            f"stt model '{resolved_model}' is English-only for language "
+            f"'{resolved_language}'; switching to 'small'."
+        )
+        resolved_model = "small"
+    elif resolved_language == AUTO_LANGUAGE and resolved_model.lower().endswith(".en"):
+        multilingual = multilingual_model(resolved_model)
+        notice = (
+            f"stt model '{resolved_model}' is English-only and cannot detect languages; "
+            f"switching to '{multilingual}'."
+        )
+        resolved_model = multilingual
+
+    return resolved_language, resolved_model, notice
+
+
+def parse_language_choices(spec: str, language: str, model: str) -> list[tuple[str, str]]:
+    """Parse `en,zh` or `en:small.en,zh:medium` into (language, model) pairs to cycle through.
+
+    Entries without a model use `model`, swapped for a multilingual one where needed. The
+    starting (language, model) pair always comes first.
+    """
+    current = resolve_stt_profile(language, model)[:2]
+    choices = [current]
+    for item in (spec or "").split(","):
+        entry_language, _separator, entry_model = item.strip().partition(":")
+        if not entry_language:
+            continue
+        choice = resolve_stt_profile(entry_language, entry_model.strip() or model)[:2]
+        if choice not in choices:
+            choices.append(choice)
+    return choices
+
+
+@dataclass
+class RecorderState:
+    process: Optional[subprocess.Popen] = None
+    raw_path: Optional[str] = None
+    pipe: Optional[PipeRecorder] = None
+    streamer: Optional[StreamingTranscriber] = None
+    trace: Optional[DictationTrace] = None
+    spawned_at: Optional[float] = None
+    # STT language and model when recording started; a switch mid-recording applies to the next clip.
+    language: str = ""
+    model: str = ""
+
+
+class VoiceClaudeCliBridge:
+    status_label = "voice-claude"
+    agent_label = "claude"
+
+    def __init__(
+        self,
+        claude_command: str,
+        language: str,
+        model: str,
+        device: str,
+        compute_type: str,
+        record_source: str,
+        sample_rate: int,
+        auto_send: bool,
+        record_key: str,
+        audio_backend: AudioCaptureBackend,
+        capture_mode: str = "memory",
+        streaming: bool = False,
+        live_partials: bool = False,
+        preload: bool = True,
+        stt_socket: Optional[str] = None,
+        armed: bool = False,
+        pre_roll_ms: int = DEFAULT_PRE_ROLL_MS,
+        tracer: Optional[TraceRecorder] = None,
+        trim_silence: bool = DEFAULT_TRIM_SILENCE,
+        speech_rms_floor: float = DEFAULT_SPEECH_RMS_FLOOR,
+        hands_free: bool = False,
+        end_silence_ms: int = DEFAULT_END_SILENCE_MS,
+        stt_profile: str = DEFAULT_PROFILE_NAME,
+        stt_profile_rules: Optional[list[ProfileRule]] = None,
+        cpu_budget: Optional[CpuBudget] = None,
+        recorder_nice: int = DEFAULT_RECORDER_NICE,
+        adaptive_stt: bool = False,
+        fallback_model: str = "",
+        stt_batch_size: int = DEFAULT_STT_BATCH_SIZE,
+        draft_model: str = "",
+        language_choices: Optional[list[tuple[str, str]]] = None,
+        language_key: str = DEFAULT_LANGUAGE_KEY,
+        model_cache_bytes: int = DEFAULT_MODEL_CACHE_BYTES,
+        detect_threshold: float = DEFAULT_STT_DETECT_THRESHOLD,
+        idle_unload_minutes: float = 0.0,
+    ):
+        self.claude_command = claude_command
+        self.language = language
+        self.language_choices = list(language_choices or [(language, model)])
+        self.record_source = record_source
+        self.sample_rate = sample_rate
+        self.auto_send = auto_send
+        self.record_key = normalize_record_key(record_key)
+        self._record_key_scanner = RecordKeyScanner(self.record_key)
+        self.audio_backend = audio_backend
+        self.capture_mode = normalize_capture_mode(capture_mode)
+        # Incremental decoding reads the live capture buffer, so it needs memory capture.
+        self.streaming = bool(streaming) and self.capture_mode == "memory"
+        # Partial hypotheses come from the streaming worker, so they switch streaming on.
+        self.live_partials = bool(live_partials) and self.capture_mode == "memory"
+        self.streaming = self.streaming or self.live_partials
+        self.preload = preload
+        # An armed recorder keeps the device open between recordings; it feeds the memory buffer.
+        self.armed = bool(armed) and self.capture_mode == "memory"
+        self.pre_roll_ms = max(0, min(int(pre_roll_ms), MAX_PRE_ROLL_MS))
+        # Hands-free listening owns the device for the whole session; the hotkey only pauses it.
+        self.hands_free = bool(hands_free) and self.capture_mode == "memory"
+        if self.hands_free:
+            self.armed = False
+            self.streaming = False
+            self.live_partials = False
+        self.end_silence_ms = max(FRAME_MS, int(end_silence_ms))
+        self.recorder_nice = max(-20, min(int(recorder_nice), 19))
+        self.tracer = tracer or TraceRecorder()
+        self.trim_silence = trim_silence
+        # Lowest frame RMS that counts as speech when trimming and endpointing.
+        self.speech_rms_floor = max(0.0, float(speech_rms_floor))
+        self.stt_engine = SttEngine(
+            model=model,
+            device=device,
+            compute_type=compute_type,
+            service_socket=stt_socket,
+            profile=stt_profile,
+            profile_rules=stt_profile_rules,
+            cpu_budget=cpu_budget,
+            load_monitor=LoadMonitor(agent_pids=self._agent_pids) if adaptive_stt else None,
+            adaptive_policy=AdaptivePolicy(fallback_model=resolve_fallback_model(fallback_model, model))
+            if adaptive_stt
+            else None,
+            batch_size=stt_batch_size,
+            draft_model=resolve_draft_model(draft_model, model),
+            model_cache_bytes=model_cache_bytes,
+            detect_threshold=detect_threshold,
+            # With `auto` and fixed languages configured, detection only picks among those.
+            language_candidates=[choice for choice, _model in self.language_choices if choice != AUTO_LANGUAGE],
+            idle_unload_seconds=max(0.0, idle_unload_minutes) * 60.0,
+        )
+        self.stt_engine.on_idle_unload = lambda: self._call_soon_threadsafe(self._on_model_idle_unload)
+        # Switching language may switch model, and with it the tiny draft/fallback that matches it.
+        self._draft_model_setting = draft_model
+        self._fallback_model_setting = fallback_model
+        self._language_index = 0
+        self.language_byte = LANGUAGE_KEY_BYTES.get(language_key) if len(self.language_choices) > 1 else None
+
+        self._master_fd: Optional[int] = None
+        self._pty_read_buffer: Optional[bytearray] = None
+        self._proc: Optional[subprocess.Popen] = None
+        self._recorder = RecorderState()
+        self._stdin_fd = sys.stdin.fileno()
+        self._old_term = None
+        self._stdin_pending = bytearray()
+        self._transcript_draft = ""
+        self._status_message = ""
+        self._last_partial = ""
+        self._resolved_record_source: Optional[str] = None
+        self._source_lock = threading.Lock()
+        self._armed_recorder: Optional[ArmedRecorder] = None
+        self._armed_lock = threading.Lock()
+        self._hands_free_listener: Optional[HandsFreeListener] = None
+        self._loop_callbacks: "queue.SimpleQueue[Callable[[], None]]" = queue.SimpleQueue()
+        self._wake_read_fd: Optional[int] = None
+        self._wake_write_fd: Optional[int] = None
+        # Decoding runs here so the PTY keeps flowing; results come back through the wake pipe.
+        self._transcriptions = TranscriptionQueue(deliver=self._call_soon_threadsafe)
+        # Clips handed to the queue and clips whose final text reached the loop, both counted on the loop thread.
+        self._clips_queued = 0
+        self._clips_delivered = 0
+
+    def run(self) -> int:
+        self._ensure_prereqs()
+        self._start_claude()
+        self._sync_winsize()
+        self._enable_raw_stdin()
+        self._open_wake_pipe()
+
+        # Handle terminal resize
+        def sigwinch_handler(signum, frame):
+            self._sync_winsize()
+
+        signal.signal(signal.SIGWINCH, sigwinch_handler)
+
+        key_label = RECORD_KEY_LABELS.get(self.record_key, "Ctrl+K")
+        if self.hands_free:
+            self._print_status(f"hands-free mode: speak to dictate; press {key_label} to pause/resume listening.")
+        else:
+            self._print_status(f"voice mode ready: press {key_label} to start/stop recording.")
+        if self.auto_send:
+            self._print_status("auto-send is enabled.")
+        else:
+            self._print_status("auto-send is disabled; transcript is printed only.")
+        if self.record_key == "enter":
+            self._print_status("warning: Enter is intercepted for voice toggle and will not submit normal prompts.")
+        if not nice_allowed(self.recorder_nice):
+            self._print_status(
+                f"warning: recorder nice {self.recorder_nice} was not applied; the recorder runs at normal "
+                "priority. Raising priority needs root, CAP_SYS_NICE or a matching RLIMIT_NICE."
+            )
+        if self.preload:
+            self._start_model_preload()
+        threading.Thread(target=self._prepare_capture, name="source-resolve", daemon=True).start()
+
+        selector = selectors.DefaultSelector()
+        child_exit_fd = self._watch_child_exit(selector)
+        try:
+            return self._run_event_loop(selector)
+        finally:
+            selector.close()
+            if child_exit_fd is not None:
+                os.close(child_exit_fd)
+            else:
+                signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            signal.signal(signal.SIGWINCH, signal.SIG_DFL)
+            self._clear_status()
+            self._restore_stdin()
+            self._stop_recorder_if_running()
+            self._disarm_recorder()
+            self._stop_hands_free()
+            self._transcriptions.close()
+            self._stop_claude()
+            self._close_wake_pipe()
+
+    def _run_event_loop(self, selector: selectors.BaseSelector) -> int:
+        """Block until there is PTY output, stdin, a worker callback or child exit; no idle polling."""
+        selector.register(self._stdin_fd, selectors.EVENT_READ, self._on_stdin_readable)
+        selector.register(self._master_fd, selectors.EVENT_READ, self._on_master_readable)
+        selector.register(self._wake_read_fd, selectors.EVENT_READ, self._drain_loop_callbacks)
+        while True:
+            if self._proc is None or self._master_fd is None:
+                return 1
+            if self._proc.poll() is not None:
+                self._drain_claude_output()
+                return self._proc.returncode or 0
+            for key, _ in selector.select():
+                callback = key.data
+                if callback is None:
+                    # pidfd readable: the child exited; the poll() above picks up the status.
+                    continue
+                if not callback():
+                    selector.unregister(key.fd)
+
+    def _watch_child_exit(self, selector: selectors.BaseSelector) -> Optional[int]:
+        """Register a pidfd for the Claude process, or fall back to a SIGCHLD -> wake pipe handler."""
+        pidfd_open = getattr(os, "pidfd_open", None)
+        if pidfd_open is not None and self._proc is not None:
+            try:
+                pidfd = pidfd_open(self._proc.pid)
+            except OSError:
+                pidfd = None
+            if pidfd is not None:
+                selector.register(pidfd, selectors.EVENT_READ, None)
+                return pidfd
+
+        def sigchld_handler(signum, frame):
+            self._wake_loop()
+
+        signal.signal(signal.SIGCHLD, sigchld_handler)
+        return None
+
+    def _on_stdin_readable(self) -> bool:
+        return self._handle_stdin_bytes()
+
+    def _on_master_readable(self) -> bool:
+        return self._pump_claude_output()
+
+    def _drain_claude_output(self) -> None:
+        # Unbounded pump: returns at EAGAIN or EOF, whichever the exited child leaves behind.
+        self._pump_claude_output(max_bytes=None)
+
+    def _open_wake_pipe(self) -> None:
+        self._wake_read_fd, self._wake_write_fd = os.pipe()
+        os.set_blocking(self._wake_read_fd, False)
+        os.set_blocking(self._wake_write_fd, False)
+
+    def _close_wake_pipe(self) -> None:
+        for fd in (self._wake_read_fd, self._wake_write_fd):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self._wake_read_fd = None
+        self._wake_write_fd = None
+
+    def _call_soon_threadsafe(self, callback: Callable[[], None]) -> None:
+        """Queue a callback from a worker thread to run on the PTY loop thread."""
+        self._loop_callbacks.put(callback)
+        self._wake_loop()
+
+    def _wake_loop(self) -> None:
+        if self._wake_write_fd is None:
+            return
+        try:
+            os.write(self._wake_write_fd, b"\x00")
+        except (BlockingIOError, OSError):
+            pass
+
+    def _drain_loop_callbacks(self) -> bool:
+        if self._wake_read_fd is not None:
+            try:
+                while os.read(self._wake_read_fd, 4096):
+                    pass
+            except (BlockingIOError, OSError):
+                pass
+        while True:
+            try:
+                callback = self._loop_callbacks.get_nowait()
+            except queue.Empty:
+                return True
+            try:
+                callback()
+            except Exception as error:
+                # A failed status redraw or trace write must not end the agent's session.
+                self._report_callback_error(error)
+
+    def _report_callback_error(self, error: Exception) -> None:
+        try:
+            self._print_status(f"background task failed: {error}")
+        except Exception:
+            # Reporting itself can fail, e.g. when stdout is closed; keep the loop running anyway.
+            pass
+
+    def _start_model_preload(self) -> None:
+        if self.stt_engine.is_loaded:
+            return
+        if self.stt_engine.service_available():
+            self._print_status(f"using shared stt service at {self.stt_engine.service_socket}.")
+            return
+        self._print_status(f"loading stt model '{self.stt_engine.model_name}' in background...")
+
+        def on_done(error: Optional[Exception], elapsed: float) -> None:
+            if error is not None:
+                self._call_soon_threadsafe(lambda: self._print_status(f"stt model preload failed: {error}"))
+            else:
+                self._call_soon_threadsafe(lambda: self._print_status(f"stt model ready ({elapsed:.1f}s)."))
+            problem = self.stt_engine.budget_problem
+            if problem:
+                self._call_soon_threadsafe(lambda: self._print_status(f"stt cpu budget not fully applied: {problem}"))
+
+        self.stt_engine.preload(on_done=on_done)
+
+    def _sync_winsize(self) -> None:
+        if self._master_fd is None:
+            return
+        try:
+            # Get current terminal size
+            size = fcntl.ioctl(self._stdin_fd, termios.TIOCGWINSZ, struct.pack("HHHH", 0, 0, 0, 0))
+            # Set PTY size
+            fcntl.ioctl(self._master_fd, termios.TIOCSWINSZ, size)
+        except Exception:
+            pass
+
+    def _ensure_prereqs(self) -> None:
+        self.audio_backend.ensure_prereqs()
+        if shutil.which("bash") is None:
+            raise RuntimeError("bash not found in PATH.")
+
+    def _start_claude(self) -> None:
+        master_fd, slave_fd = pty.openpty()
+        self._master_fd = master_fd
+        self._proc = subprocess.Popen(
+            ["bash", "-c", self.claude_command],
+            stdin=slave_fd,
+            stdout=slave_fd,
+            stderr=slave_fd,
+            close_fds=True,
+            text=False,
+            env=os.environ.copy(),
+        )
+        os.close(slave_fd)
+        # The pump drains the master until EAGAIN; writes towards it go through write_all.
+        os.set_blocking(master_fd, False)
+
+    def _stop_claude(self) -> None:
+        if self._proc is not None and self._proc.poll() is None:
+            try:
+                self._proc.terminate()
+                self._proc.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+        self._proc = None
+        if self._master_fd is not None:
+            try:
+                os.close(self._master_fd)
+            except OSError:
+                pass
+        self._master_fd = None
+
+    def _enable_raw_stdin(self) -> None:
+        if self._old_term is None:
+            self._old_term = termios.tcgetattr(self._stdin_fd)
+            tty.setraw(self._stdin_fd)
+
+    def _restore_stdin(self) -> None:
+        if self._old_term is not None:
+            termios.tcsetattr(self._stdin_fd, termios.TCSADRAIN, self._old_term)
+            self._old_term = None
+
+    def _pump_claude_output(self, max_bytes: Optional[int] = PTY_MAX_BYTES_PER_WAKEUP) -> bool:
+        """Copy pending PTY output to stdout; False once the PTY reports EOF/EIO."""
+        if self._master_fd is None:
+            return False
+        return self._pump_pty_output(self._master_fd, self._write_terminal, max_bytes=max_bytes)
+
+    def _write_terminal(self, data) -> None:
+        write_all(sys.stdout.fileno(), data)
+
+    def _pump_pty_output(
+        self,
+        master_fd: int,
+        on_output: Callable[[memoryview], None],
+        max_bytes: Optional[int] = PTY_MAX_BYTES_PER_WAKEUP,
+    ) -> bool:
+        """Hand pending output of one PTY master to `on_output`; False once it reports EOF/EIO.
+
+        Reads fill one reusable buffer until the master would block (or the buffer is full)
+        and are flushed with a single write, so bursty TUI redraws cost few syscalls.
+        `max_bytes` bounds one wakeup so stdin stays responsive during a flood of output.
+        """
+        if self._pty_read_buffer is None:
+            self._pty_read_buffer = bytearray(PTY_READ_BUFFER_BYTES)
+        view = memoryview(self._pty_read_buffer)
+        pumped = 0
+        while max_bytes is None or pumped < max_bytes:
+            filled = 0
+            alive = True
+            while filled < len(view):
+                try:
+                    count = os.readv(master_fd, [view[filled:]])
+                except BlockingIOError:
+                    break
+                except OSError:
+                    alive = False
+                    break
+                if count == 0:
+                    alive = False
+                    break
+                filled += count
+            if filled:
+                on_output(view[:filled])
+                pumped += filled
+            if not alive:
+                return False
+            if filled < len(view):
+                # The master would block: everything currently readable has been forwarded.
+                return True
+        return True
+
+    def _handle_stdin_bytes(self) -> bool:
+        """Forward stdin to the PTY, intercepting the record hotkey; False once stdin hits EOF."""
+        data = os.read(self._stdin_fd, STDIN_READ_BYTES)
+        if not data:
+            return False
+        if self._master_fd is None:
+            return True
+        if self._stdin_pending:
+            data = bytes(self._stdin_pending) + data
+        forward, presses, consumed = self._record_key_scanner.scan(data)
+        self._stdin_pending = bytearray(data[consumed:])
+        for _ in range(presses):
+            self._toggle_recording()
+        if forward:
+            self._forward_to_agent(forward)
+        return True
+
+    def _agent_pids(self) -> list[int]:
+        """Agent processes whose CPU use adaptive STT yields to; called from worker threads."""
+        proc = self._proc
+        return [proc.pid] if proc is not None else []
+
+    def _forward_to_agent(self, forward: bytes) -> None:
+        if self.language_byte is not None and self.language_byte in forward:
+            # Bytes typed before a language-key press are forwarded first, in order.
+            for index, part in enumerate(forward.split(bytes([self.language_byte]))):
+                if index > 0:
+                    self._cycle_language()
+                if part:
+                    self._write_to_agent(part)
+            return
+        self._write_to_agent(forward)
+
+    def _write_to_agent(self, forward: bytes) -> None:
+        if self._master_fd is None:
+            return
+        if self.record_key != "enter" and (b"\r" in forward or b"\n" in forward):
+            self._transcript_draft = ""
+        write_all(self._master_fd, forward)
+
+    def _cycle_language(self) -> None:
+        self._language_index = (self._language_index + 1) % len(self.language_choices)
+        self._switch_language(*self.language_choices[self._language_index])
+
+    def _switch_language(self, language: str, model: str) -> None:
+        """Use `language`/`model` for clips recorded from now on; earlier clips keep their own."""
+        self.language = language
+        needs_load = self.stt_engine.switch_model(model, draft_model=resolve_draft_model(self._draft_model_setting, model))
+        policy = getattr(self.stt_engine, "adaptive_policy", None)
+        if policy is not None:
+            policy.fallback_model = resolve_fallback_model(self._fallback_model_setting, model)
+        self._print_status(f"stt language '{language}' (model '{model}').")
+        if needs_load and self.preload:
+            self._start_model_preload()
+
+    def _stt_selection(self) -> tuple[str, str]:
+        """The STT language and model a clip recorded now is decoded with."""
+        return self.language, getattr(self.stt_engine, "model_name", "")
+
+    def _toggle_recording(self) -> None:
+        if self.hands_free:
+            self._toggle_hands_free()
+        elif self._recorder.process is None:
+            self._start_recording()
+        elif self._recorder.streamer is not None:
+            self._finish_streaming_recording()
+        else:
+            trace = self._recorder.trace
+            language, model = self._recorder.language, self._recorder.model
+            audio = self._stop_recording()
+            if audio is None:
+                self._print_status("recording stop failed.")
+                return
+            if self.trim_silence:
+                audio = self._trim_silence(audio, trace)
+                if audio is None:
+                    self._finish_dictation(trace, self._on_transcription_done, "", None)
+                    return
+            self._queue_clip(audio, trace, language, model)
+
+    def _trim_silence(self, audio: AudioInput, trace: Optional[DictationTrace]) -> Optional[AudioInput]:
+        """Cut leading/trailing silence before STT; None (and no model call) when nothing was said."""
+        started = time.monotonic()
+        input_seconds = audio_duration_seconds(audio)
+        if isinstance(audio, str):
+            trimmed = self._trim_wav_silence(audio)
+        else:
+            bounds = speech_bounds(audio, rms_floor=self.speech_rms_floor)
+            trimmed = None if bounds is None else audio[bounds[0] : bounds[1]]
+        if trace is not None:
+            trace.add_span(
+                "silence_trim",
+                started,
+                time.monotonic(),
+                input_seconds=input_seconds,
+                output_seconds=audio_duration_seconds(trimmed) if trimmed is not None else 0.0,
+            )
+        return trimmed
+
+    def _trim_wav_silence(self, wav_path: str) -> Optional[str]:
+        try:
+            with wave.open(wav_path, "rb") as wav_file:
+                rate = wav_file.getframerate()
+                frames = wav_file.readframes(wav_file.getnframes())
+        except (OSError, EOFError, wave.Error):
+            return wav_path
+        samples = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+        bounds = speech_bounds(samples, sample_rate=rate, rms_floor=self.speech_rms_floor)
+        if bounds is None:
+            try:
+                os.remove(wav_path)
+            except OSError:
+                pass
+            return None
+        start, end = bounds
+        if end - start < samples.size:
+            with wave.open(wav_path, "wb") as wav_file:
+                wav_file.setnchannels(1)
+                wav_file.setsampwidth(2)
+                wav_file.setframerate(rate)
+                wav_file.writeframes(frames[start * 2 : end * 2])
+        return wav_path
+
+    def _resolve_record_source(self) -> str:
+        # Resolution starts in the background at startup; a hotkey press that races it waits here.
+        with self._source_lock:
+            if self._resolved_record_source is None:
+                self._resolved_record_source = self.audio_backend.resolve_source(
+                    configured_source=self.record_source,
+                    sample_rate=self.sample_rate,
+                )
+            return self._resolved_record_source
+
+    def _record_command(self, source: str) -> list[str]:
+        cmd = self.audio_backend.build_record_command(source=source, sample_rate=self.sample_rate)
+        if nice_allowed(self.recorder_nice):
+            return prioritized_command(cmd, self.recorder_nice)
+        return cmd
+
+    def _prepare_capture(self) -> None:
+        source = self._resolve_record_source()
+        if self.armed:
+            self._armed_recorder_for(source)
+        if self.hands_free:
+            self._start_hands_free(source)
+
+    def _armed_recorder_for(self, source: str) -> Optional[ArmedRecorder]:
+        with self._armed_lock:
+            armed = self._armed_recorder
+            if armed is not None and armed.is_running():
+                return armed
+            if armed is not None:
+                armed.stop()
+            cmd = self._record_command(source)
+            armed = ArmedRecorder(
+                command=cmd,
+                sample_rate=self.sample_rate,
+                max_pre_roll_seconds=MAX_PRE_ROLL_MS / 1000.0,
+            )
+            try:
+                armed.start()
+            except OSError:
+                self._armed_recorder = None
+                return None
+            self._armed_recorder = armed
+            return armed
+
+    def _disarm_recorder(self) -> None:
+        with self._armed_lock:
+            armed = self._armed_recorder
+            self._armed_recorder = None
+        if armed is not None:
+            armed.stop()
+
+    def _start_hands_free(self, source: str) -> None:
+        endpointer = StreamingEndpointer(
+            sample_rate=self.sample_rate,
+            pre_roll_ms=self.pre_roll_ms,
+            end_silence_ms=self.end_silence_ms,
+            rms_floor=self.speech_rms_floor,
+        )
+        listener = HandsFreeListener(
+            command=self._record_command(source),
+            sample_rate=self.sample_rate,
+            endpointer=endpointer,
+            on_utterance=lambda samples: self._call_soon_threadsafe(lambda: self._on_utterance(samples)),
+        )
+        try:
+            listener.start()
+        except OSError as error:
+            self._call_soon_threadsafe(lambda: self._print_status(f"hands-free listener failed: {error}"))
+            return
+        self._hands_free_listener = listener
+        self._call_soon_threadsafe(lambda: self._print_status(f"listening on source '{source}'."))
+
+    def _stop_hands_free(self) -> None:
+        listener = self._hands_free_listener
+        self._hands_free_listener = None
+        if listener is not None:
+            listener.stop()
+
+    def _toggle_hands_free(self) -> None:
+        listener = self._hands_free_listener
+        if listener is None:
+            self._print_status("hands-free listener is not running yet.")
+        elif listener.paused:
+            self._rewarm_model()
+            listener.resume()
+            self._print_status("listening resumed.")
+        else:
+            listener.pause()
+            self._print_status("listening paused.")
+
+    def _on_utterance(self, samples: np.ndarray) -> None:
+        """Queue one end-pointed utterance; false onsets with no speech are dropped quietly."""
+        trace = self.tracer.begin()
+        trace.attributes.update(capture_mode=self.capture_mode, hands_free=True)
+        language, model = self._stt_selection()
+        audio: Optional[AudioInput] = samples
+        if self.trim_silence:
+            audio = self._trim_silence(samples, trace)
+            if audio is None:
+                self._finish_dictation(trace, lambda text, error: None, "", None)
+                return
+        self._queue_clip(audio, trace, language, model)
+
+    def _forget_record_source(self) -> None:
+        self._disarm_recorder()
+        if self.record_source.strip():
+            return
+        with self._source_lock:
+            self._resolved_record_source = None
+        self.audio_backend.forget_cached_source(self.sample_rate)
+
+    def _report_empty_capture(self, stderr_text: str) -> None:
+        if stderr_text:
+            self._print_status(f"recorder error: {stderr_text}")
+        # The source produced nothing; re-probe next time instead of trusting the cached choice.
+        self._forget_record_source()
+
+    def _on_model_idle_unload(self) -> None:
+        minutes = self.stt_engine.idle_unload_seconds / 60.0
+        self._print_status(f"stt model unloaded after {minutes:g} min idle; it reloads when you record.")
+
+    def _rewarm_model(self) -> None:
+        """Reload an idle-unloaded model in the background, overlapping the load with speech."""
+        engine = self.stt_engine
+        if getattr(engine, "service_socket", None):
+            # The daemon unloads on its own idle timer; it only loads again when asked.
+            engine.warm_service()
+        if not getattr(engine, "idle_unloaded", False) or engine.is_loaded:
+            return
+
+        def on_done(error: Optional[Exception], elapsed: float) -> None:
+            if error is not None:
+                self._call_soon_threadsafe(lambda: self._print_status(f"stt model reload failed: {error}"))
+
+        engine.preload(on_done=on_done)
+
+    def _start_recording(self) -> None:
+        self._rewarm_model()
+        trace = self.tracer.begin()
+        load_monitor = getattr(self.stt_engine, "load_monitor", None)
+        if load_monitor is not None:
+            load_monitor.mark()
+        trace.attributes.update(capture_mode=self.capture_mode, armed=self.armed, streaming=self.streaming)
+        language, model = self._stt_selection()
+        self._last_partial = ""
+        with trace.span("source_resolve") as span:
+            source = self._resolve_record_source()
+            span["source"] = source
+        cmd = self._record_command(source)
+        if self.capture_mode == "memory":
+            spawn_started = time.monotonic()
+            with trace.span("recorder_spawn"):
+                armed = self._armed_recorder_for(source) if self.armed else None
+                if armed is not None:
+                    pipe = armed.begin_capture(pre_roll_seconds=self.pre_roll_ms / 1000.0)
+                else:
+                    pipe = PipeRecorder(command=cmd, sample_rate=self.sample_rate)
+                    pipe.start()
+            streamer = None
+            if self.streaming:
+                streamer = StreamingTranscriber(
+                    stt_engine=self.stt_engine,
+                    buffer=pipe.buffer,
+                    sample_rate=self.sample_rate,
+                    language=language,
+                    on_partial=(lambda text: self._call_soon_threadsafe(lambda: self._show_partial(pipe, text)))
+                    if self.live_partials
+                    else None,
+                    model=model,
+                )
+                streamer.start()
+            self._recorder = RecorderState(
+                process=pipe.process,
+                pipe=pipe,
+                streamer=streamer,
+                trace=trace,
+                spawned_at=spawn_started,
+                language=language,
+                model=model,
+            )
+        else:
+            with trace.span("recorder_spawn"):
+                fd, raw_path = tempfile.mkstemp(prefix="voice-claude-", suffix=".raw")
+                os.close(fd)
+                output_file = open(raw_path, "wb")
+                proc = subprocess.Popen(cmd, stdout=output_file, stderr=subprocess.PIPE, text=False)
+                output_file.close()
+            self._recorder = RecorderState(process=proc, raw_path=raw_path, trace=trace, language=language, model=model)
+        key_label = RECORD_KEY_LABELS.get(self.record_key, "Ctrl+K")
+        self._print_status(f"recording started from source '{source}' ({key_label} to stop).")
+
+    def _show_partial(self, pipe, text: str) -> None:
+        """Draw the running hypothesis on the status row, keeping its newest words in view."""
+        if self._recorder.pipe is not pipe or text == self._last_partial:
+            # Recording already stopped (the final text is on its way) or nothing new to draw.
+            return
+        self._last_partial = text
+        cols, _rows = shutil.get_terminal_size(fallback=(120, 30))
+        prefix = "hearing: "
+        room = max(16, cols - len(self.status_label) - len(prefix) - 4)
+        self._print_status(prefix + (text if len(text) <= room else "..." + text[-(room - 3) :]))
+
+    def _stop_recording(self) -> Optional[AudioInput]:
+        if self._recorder.pipe is not None:
+            return self._stop_pipe_recording()
+        process = self._recorder.process
+        raw_path = self._recorder.raw_path
+        trace = self._recorder.trace or self.tracer.begin()
+        self._recorder = RecorderState()
+        if process is None or raw_path is None:
+            return None
+        with trace.span("stop_drain"):
+            try:
+                process.send_signal(signal.SIGTERM)
+                process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait(timeout=1)
+
+        stderr_text = ""
+        if process.stderr is not None:
+            try:
+                stderr_text = process.stderr.read().decode("utf-8", errors="ignore").strip()
+            except Exception:
+                stderr_text = ""
+
+        try:
+            raw_size = os.path.getsize(raw_path)
+        except OSError:
+            return None
+        if raw_size <= 0:
+            try:
+                os.remove(raw_path)
+            except OSError:
+                pass
+            self._report_empty_capture(stderr_text)
+            return None
+
+        wav_path = raw_path[:-4] + ".wav"
+        with trace.span("raw_to_wav", audio_seconds=raw_size / (2.0 * self.sample_rate)):
+            self._convert_raw_to_wav(raw_path=raw_path, wav_path=wav_path)
+        try:
+            os.remove(raw_path)
+        except OSError:
+            pass
+        return wav_path
+
+    def _stop_pipe_recording(self) -> Optional[np.ndarray]:
+        pipe = self._recorder.pipe
+        streamer = self._recorder.streamer
+        trace = self._recorder.trace or self.tracer.begin()
+        spawned_at = self._recorder.spawned_at
+        self._recorder = RecorderState()
+        if streamer is not None:
+            streamer.cancel()
+        if pipe is None:
+            return None
+        stderr_text = self._stop_pipe(pipe, trace, spawned_at)
+        if len(pipe.buffer) <= 0:
+            self._report_empty_capture(stderr_text)
+            return None
+        return pipe.buffer.to_float32(sample_rate=self.sample_rate)
+
+    def _stop_pipe(self, pipe, trace: DictationTrace, spawned_at: Optional[float]) -> str:
+        if spawned_at is not None and pipe.buffer.first_append_at is not None:
+            trace.add_span("first_audio", spawned_at, pipe.buffer.first_append_at)
+        with trace.span("stop_drain") as span:
+            stderr_text = pipe.stop()
+            span["audio_seconds"] = len(pipe.buffer) / (2.0 * self.sample_rate)
+        return stderr_text
+
+    def _finish_streaming_recording(self) -> None:
+        pipe = self._recorder.pipe
+        streamer = self._recorder.streamer
+        trace = self._recorder.trace or self.tracer.begin()
+        spawned_at = self._recorder.spawned_at
+        self._recorder = RecorderState()
+        if pipe is None or streamer is None:
+            return
+        stderr_text = self._stop_pipe(pipe, trace, spawned_at)
+        if len(pipe.buffer) <= 0:
+            streamer.cancel()
+            self._report_empty_capture(stderr_text)
+            self._print_status("recording stop failed.")
+            return
+        if self.trim_silence and streamer.committed_bytes == 0:
+            # Nothing was committed mid-recording, so check the whole clip before waking the model.
+            if self._trim_silence(pipe.buffer.to_float32(sample_rate=self.sample_rate), trace) is None:
+                streamer.cancel()
+                self._finish_dictation(trace, self._on_transcription_done, "", None)
+                return
+
+        def finish() -> str:
+            with trace.span("transcribe", audio_seconds=len(pipe.buffer) / (2.0 * self.sample_rate), tail_only=True):
+                return streamer.finish()
+
+        self._queue_transcription(finish, trace)
+
+    def _stop_recorder_if_running(self) -> None:
+        if self._recorder.process is not None:
+            self._stop_recording()
+
+    def _convert_raw_to_wav(self, raw_path: str, wav_path: str) -> None:
+        with open(raw_path, "rb") as raw_file, wave.open(wav_path, "wb") as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(self.sample_rate)
+            while True:
+                chunk = raw_file.read(8192)
+                if not chunk:
+                    break
+                wav_file.writeframes(chunk)
+
+    def _transcribe_audio(
+        self,
+        audio: AudioInput,
+        trace: Optional[DictationTrace] = None,
+        language: Optional[str] = None,
+        model: Optional[str] = None,
+        clip: Optional[int] = None,
+    ) -> str:
+        """Decode with the language/model captured when the clip was recorded (default: the current ones)."""
+        job_started = time.monotonic()
+        current_language, current_model = self._stt_selection()
+        language = language or current_language
+        model = model or current_model
+        close_preview = None
+        draft_model_for = getattr(self.stt_engine, "draft_model_for", None)
+        draft_model = draft_model_for(model) if draft_model_for is not None else ""
+        if draft_model:
+            close_preview = self._start_draft_preview(audio, trace, job_started, language, model, draft_model, clip)
+        was_loaded = getattr(self.stt_engine, "is_loaded", True)
+        audio_seconds = audio_duration_seconds(audio)
+        started = time.monotonic()
+        try:
+            return self.stt_engine.transcribe(audio, language=language, model=model)
+        finally:
+            ended = time.monotonic()
+            if close_preview is not None:
+                close_preview()
+            if isinstance(audio, str):
+                try:
+                    os.remove(audio)
+                except OSError:
+                    pass
+            if trace is not None:
+                decode_started = started
+                load_span = getattr(self.stt_engine, "load_span", None)
+                if not was_loaded and load_span is not None and load_span[1] >= started:
+                    trace.add_span("model_load", *load_span, model=model)
+                    decode_started = max(started, load_span[1])
+                rtf = (ended - decode_started) / audio_seconds if audio_seconds else None
+                decision = getattr(self.stt_engine, "last_decision", None)
+                trace.add_span(
+                    "transcribe",
+                    started,
+                    ended,
+                    audio_seconds=round(audio_seconds, 3) if audio_seconds else None,
+                    rtf=round(rtf, 4) if rtf is not None else None,
+                    load=decision.level if decision is not None else None,
+                    language=getattr(self.stt_engine, "last_language", None) if language == AUTO_LANGUAGE else None,
+                    fallback_model=decision.model if decision is not None else None,
+                )
+                trace.attributes["time_to_final_ms"] = round((ended - job_started) * 1000, 3)
+
+    def _start_draft_preview(
+        self,
+        audio: AudioInput,
+        trace: Optional[DictationTrace],
+        job_started: float,
+        language: str,
+        model: str,
+        draft_model: str,
+        clip: Optional[int] = None,
+    ) -> Optional[Callable[[], None]]:
+        """Decode with the draft model on its own thread, so the final decode never waits for it.
+
+        Returns the callable the worker runs once the final text is ready; a preview not posted
+        by then is dropped, since loop callbacks run in order and it would land after the final.
+        A preview for a clip behind one whose final is still pending is dropped too (see `_show_draft`).
+        """
+        # The worker deletes a file-mode WAV once the final decode is done; the draft reads its own copy.
+        samples = read_wav_samples(audio) if isinstance(audio, str) else audio
+        if samples is None:
+            return None
+        gate = threading.Lock()
+        final_ready = threading.Event()
+
+        def run() -> None:
+            preview = self.stt_engine.draft(samples, language=language, model=model)
+            ended = time.monotonic()
+            if trace is not None:
+                trace.add_span("draft", job_started, ended, model=draft_model, chars=len(preview or ""))
+                trace.attributes["time_to_draft_ms"] = round((ended - job_started) * 1000, 3)
+            with gate:
+                if preview and not final_ready.is_set():
+                    self._call_soon_threadsafe(lambda: self._show_draft(clip, preview))
+
+        def close() -> None:
+            with gate:
+                final_ready.set()
+
+        threading.Thread(target=run, name="stt-draft", daemon=True).start()
+        return close
+
+    def _show_draft(self, clip: Optional[int], preview: str) -> None:
+        # Only the clip next in delivery order owns the status row; a later clip's draft would
+        # otherwise replace it while an earlier clip's final is still on its way.
+        if clip is not None and clip != self._clips_delivered:
+            return
+        self._print_status(f"draft (refining): {preview}")
+
+    def _queue_clip(
+        self,
+        audio: AudioInput,
+        trace: Optional[DictationTrace],
+        language: str,
+        model: str,
+    ) -> None:
+        clip = self._clips_queued
+        self._queue_transcription(lambda: self._transcribe_audio(audio, trace, language, model, clip), trace)
+
+    def _queue_transcription(
+        self,
+        job: Callable[[], str],
+        trace: Optional[DictationTrace] = None,
+        on_done: Optional[Callable[[str, Optional[BaseException]], None]] = None,
+    ) -> None:
+        """Decode on the transcription worker; clips are delivered in the order they were recorded."""
+        deliver = on_done or self._on_transcription_done
+        self._clips_queued += 1
+
+        def finish(text: str, error: Optional[BaseException]) -> None:
+            self._clips_delivered += 1
+            self._finish_dictation(trace, deliver, text, error)
+
+        self._transcriptions.submit(job, finish)
+        self._print_transcribing_status()
+
+    def _finish_dictation(
+        self,
+        trace: Optional[DictationTrace],
+        deliver: Callable[[str, Optional[BaseException]], None],
+        text: str,
+        error: Optional[BaseException],
+    ) -> None:
+        if trace is None:
+            deliver(text, error)
+            return
+        with trace.span("pty_inject"):
+            deliver(text, error)
+        trace.attributes["outcome"] = "failed" if error is not None else ("transcribed" if text else "no_speech")
+        trace.attributes["text_chars"] = len(text or "")
+        self.tracer.emit(trace)
+
+    def _print_transcribing_status(self) -> None:
+        waiting = self._transcriptions.pending
+        if waiting > 1:
+            self._print_status(f"transcribing... ({waiting} clips queued)")
+        else:
+            self._print_status("transcribing...")
+
+    def _on_transcription_done(self, text: str, error: Optional[BaseException]) -> None:
+        if error is not None:
+            self._print_status(f"transcribe failed: {error}")
+            return
+        self._deliver_transcript(text)
+
+    def _deliver_transcript(self, text: str) -> None:
+        if not text:
+            self._print_status("no speech detected.")
+            return
+        self._append_transcript_draft(text)
+        self._print_status("transcript updated.")
+
+        if self.auto_send and self._master_fd is not None:
+            write_all(self._master_fd, (text + " ").encode("utf-8", errors="ignore"))
+            self._print_status(f"appended to {self.agent_label} draft; press Enter to send.")
+
+    def _append_transcript_draft(self, text: str) -> str:
+        incoming = (text or "").strip()
+        if not incoming:
+            return self._transcript_draft
+        if self._transcript_draft:
+            self._transcript_draft = f"{self._transcript_draft} {incoming}"
+        else:
+            self._transcript_draft = incoming
+        return self._transcript_draft
+
+    def _print_status(self, message: str) -> None:
+        text = f"[{self.status_label}] {message}".replace("\r", " ").replace("\n", " ")
+        self._status_message = text
+        self._render_status_overlay(text)
+
+    def _clear_status(self) -> None:
+        self._status_message = ""
+        self._render_status_overlay("")
+
+    def _render_status_overlay(self, text: str) -> None:
+        if not sys.stdout.isatty():
+            if text:
+                sys.stdout.write(f"\r\n{text}\r\n")
+                sys.stdout.flush()
+            return
+        try:
+            cols, rows = shutil.get_terminal_size(fallback=(120, 30))
+            clipped = text[: max(0, cols - 1)]
+            payload = (
+                "\x1b7"
+                f"\x1b[{rows};1H"
+                "\x1b[2K"
+                f"{clipped}"
+                "\x1b8"
+            )
+            write_all(sys.stdout.fileno(), payload.encode("utf-8", errors="ignore"))
+        except Exception:
+            if text:
+                sys.stdout.write(f"\r\n{text}\r\n")
+                sys.stdout.flush()
+
+
+def resolve_fallback_model(value: str, model: str) -> str:
+    """Empty picks the tiny checkpoint matching `model`; `none` disables model fallback."""
+    value = (value or "").strip()
+    if value.lower() == "none":
+        return ""
+    return value or default_fallback_model(model)
+
+
+def resolve_draft_model(value: str, model: str) -> str:
+    """`auto` picks the tiny checkpoint matching `model`; empty or `none` disables drafts."""
+    value = (value or "").strip()
+    if value.lower() in ("", "none"):
+        return ""
+    if value.lower() == "auto":
+        return default_fallback_model(model)
+    return value
+
+
+def profile_rule_argument(value: str) -> list[ProfileRule]:
+    try:
+        return parse_profile_rule(value)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(str(error)) from error
+
+
+def cpu_list_argument(value: str) -> frozenset[int]:
+    try:
+        return parse_cpu_list(value)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(str(error)) from error
+
+
+def add_bridge_arguments(parser: argparse.ArgumentParser) -> None:
+    """Recorder and STT flags shared by every entry point that hosts agent PTYs."""
+    parser.add_argument(
+        "--stt-language",
+        dest="language",
+        default=DEFAULT_LANGUAGE,
+        help="STT language code, or 'auto' to detect it once per session.",
+    )
+    parser.add_argument("--lang-code", dest="language", default=argparse.SUPPRESS, help="Alias for --stt-language.")
+    parser.add_argument("--stt-model", dest="model", default=DEFAULT_MODEL, help="STT model name (for faster-whisper).")
+    parser.add_argument("--stt-device", dest="device", default=DEFAULT_DEVICE, help="STT device (cpu|auto|cuda).")
+    parser.add_argument("--stt-compute-type", dest="compute_type", default=DEFAULT_COMPUTE_TYPE, help="STT compute type.")
+    parser.add_argument(
+        "--stt-profile",
+        choices=sorted(DECODE_PROFILES),
+        default=normalize_profile_name(DEFAULT_PROFILE),
+        help="Decoding preset: fastest (greedy, no fallback), balanced (default) or accurate (beam search).",
+    )
+    parser.add_argument(
+        "--stt-profile-rule",
+        type=profile_rule_argument,
+        default=DEFAULT_PROFILE_RULE,
+        help="Switch profile by clip length, e.g. 'accurate<4,fastest>20' (first match wins).",
+    )
+    parser.add_argument(
+        "--stt-batch-size",
+        type=int,
+        default=DEFAULT_STT_BATCH_SIZE,
+        help="Clips over 30s are cut at pauses and decoded this many chunks at a time (below 2 disables).",
+    )
+    parser.add_argument(
+        "--stt-adaptive",
+        action=argparse.BooleanOptionalAction,
+        default=DEFAULT_STT_ADAPTIVE,
+        help="Check host load and agent CPU before each clip; decode faster, or with a smaller model, when busy.",
+    )
+    parser.add_argument(
+        "--stt-fallback-model",
+        default=DEFAULT_STT_FALLBACK_MODEL,
+        help="Model used by --stt-adaptive when every core is busy (default: tiny/tiny.en; 'none' disables).",
+    )
+    parser.add_argument(
+        "--stt-draft-model",
+        default=DEFAULT_STT_DRAFT_MODEL,
+        help="Small model whose quick pass is shown as a preview while --model decodes ('auto' = tiny/tiny.en).",
+    )
+    parser.add_argument(
+        "--stt-languages",
+        default=DEFAULT_STT_LANGUAGES,
+        help="Languages the language key cycles through, e.g. 'en,zh' or 'en:small.en,zh:medium'.",
+    )
+    parser.add_argument(
+        "--stt-detect-threshold",
+        type=float,
+        default=DEFAULT_STT_DETECT_THRESHOLD,
+        help="With --stt-language auto, keep a detected language for the session from this probability up.",
+    )
+    parser.add_argument(
+        "--language-key",
+        choices=sorted(LANGUAGE_KEY_BYTES),
+        default=DEFAULT_LANGUAGE_KEY if DEFAULT_LANGUAGE_KEY in LANGUAGE_KEY_BYTES else "ctrl-^",
+        help="Hotkey that switches to the next --stt-languages entry.",
+    )
+    parser.add_argument(
+        "--stt-model-cache-mb",
+        type=int,
+        default=DEFAULT_STT_MODEL_CACHE_MB,
+        help="Memory budget for models kept loaded after a language/model switch (least recently used go first).",
+    )
+    parser.add_argument(
+        "--stt-idle-unload-minutes",
+        type=float,
+        default=DEFAULT_STT_IDLE_UNLOAD_MINUTES,
+        help="Release the STT model after this many minutes without dictation (0 keeps it loaded).",
+    )
+    parser.add_argument(
+        "--stt-threads",
+        type=int,
+        default=DEFAULT_STT_THREADS,
+        help="CTranslate2 intra-op threads per transcription (0 = decoding profile's choice).",
+    )
+    parser.add_argument(
+        "--stt-workers",
+        type=int,
+        default=DEFAULT_STT_WORKERS,
+        help="CTranslate2 inter-op workers, i.e. concurrent transcriptions (0 = decoding profile's choice).",
+    )
+    parser.add_argument(
+        "--stt-cpus",
+        type=cpu_list_argument,
+        default=DEFAULT_STT_CPUS,
+        help="Pin in-process STT threads to these CPUs, e.g. '4-7' (Linux).",
+    )
+    parser.add_argument(
+        "--stt-nice",
+        type=int,
+        default=DEFAULT_STT_NICE,
+        help="Niceness (0-19) for in-process STT threads only; the PTY loop keeps its priority (Linux).",
+    )
+    parser.add_argument(
+        "--recorder-nice",
+        type=int,
+        default=DEFAULT_RECORDER_NICE,
+        help="Niceness for the recorder process; negative values raise its priority and need CAP_SYS_NICE.",
+    )
+    parser.add_argument(
+        "--record-source",
+        default=DEFAULT_RECORD_SOURCE,
+        help="Audio input source selector (Pulse source on Linux, audio index on macOS).",
+    )
+    parser.add_argument("--sample-rate", default=DEFAULT_SAMPLE_RATE, type=int, help="Recording sample rate.")
+    parser.add_argument(
+        "--no-auto-send",
+        action="store_true",
+        help="Do not auto-send transcript to Claude; print transcript only.",
+    )
+    parser.add_argument(
+        "--record-key",
+        choices=sorted(RECORD_KEY_CHOICES),
+        default=normalize_record_key(DEFAULT_RECORD_KEY),
+        help="Hotkey used to start/stop recording.",
+    )
+    parser.add_argument(
+        "--capture-mode",
+        choices=sorted(CAPTURE_MODE_CHOICES),
+        default=normalize_capture_mode(DEFAULT_CAPTURE_MODE),
+        help="Hand audio to STT from an in-memory pipe buffer (memory) or via temp raw/WAV files (file).",
+    )
+    parser.add_argument(
+        "--streaming",
+        action=argparse.BooleanOptionalAction,
+        default=DEFAULT_STREAMING,
+        help="Transcribe pause-bounded chunks while still recording (memory capture mode only).",
+    )
+    parser.add_argument(
+        "--live-partials",
+        action=argparse.BooleanOptionalAction,
+        default=DEFAULT_LIVE_PARTIALS,
+        help="Show a rolling partial transcript on the status row while recording (implies --streaming).",
+    )
+    parser.add_argument(
+        "--preload",
+        action=argparse.BooleanOptionalAction,
+        default=DEFAULT_PRELOAD,
+        help="Load the STT model in the background at startup instead of on the first recording.",
+    )
+    parser.add_argument(
+        "--armed",
+        action=argparse.BooleanOptionalAction,
+        default=DEFAULT_ARMED,
+        help="Keep the recorder running between recordings so capture starts instantly (memory capture mode).",
+    )
+    parser.add_argument(
+        "--pre-roll-ms",
+        type=int,
+        default=DEFAULT_PRE_ROLL_MS,
+        help=f"Audio from before the hotkey press (armed) or speech onset (hands-free) to include (max {MAX_PRE_ROLL_MS}).",
+    )
+    parser.add_argument(
+        "--hands-free",
+        action=argparse.BooleanOptionalAction,
+        default=DEFAULT_HANDS_FREE,
+        help="Listen continuously and transcribe each utterance when speech stops; the hotkey pauses listening.",
+    )
+    parser.add_argument(
+        "--end-silence-ms",
+        type=int,
+        default=DEFAULT_END_SILENCE_MS,
+        help="Hands-free mode: silence that ends an utterance.",
+    )
+    parser.add_argument(
+        "--stt-service",
+        action=argparse.BooleanOptionalAction,
+        default=DEFAULT_STT_SERVICE,
+        help="Use the shared STT daemon (stt_server.py) when it is running; falls back to in-process STT.",
+    )
+    parser.add_argument(
+        "--stt-socket",
+        default=default_socket_path(),
+        help="Unix socket of the shared STT daemon.",
+    )
+    parser.add_argument(
+        "--trim-silence",
+        action=argparse.BooleanOptionalAction,
+        default=DEFAULT_TRIM_SILENCE,
+        help="Trim leading/trailing silence before STT and skip the model when no speech was captured.",
+    )
+    parser.add_argument(
+        "--speech-rms-floor",
+        type=float,
+        default=DEFAULT_SPEECH_RMS_FLOOR,
+        help="Lowest frame RMS (0-1) counted as speech by trimming and hands-free mode; lower it for a quiet microphone.",
+    )
+    parser.add_argument(
+        "--trace-file",
+        default=DEFAULT_TRACE_FILE,
+        help="Append per-dictation stage timings to this file as JSON lines.",
+    )
+    parser.add_argument(
+        "--chrome-trace",
+        default=DEFAULT_CHROME_TRACE,
+        help="Also append stage spans as Chrome trace events (open in chrome://tracing or Perfetto).",
+    )
+
+
+def bridge_options(args: argparse.Namespace, audio_backend: AudioCaptureBackend) -> dict:
+    """Constructor keyword arguments for a bridge built from `add_bridge_arguments` flags."""
+    language, model, stt_notice = resolve_stt_profile(language=args.language, model=args.model)
+    if stt_notice:
+        sys.stderr.write(f"[voice-claude] {stt_notice}\n")
+    return dict(
+        language=language,
+        model=model,
+        device=args.device,
+        compute_type=args.compute_type,
+        record_source=args.record_source,
+        sample_rate=args.sample_rate,
+        auto_send=not args.no_auto_send,
+        record_key=args.record_key,
+        audio_backend=audio_backend,
+        capture_mode=args.capture_mode,
+        streaming=args.streaming,
+        live_partials=args.live_partials,
+        preload=args.preload,
+        armed=args.armed,
+        pre_roll_ms=args.pre_roll_ms,
+        stt_socket=args.stt_socket if args.stt_service else None,
+        stt_profile=args.stt_profile,
+        stt_profile_rules=args.stt_profile_rule,
+        cpu_budget=CpuBudget(
+            threads=max(0, args.stt_threads),
+            workers=max(0, args.stt_workers),
+            cpus=args.stt_cpus,
+            nice=max(0, min(args.stt_nice, 19)),
+        ),
+        recorder_nice=args.recorder_nice,
+        adaptive_stt=args.stt_adaptive,
+        fallback_model=args.stt_fallback_model,
+        stt_batch_size=args.stt_batch_size,
+        draft_model=args.stt_draft_model,
+        language_choices=parse_language_choices(args.stt_languages, language=language, model=model),
+        language_key=args.language_key,
+        model_cache_bytes=max(0, args.stt_model_cache_mb) * 1024 * 1024,
+        detect_threshold=args.stt_detect_threshold,
+        idle_unload_minutes=args.stt_idle_unload_minutes,
+        tracer=TraceRecorder(jsonl_path=args.trace_file, chrome_trace_path=args.chrome_trace),
+        trim_silence=args.trim_silence,
+        speech_rms_floor=args.speech_rms_floor,
+        hands_free=args.hands_free,
+        end_silence_ms=args.end_silence_ms,
+    )
+
+
+def default_audio_backend() -> AudioCaptureBackend:
+    source_cache = CaptureSourceCache(default_source_cache_path()) if DEFAULT_SOURCE_CACHE else None
+    return select_audio_backend(source_cache=source_cache)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Run Claude in PTY with voice hotkey support.",
+        add_help=False,
+    )
+    parser.add_argument("--command", default=DEFAULT_CLAUDE_CMD, help="Command used to start Claude.")
+    add_bridge_arguments(parser)
+    args, unknown = parser.parse_known_args()
+    args.claude_args = unknown
+    return args
+
+
+def is_help_request(args: list[str]) -> bool:
+    return "-h" in args or "--help" in args
+
+
+def main() -> int:
+    args = parse_args()
+    claude_command = compose_claude_command(args.command, args.claude_args)
+    if is_help_request(args.claude_args):
+        result = subprocess.run(["bash", "-c", claude_command], check=False)
+        return result.returncode
+    bridge = VoiceClaudeCliBridge(claude_command=claude_command, **bridge_options(args, default_audio_backend()))
+    try:
+        return bridge.run()
+    except RuntimeError as error:
+        sys.stderr.write(f"voice-claude error: {error}\n")
+        return 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+import os
+import shutil
+import sys
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+
+def usable_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def parse_cpu_list(spec: str) -> frozenset[int]:
+    """Parse a Linux-style CPU list such as `0-3,6`; empty means no restriction."""
+    cpus: set[int] = set()
+    for item in (spec or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        first, separator, last = item.partition("-")
+        try:
+            start = int(first)
+            end = int(last) if separator else start
+        except ValueError as error:
+            raise ValueError(f"invalid cpu list entry '{item}'; expected N or N-M.") from error
+        if start < 0 or end < start:
+            raise ValueError(f"invalid cpu range '{item}'.")
+        cpus.update(range(start, end + 1))
+    return frozenset(cpus)
+
+
+def nice_allowed(value: int) -> bool:
+    """Whether this process may lower a niceness to `value` (raising it is always allowed)."""
+    if value >= 0:
+        return True
+    if hasattr(os, "geteuid") and os.geteuid() == 0:
+        return True
+    try:
+        import resource
+
+        soft, _hard = resource.getrlimit(resource.RLIMIT_NICE)
+    except (ImportError, AttributeError, OSError, ValueError):
+        return False
+    # RLIMIT_NICE is expressed as 20 - nice, so a limit of 25 permits nice -5.
+    return soft == resource.RLIM_INFINITY or value >= 20 - soft
+
+
+def prioritized_command(command: list[str], nice: int) -> list[str]:
+    """Prefix `command` with `nice -n` so every thread the recorder starts inherits the priority."""
+    if not nice or not command:
+        return command
+    nice_path = shutil.which("nice")
+    if nice_path is None:
+        return command
+    return [nice_path, "-n", str(nice), *command]
+
+
+@dataclass(frozen=True)
+class CpuBudget:
+    """How much of the machine in-process STT may use.
+
+    `threads`/`workers` override the decoding profile's CTranslate2 intra/inter-op counts
+    (0 keeps the profile). `cpus` and `nice` are applied to each thread that loads or runs
+    the model; on Linux both are per-thread and inherited by the threads CTranslate2 spawns,
+    so the PTY loop and the recorder reader keep their normal priority.
+    """
+
+    threads: int = 0
+    workers: int = 0
+    cpus: frozenset[int] = frozenset()
+    nice: int = 0
+
+    def model_kwargs(self, profile_kwargs: dict) -> dict:
+        kwargs = dict(profile_kwargs)
+        if self.threads > 0:
+            kwargs["cpu_threads"] = self.threads
+        elif self.cpus and kwargs.get("cpu_threads", 0) > len(self.cpus):
+            # More threads than pinned cores only adds context switches.
+            kwargs["cpu_threads"] = len(self.cpus)
+        if self.workers > 0:
+            kwargs["num_workers"] = self.workers
+        return kwargs
+
+    @property
+    def restricts_thread(self) -> bool:
+        return bool(self.cpus) or self.nice > 0
+
+    def apply_to_current_thread(self) -> Optional[str]:
+        """Best effort; returns a description of what could not be applied, if anything."""
+        return self._apply(whole_process=False)
+
+    def apply_to_process(self) -> Optional[str]:
+        """Like `apply_to_current_thread`, for processes that only run STT (call before starting threads)."""
+        return self._apply(whole_process=True)
+
+    def _apply(self, whole_process: bool) -> Optional[str]:
+        problems = []
+        if self.cpus:
+            try:
+                os.sched_setaffinity(0, self.cpus)
+            except AttributeError:
+                problems.append("cpu affinity is not supported on this platform")
+            except OSError as error:
+                problems.append(f"cpu affinity {sorted(self.cpus)} rejected: {error}")
+        if self.nice > 0 and not whole_process and not sys.platform.startswith("linux"):
+            # Elsewhere niceness is per process and would slow the PTY loop down with it.
+            problems.append("per-thread nice is only supported on Linux; renice the stt daemon instead")
+        elif self.nice > 0:
+            try:
+                # With pid 0, Linux applies the nice value to the calling thread only; threads it
+                # starts later inherit it.
+                current = os.getpriority(os.PRIO_PROCESS, 0)
+                if current < self.nice:
+                    os.setpriority(os.PRIO_PROCESS, 0, self.nice)
+            except (AttributeError, OSError) as error:
+                problems.append(f"nice {self.nice} rejected: {error}")
+        return "; ".join(problems) or None
+
+
+class ThreadBudgetGuard:
+    """Applies a CpuBudget once per thread, so callers can invoke it on every model call."""
+
+    def __init__(self, budget: CpuBudget):
+        self.budget = budget
+        self.last_problem: Optional[str] = None
+        self._applied = threading.local()
+
+    def ensure(self) -> None:
+        if not self.budget.restricts_thread or getattr(self._applied, "done", False):
+            return
+        self._applied.done = True
+        problem = self.budget.apply_to_current_thread()
+        if problem:
+            self.last_problem = problem
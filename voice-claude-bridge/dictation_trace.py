@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+
+class DictationTrace:
+    """Timing spans for one dictation, from hotkey press to PTY injection.
+
+    Spans use `time.monotonic()`; they may be added from the PTY loop and from the
+    transcription worker, so mutation is locked.
+    """
+
+    def __init__(self, dictation_id: int):
+        self.dictation_id = dictation_id
+        self.started_wall = time.time()
+        self.started = time.monotonic()
+        self.attributes: dict = {}
+        self.spans: list[dict] = []
+        self._lock = threading.Lock()
+
+    def add_span(self, name: str, start: float, end: float, **attributes) -> None:
+        span = {"name": name, "start": start, "end": max(start, end)}
+        span.update({key: value for key, value in attributes.items() if value is not None})
+        with self._lock:
+            self.spans.append(span)
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[dict]:
+        """Time the block; the yielded dict collects attributes known only inside it."""
+        extra: dict = {}
+        start = time.monotonic()
+        try:
+            yield extra
+        finally:
+            self.add_span(name, start, time.monotonic(), **{**attributes, **extra})
+
+    def to_record(self) -> dict:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span["start"])
+        record = {
+            "dictation": self.dictation_id,
+            "started_at": round(self.started_wall, 6),
+            "total_ms": round((max((span["end"] for span in spans), default=self.started) - self.started) * 1000, 3),
+            "spans": [],
+        }
+        record.update(self.attributes)
+        for span in spans:
+            entry = {
+                key: value for key, value in span.items() if key not in {"start", "end"}
+            }
+            entry["start_ms"] = round((span["start"] - self.started) * 1000, 3)
+            entry["duration_ms"] = round((span["end"] - span["start"]) * 1000, 3)
+            record["spans"].append(entry)
+        return record
+
+
+class TraceRecorder:
+    """Writes finished dictations as JSON lines and, optionally, Chrome trace events.
+
+    The Chrome file uses the JSON array format without the closing bracket, which
+    chrome://tracing and Perfetto accept, so events can be appended as they finish.
+    """
+
+    def __init__(self, jsonl_path: str = "", chrome_trace_path: str = ""):
+        self.jsonl_path = jsonl_path
+        self.chrome_trace_path = chrome_trace_path
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.jsonl_path or self.chrome_trace_path)
+
+    def begin(self) -> DictationTrace:
+        return DictationTrace(next(self._ids))
+
+    def emit(self, trace: Optional[DictationTrace]) -> None:
+        if trace is None or not self.enabled:
+            return
+        record = trace.to_record()
+        with self._lock:
+            try:
+                if self.jsonl_path:
+                    with open(self.jsonl_path, "a", encoding="utf-8") as handle:
+                        handle.write(json.dumps(record) + "\n")
+                if self.chrome_trace_path:
+                    self._append_chrome_events(trace, record)
+            except OSError:
+                # Tracing must never break dictation.
+                pass
+
+    def _append_chrome_events(self, trace: DictationTrace, record: dict) -> None:
+        fresh = not os.path.exists(self.chrome_trace_path) or os.path.getsize(self.chrome_trace_path) == 0
+        started_us = trace.started_wall * 1_000_000
+        with open(self.chrome_trace_path, "a", encoding="utf-8") as handle:
+            if fresh:
+                handle.write("[\n")
+            for span in record["spans"]:
+                args = {key: value for key, value in span.items() if key not in {"name", "start_ms", "duration_ms"}}
+                event = {
+                    "name": span["name"],
+                    "cat": "dictation",
+                    "ph": "X",
+                    "ts": round(started_us + span["start_ms"] * 1000, 1),
+                    "dur": round(span["duration_ms"] * 1000, 1),
+                    "pid": self._pid,
+                    "tid": trace.dictation_id,
+                    "args": args,
+                }
+                handle.write(json.dumps(event) + ",\n")
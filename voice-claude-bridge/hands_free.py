@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+import subprocess
+import threading
+from typing import Callable, Optional
+
+import numpy as np
+
+from pcm_capture import PCM_SAMPLE_WIDTH, PIPE_READ_CHUNK_BYTES, resample_to_whisper_rate
+from vad import StreamingEndpointer
+
+
+class HandsFreeListener:
+    """Keeps a recorder open and hands each end-pointed utterance (16 kHz float32) to a callback.
+
+    `on_utterance` runs on the reader thread; callers marshal it to their own loop.
+    """
+
+    def __init__(
+        self,
+        command: list[str],
+        sample_rate: int,
+        endpointer: StreamingEndpointer,
+        on_utterance: Callable[[np.ndarray], None],
+    ):
+        self.command = command
+        self.sample_rate = sample_rate
+        self.endpointer = endpointer
+        self.on_utterance = on_utterance
+        self.process: Optional[subprocess.Popen] = None
+        self._paused = threading.Event()
+        self._reader: Optional[threading.Thread] = None
+
+    @property
+    def paused(self) -> bool:
+        return self._paused.is_set()
+
+    def pause(self) -> None:
+        self._paused.set()
+
+    def resume(self) -> None:
+        self._paused.clear()
+
+    def is_running(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def start(self) -> None:
+        self.process = subprocess.Popen(
+            self.command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=0,
+            text=False,
+        )
+        self._reader = threading.Thread(target=self._listen, name="hands-free-listener", daemon=True)
+        self._reader.start()
+
+    def _listen(self) -> None:
+        process = self.process
+        if process is None or process.stdout is None:
+            return
+        scratch = bytearray(PIPE_READ_CHUNK_BYTES)
+        carry = b""
+        was_paused = False
+        while True:
+            try:
+                count = process.stdout.readinto(scratch)
+            except (OSError, ValueError):
+                break
+            if not count:
+                break
+            if self._paused.is_set():
+                # Keep draining the pipe so the recorder never blocks, but drop the audio.
+                was_paused = True
+                continue
+            if was_paused:
+                self.endpointer.reset()
+                carry = b""
+                was_paused = False
+            data = carry + bytes(scratch[:count])
+            usable = len(data) - len(data) % PCM_SAMPLE_WIDTH
+            carry = data[usable:]
+            samples = np.frombuffer(data, dtype="<i2", count=usable // PCM_SAMPLE_WIDTH).astype(np.float32)
+            samples /= 32768.0
+            for utterance in self.endpointer.feed(samples):
+                self.on_utterance(resample_to_whisper_rate(utterance, sample_rate=self.sample_rate))
+
+    def stop(self) -> None:
+        process = self.process
+        if process is None:
+            return
+        if process.poll() is None:
+            try:
+                process.terminate()
+                process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait(timeout=1)
+        if self._reader is not None:
+            self._reader.join(timeout=2)
+        if process.stdout is not None:
+            try:
+                process.stdout.close()
+            except OSError:
+                pass
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+import threading
+from typing import Iterable, Optional
+
+
+AUTO_LANGUAGE = "auto"
+DEFAULT_DETECT_THRESHOLD = 0.7
+# Whisper's own temperature-fallback cutoff: below this the decode is likely in the wrong language.
+DOUBT_AVG_LOGPROB = -1.0
+
+
+def multilingual_model(model: str) -> str:
+    """The multilingual counterpart of an English-only `.en` checkpoint.
+
+    tiny and base are too weak outside English, so they move up to small.
+    """
+    if not model.lower().endswith(".en"):
+        return model
+    base = model[: -len(".en")]
+    return "small" if base.lower() in {"tiny", "base"} else base
+
+
+def pick_language(
+    detections: Iterable[tuple[str, float]],
+    candidates: frozenset[str] = frozenset(),
+) -> Optional[tuple[str, float]]:
+    """Most probable (language, probability), renormalized over `candidates` when given."""
+    ranked = [(language, probability) for language, probability in detections if not candidates or language in candidates]
+    if not ranked:
+        return None
+    language, probability = max(ranked, key=lambda item: item[1])
+    if candidates:
+        total = sum(item[1] for item in ranked)
+        probability = probability / total if total > 0 else 0.0
+    return language, probability
+
+
+class StickyLanguage:
+    """The session language in `auto` mode: detected once, then reused for every clip.
+
+    A detection below `threshold` is used for its own clip but not kept, so the next clip
+    detects again. `doubts` flags decodes whose confidence suggests the speaker switched.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_DETECT_THRESHOLD, doubt_avg_logprob: float = DOUBT_AVG_LOGPROB):
+        self.threshold = threshold
+        self.doubt_avg_logprob = doubt_avg_logprob
+        self.probability = 0.0
+        self._language: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def language(self) -> Optional[str]:
+        with self._lock:
+            return self._language
+
+    def observe(self, language: str, probability: float) -> None:
+        with self._lock:
+            self.probability = probability
+            self._language = language if probability >= self.threshold else None
+
+    def doubts(self, avg_logprob: Optional[float]) -> bool:
+        return avg_logprob is not None and avg_logprob < self.doubt_avg_logprob
+
+    def forget(self) -> None:
+        with self._lock:
+            self._language = None
+            self.probability = 0.0
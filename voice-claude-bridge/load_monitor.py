@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from cpu_budget import usable_cpus
+
+
+LOAD_NORMAL = "normal"
+LOAD_BUSY = "busy"
+LOAD_SATURATED = "saturated"
+
+
+@dataclass(frozen=True)
+class LoadSnapshot:
+    load_1m: Optional[float]
+    cpus: int
+    agent_cores: float = 0.0
+
+    @property
+    def pressure(self) -> float:
+        """Runnable work per usable core over the last minute (1.0 = every core busy)."""
+        if self.load_1m is None:
+            return 0.0
+        return self.load_1m / max(1, self.cpus)
+
+
+def read_load_average(proc_root: str = "/proc") -> Optional[float]:
+    try:
+        with open(os.path.join(proc_root, "loadavg"), "r", encoding="ascii") as handle:
+            return float(handle.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        return os.getloadavg()[0]
+    except (AttributeError, OSError):
+        return None
+
+
+def read_process_cpu_seconds(pid: int, proc_root: str = "/proc") -> Optional[float]:
+    """utime + stime of `pid` plus its reaped children, from /proc/<pid>/stat."""
+    try:
+        with open(os.path.join(proc_root, str(pid), "stat"), "r", encoding="ascii", errors="replace") as handle:
+            raw = handle.read()
+    except OSError:
+        return None
+    # The command name may contain spaces or parentheses; fields resume after the last ')'.
+    fields = raw[raw.rfind(")") + 2 :].split()
+    try:
+        ticks = sum(int(value) for value in fields[11:15])
+    except (ValueError, IndexError):
+        return None
+    return ticks / float(os.sysconf("SC_CLK_TCK"))
+
+
+def process_tree(pid: int, proc_root: str = "/proc", limit: int = 256) -> list[int]:
+    """`pid` and its live descendants (builds and tools an agent starts count as agent load)."""
+    tree = [pid]
+    index = 0
+    while index < len(tree) and len(tree) < limit:
+        current = tree[index]
+        index += 1
+        try:
+            task_dir = os.path.join(proc_root, str(current), "task")
+            for task in os.listdir(task_dir):
+                with open(os.path.join(task_dir, task, "children"), "r", encoding="ascii") as handle:
+                    tree.extend(int(child) for child in handle.read().split())
+        except (OSError, ValueError):
+            continue
+    return tree[:limit]
+
+
+class LoadMonitor:
+    """Samples host load and the agents' CPU use; cheap enough to call before every clip."""
+
+    def __init__(
+        self,
+        agent_pids: Callable[[], list[int]] = lambda: [],
+        proc_root: str = "/proc",
+        cpus: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.agent_pids = agent_pids
+        self.proc_root = proc_root
+        self.cpus = cpus or usable_cpus()
+        self.clock = clock
+        self._last_cpu: dict[int, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> LoadSnapshot:
+        return LoadSnapshot(
+            load_1m=read_load_average(self.proc_root),
+            cpus=self.cpus,
+            agent_cores=self._agent_cores(),
+        )
+
+    def mark(self) -> None:
+        """Start a new agent CPU window, e.g. when recording starts, so the next snapshot covers it."""
+        self._agent_cores()
+
+    def _agent_cores(self) -> float:
+        """Cores the agents used since the previous snapshot (0.0 on the first one)."""
+        now = self.clock()
+        total = 0.0
+        with self._lock:
+            seen = {}
+            for pid in {member for root in self.agent_pids() for member in process_tree(root, self.proc_root)}:
+                cpu_seconds = read_process_cpu_seconds(pid, self.proc_root)
+                if cpu_seconds is None:
+                    continue
+                seen[pid] = (now, cpu_seconds)
+                previous = self._last_cpu.get(pid)
+                if previous is not None and now > previous[0]:
+                    total += max(0.0, cpu_seconds - previous[1]) / (now - previous[0])
+            self._last_cpu = seen
+        return total
+
+
+@dataclass(frozen=True)
+class LoadDecision:
+    level: str
+    profile: Optional[str] = None
+    model: Optional[str] = None
+    threads: int = 0
+
+
+class AdaptivePolicy:
+    """Maps a load snapshot to decoding choices that keep transcription latency bounded.
+
+    busy: the host is mostly occupied or an agent is burning at least a core, so decode with the
+    `fastest` profile on the already-loaded model. saturated: every core is taken, so also move
+    to the small fallback model, loaded with only the cores that are left.
+    """
+
+    def __init__(
+        self,
+        fallback_model: str = "",
+        busy_pressure: float = 0.7,
+        saturated_pressure: float = 1.0,
+        agent_busy_cores: float = 1.0,
+        max_fallback_threads: int = 2,
+    ):
+        self.fallback_model = fallback_model
+        self.busy_pressure = busy_pressure
+        self.saturated_pressure = saturated_pressure
+        self.agent_busy_cores = agent_busy_cores
+        self.max_fallback_threads = max_fallback_threads
+
+    def decide(self, snapshot: LoadSnapshot) -> LoadDecision:
+        if snapshot.pressure >= self.saturated_pressure:
+            idle_cores = snapshot.cpus - math.ceil(snapshot.load_1m or 0.0)
+            return LoadDecision(
+                level=LOAD_SATURATED,
+                profile="fastest",
+                model=self.fallback_model or None,
+                threads=max(1, min(self.max_fallback_threads, idle_cores)),
+            )
+        if snapshot.pressure >= self.busy_pressure or snapshot.agent_cores >= self.agent_busy_cores:
+            return LoadDecision(level=LOAD_BUSY, profile="fastest")
+        return LoadDecision(level=LOAD_NORMAL)
+
+
+def default_fallback_model(model: str) -> str:
+    """The smallest checkpoint that still covers the primary model's languages."""
+    name = (model or "").strip()
+    if name.startswith("tiny"):
+        return ""
+    return "tiny.en" if name.endswith(".en") else "tiny"
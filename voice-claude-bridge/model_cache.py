@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+import ctypes
+import ctypes.util
+import os
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+
+# Parameter counts of the Whisper checkpoints; `.en` variants have the same size.
+MODEL_PARAMETERS = {
+    "tiny": 39_000_000,
+    "base": 74_000_000,
+    "small": 244_000_000,
+    "medium": 769_000_000,
+    "large": 1_550_000_000,
+    "turbo": 809_000_000,
+    "distil-small": 166_000_000,
+    "distil-medium": 394_000_000,
+    "distil-large": 756_000_000,
+}
+BYTES_PER_PARAMETER = {"int8": 1, "int8_float16": 1, "int8_bfloat16": 1, "float16": 2, "bfloat16": 2, "float32": 4}
+
+
+def estimate_model_bytes(model: str, compute_type: str) -> int:
+    """Rough weight size of a checkpoint; 0 for unknown names (e.g. a local path)."""
+    name = os.path.basename((model or "").rstrip("/")).lower()
+    name = name.removeprefix("faster-whisper-").removesuffix(".en")
+    params = 0
+    # Longest prefix first, so `distil-large-v3` is not mistaken for `large`.
+    for prefix in sorted(MODEL_PARAMETERS, key=len, reverse=True):
+        if name.startswith(prefix):
+            params = MODEL_PARAMETERS[prefix]
+            break
+    if name.startswith("large") and "turbo" in name:
+        params = MODEL_PARAMETERS["turbo"]
+    return params * BYTES_PER_PARAMETER.get((compute_type or "").lower(), 2)
+
+
+def resident_bytes() -> int:
+    """Resident set size of this process from /proc/self/statm; 0 where that is unavailable."""
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return 0
+
+
+def release_freed_memory() -> bool:
+    """Ask glibc to hand freed heap pages back to the OS; False where that is not possible.
+
+    Dropping a model frees its weights, but without a trim the allocator keeps much of that
+    memory mapped, so resident size would not go down.
+    """
+    library = ctypes.util.find_library("c")
+    if not library:
+        return False
+    try:
+        return bool(ctypes.CDLL(library).malloc_trim(0))
+    except (OSError, AttributeError):
+        return False
+
+
+class ModelCache:
+    """Loaded models in least-recently-used order, bounded by their combined size.
+
+    Storing or touching a model makes it the most recent; once the total exceeds `max_bytes`,
+    the oldest entries are dropped, but the newest one is always kept. Dropping only releases
+    the cache's reference, so a decode already running on an evicted model finishes normally.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max(0, int(max_bytes))
+        self._entries: "OrderedDict[Hashable, tuple[object, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(size for _model, size in self._entries.values())
+
+    def keys(self) -> list[Hashable]:
+        """Oldest first."""
+        with self._lock:
+            return list(self._entries)
+
+    def get(self, key: Hashable) -> Optional[object]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: Hashable, model: object, size_bytes: int) -> list[Hashable]:
+        """Store `model` as the most recent entry; returns the keys evicted to make room."""
+        evicted = []
+        with self._lock:
+            self._entries[key] = (model, max(0, int(size_bytes)))
+            self._entries.move_to_end(key)
+            total = sum(size for _model, size in self._entries.values())
+            while total > self.max_bytes and len(self._entries) > 1:
+                old_key, (_old_model, old_size) = self._entries.popitem(last=False)
+                total -= old_size
+                evicted.append(old_key)
+        return evicted
+
+    def clear(self) -> int:
+        """Drop every entry; returns how many there were."""
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+        return count
+
+    def discard(self, key: Hashable) -> Optional[object]:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return entry[0] if entry is not None else None
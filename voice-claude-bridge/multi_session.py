@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+import argparse
+import fcntl
+import os
+import pty
+import selectors
+import signal
+import struct
+import subprocess
+import sys
+import termios
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from cli import (
+    PTY_MAX_BYTES_PER_WAKEUP,
+    VoiceClaudeCliBridge,
+    add_bridge_arguments,
+    bridge_options,
+    default_audio_backend,
+    write_all,
+)
+
+
+KNOWN_AGENT_COMMANDS = {
+    "claude": os.environ.get("CLAUDE_CMD", "claude"),
+    "codex": os.environ.get("CODEX_CMD", "codex"),
+    "gemini": os.environ.get("GEMINI_CMD", "gemini"),
+}
+DEFAULT_AGENTS = [item for item in (os.environ.get("VOICE_AGENTS") or "claude").split(",") if item.strip()]
+FOCUS_KEY_BYTES = {
+    "ctrl-]": 0x1D,
+    "ctrl-\\": 0x1C,
+    "ctrl-t": 0x14,
+}
+DEFAULT_FOCUS_KEY = os.environ.get("VOICE_AGENTS_FOCUS_KEY", "ctrl-]").strip().lower()
+SESSION_SCROLLBACK_BYTES = 256 * 1024
+CLEAR_SCREEN = b"\x1b[0m\x1b[2J\x1b[H"
+
+
+def parse_agent_spec(spec: str) -> tuple[str, str]:
+    """`claude`/`codex`/`gemini` use their default command; `name=command` runs anything."""
+    name, separator, command = spec.partition("=")
+    name = name.strip()
+    if separator:
+        command = command.strip()
+        if not name or not command:
+            raise ValueError(f"invalid agent spec '{spec}'; expected name=command.")
+        return name, command
+    if name not in KNOWN_AGENT_COMMANDS:
+        known = ", ".join(sorted(KNOWN_AGENT_COMMANDS))
+        raise ValueError(f"unknown agent '{name}'; use one of {known} or name=command.")
+    return name, KNOWN_AGENT_COMMANDS[name]
+
+
+def unique_session_names(names: list[str]) -> list[str]:
+    """Suffix repeated names (`claude`, `claude-2`, ...) so each session has its own label."""
+    counts: dict[str, int] = {}
+    unique = []
+    for name in names:
+        counts[name] = counts.get(name, 0) + 1
+        unique.append(name if counts[name] == 1 else f"{name}-{counts[name]}")
+    return unique
+
+
+@dataclass
+class AgentSession:
+    name: str
+    command: str
+    proc: Optional[subprocess.Popen] = None
+    master_fd: Optional[int] = None
+    pidfd: Optional[int] = None
+    transcript_draft: str = ""
+    scrollback: bytearray = field(default_factory=bytearray)
+    returncode: Optional[int] = None
+
+    @property
+    def alive(self) -> bool:
+        return self.master_fd is not None
+
+    def remember(self, data) -> None:
+        self.scrollback.extend(data)
+        # Trim in bulk once the buffer doubles so steady output costs amortized O(1) per byte.
+        if len(self.scrollback) > 2 * SESSION_SCROLLBACK_BYTES:
+            del self.scrollback[: len(self.scrollback) - SESSION_SCROLLBACK_BYTES]
+
+    def recent_output(self) -> bytes:
+        return bytes(self.scrollback[-SESSION_SCROLLBACK_BYTES:])
+
+
+class MultiSessionBridge(VoiceClaudeCliBridge):
+    """Hosts several agent PTYs in one process with one recorder and one loaded STT model.
+
+    Only the focused session is drawn; the others keep running and their output is kept in
+    a bounded scrollback that is replayed when they regain focus. Transcripts go to the
+    session that was focused when the recording was stopped.
+    """
+
+    def __init__(self, agents: list[tuple[str, str]], focus_key: str = DEFAULT_FOCUS_KEY, **options):
+        if not agents:
+            raise ValueError("at least one agent session is required.")
+        super().__init__(claude_command=agents[0][1], **options)
+        names = unique_session_names([name for name, _ in agents])
+        self.sessions = [AgentSession(name=name, command=command) for name, (_, command) in zip(names, agents)]
+        self.focus_byte = FOCUS_KEY_BYTES.get(focus_key, FOCUS_KEY_BYTES["ctrl-]"])
+        self._focused: Optional[AgentSession] = None
+
+    @property
+    def status_label(self) -> str:
+        if self._focused is None:
+            return "voice"
+        return f"voice:{self._focused.name}"
+
+    @property
+    def agent_label(self) -> str:
+        return self._focused.name if self._focused is not None else "agent"
+
+    def _agent_pids(self) -> list[int]:
+        return [session.proc.pid for session in self.sessions if session.proc is not None and session.alive]
+
+    def _start_claude(self) -> None:
+        for session in self.sessions:
+            master_fd, slave_fd = pty.openpty()
+            session.master_fd = master_fd
+            session.proc = subprocess.Popen(
+                ["bash", "-c", session.command],
+                stdin=slave_fd,
+                stdout=slave_fd,
+                stderr=slave_fd,
+                close_fds=True,
+                text=False,
+                env=os.environ.copy(),
+            )
+            os.close(slave_fd)
+            os.set_blocking(master_fd, False)
+        self._set_focus(self.sessions[0], repaint=False)
+
+    def _stop_claude(self) -> None:
+        for session in self.sessions:
+            proc = session.proc
+            if proc is not None and proc.poll() is None:
+                try:
+                    proc.terminate()
+                    proc.wait(timeout=2)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+            self._close_session(session)
+        self._proc = None
+        self._master_fd = None
+
+    def _close_session(self, session: AgentSession) -> None:
+        for fd in (session.master_fd, session.pidfd):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        session.master_fd = None
+        session.pidfd = None
+
+    def _sync_winsize(self) -> None:
+        try:
+            size = fcntl.ioctl(self._stdin_fd, termios.TIOCGWINSZ, struct.pack("HHHH", 0, 0, 0, 0))
+        except Exception:
+            return
+        for session in self.sessions:
+            if session.master_fd is None:
+                continue
+            try:
+                fcntl.ioctl(session.master_fd, termios.TIOCSWINSZ, size)
+            except Exception:
+                pass
+            self._notify_resize(session)
+
+    def _notify_resize(self, session: AgentSession) -> None:
+        # Signal the agent directly: a focus switch repaints an agent whose size did not change,
+        # and resizes reach agents the user is not looking at, so no terminal event tells them to
+        # redraw. (Spawned with Popen rather than pty.fork, they also keep the user's terminal as
+        # their controlling TTY, so resizing their own PTY signals nobody.)
+        if session.proc is not None and session.proc.poll() is None:
+            try:
+                os.kill(session.proc.pid, signal.SIGWINCH)
+            except OSError:
+                pass
+
+    def _watch_child_exit(self, selector: selectors.BaseSelector) -> Optional[int]:
+        pidfd_open = getattr(os, "pidfd_open", None)
+        if pidfd_open is not None:
+            try:
+                for session in self.sessions:
+                    if session.proc is not None:
+                        session.pidfd = pidfd_open(session.proc.pid)
+                        selector.register(session.pidfd, selectors.EVENT_READ, None)
+                return None
+            except OSError:
+                pass
+        signal.signal(signal.SIGCHLD, lambda signum, frame: self._wake_loop())
+        return None
+
+    def _run_event_loop(self, selector: selectors.BaseSelector) -> int:
+        selector.register(self._stdin_fd, selectors.EVENT_READ, self._on_stdin_readable)
+        selector.register(self._wake_read_fd, selectors.EVENT_READ, self._drain_loop_callbacks)
+        for session in self.sessions:
+            if session.master_fd is not None:
+                selector.register(session.master_fd, selectors.EVENT_READ, self._session_pump(session))
+        while True:
+            self._reap_sessions(selector)
+            if not any(session.alive for session in self.sessions):
+                return next((session.returncode for session in self.sessions if session.returncode), 0)
+            for key, _ in selector.select():
+                callback = key.data
+                if callback is None:
+                    continue
+                if not callback():
+                    selector.unregister(key.fd)
+
+    def _session_pump(self, session: AgentSession) -> Callable[[], bool]:
+        return lambda: self._pump_session_output(session)
+
+    def _pump_session_output(self, session: AgentSession, max_bytes: Optional[int] = PTY_MAX_BYTES_PER_WAKEUP) -> bool:
+        if session.master_fd is None:
+            return False
+        return self._pump_pty_output(
+            session.master_fd,
+            lambda data: self._on_session_output(session, data),
+            max_bytes=max_bytes,
+        )
+
+    def _on_session_output(self, session: AgentSession, data: memoryview) -> None:
+        session.remember(data)
+        if session is self._focused:
+            self._write_terminal(data)
+
+    def _reap_sessions(self, selector: selectors.BaseSelector) -> None:
+        for session in self.sessions:
+            if not session.alive or session.proc is None or session.proc.poll() is None:
+                continue
+            self._pump_session_output(session, max_bytes=None)
+            for fd in (session.master_fd, session.pidfd):
+                if fd is None:
+                    continue
+                try:
+                    selector.unregister(fd)
+                except (KeyError, ValueError):
+                    pass
+            session.returncode = session.proc.returncode
+            self._close_session(session)
+            if session is self._focused:
+                successor = self._next_live_session(session)
+                if successor is not None:
+                    self._set_focus(successor)
+                    self._print_status(f"{session.name} exited ({session.returncode}); switched to {successor.name}.")
+
+    def _next_live_session(self, current: Optional[AgentSession]) -> Optional[AgentSession]:
+        start = self.sessions.index(current) + 1 if current in self.sessions else 0
+        for offset in range(len(self.sessions)):
+            candidate = self.sessions[(start + offset) % len(self.sessions)]
+            if candidate.alive and candidate is not current:
+                return candidate
+        return None
+
+    def _set_focus(self, session: AgentSession, repaint: bool = True) -> None:
+        if self._focused is not None:
+            self._focused.transcript_draft = self._transcript_draft
+        self._focused = session
+        self._proc = session.proc
+        self._master_fd = session.master_fd
+        self._transcript_draft = session.transcript_draft
+        if repaint:
+            self._write_terminal(CLEAR_SCREEN + session.recent_output())
+            self._notify_resize(session)
+
+    def _cycle_focus(self) -> None:
+        successor = self._next_live_session(self._focused)
+        if successor is None:
+            return
+        self._set_focus(successor)
+        position = self.sessions.index(successor) + 1
+        self._print_status(f"focused {successor.name} ({position}/{len(self.sessions)}).")
+
+    def _forward_to_agent(self, forward: bytes) -> None:
+        # Bytes typed before a focus-key press belong to the old session, the rest to the new one.
+        parts = forward.split(bytes([self.focus_byte]))
+        for index, part in enumerate(parts):
+            if index > 0:
+                self._cycle_focus()
+            if part:
+                super()._forward_to_agent(part)
+
+    def _queue_transcription(self, job: Callable[[], str], trace=None, on_done=None) -> None:
+        session = self._focused
+        super()._queue_transcription(
+            job,
+            trace,
+            on_done=on_done or (lambda text, error: self._on_session_transcription_done(session, text, error)),
+        )
+
+    def _on_session_transcription_done(
+        self,
+        session: Optional[AgentSession],
+        text: str,
+        error: Optional[BaseException],
+    ) -> None:
+        if session is None or session is self._focused or error is not None or not text:
+            self._on_transcription_done(text, error)
+            return
+        incoming = text.strip()
+        session.transcript_draft = f"{session.transcript_draft} {incoming}".strip()
+        if self.auto_send and session.master_fd is not None:
+            write_all(session.master_fd, (text + " ").encode("utf-8", errors="ignore"))
+            self._print_status(f"appended to {session.name} draft; press Enter there to send.")
+        else:
+            self._print_status(f"transcript for {session.name} updated.")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Run several agent CLIs in PTYs with one shared voice recorder and STT model.",
+    )
+    parser.add_argument(
+        "--agent",
+        dest="agents",
+        action="append",
+        help="Agent session: claude, codex, gemini or name=command (repeatable; default from VOICE_AGENTS).",
+    )
+    parser.add_argument(
+        "--focus-key",
+        choices=sorted(FOCUS_KEY_BYTES),
+        default=DEFAULT_FOCUS_KEY if DEFAULT_FOCUS_KEY in FOCUS_KEY_BYTES else "ctrl-]",
+        help="Hotkey that moves focus to the next agent session.",
+    )
+    add_bridge_arguments(parser)
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    try:
+        agents = [parse_agent_spec(spec) for spec in (args.agents or DEFAULT_AGENTS)]
+    except ValueError as error:
+        sys.stderr.write(f"voice-agents error: {error}\n")
+        return 2
+    bridge = MultiSessionBridge(
+        agents=agents,
+        focus_key=args.focus_key,
+        **bridge_options(args, default_audio_backend()),
+    )
+    try:
+        return bridge.run()
+    except RuntimeError as error:
+        sys.stderr.write(f"voice-agents error: {error}\n")
+        return 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+import subprocess
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+
+WHISPER_SAMPLE_RATE = 16000
+PCM_SAMPLE_WIDTH = 2
+PIPE_READ_CHUNK_BYTES = 16384
+DEFAULT_PREALLOCATED_SECONDS = 60
+
+
+class PcmBuffer:
+    """Preallocated, growable store for s16le mono PCM captured from a recorder pipe."""
+
+    def __init__(self, capacity_bytes: int):
+        self._data = bytearray(max(PCM_SAMPLE_WIDTH, capacity_bytes))
+        self._size = 0
+        self._lock = threading.Lock()
+        self.first_append_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, chunk) -> None:
+        length = len(chunk)
+        if length <= 0:
+            return
+        with self._lock:
+            if self.first_append_at is None:
+                self.first_append_at = time.monotonic()
+            required = self._size + length
+            if required > len(self._data):
+                grown = max(required, len(self._data) * 2)
+                self._data.extend(bytes(grown - len(self._data)))
+            self._data[self._size:required] = chunk
+            self._size = required
+
+    def to_bytes(self, start: int = 0, end: Optional[int] = None) -> bytes:
+        with self._lock:
+            stop = self._size if end is None else min(end, self._size)
+            return bytes(self._data[start:stop])
+
+    def to_float32(self, sample_rate: int, start: int = 0, end: Optional[int] = None) -> np.ndarray:
+        with self._lock:
+            stop = self._size if end is None else min(end, self._size)
+            count = max(0, stop - start) // PCM_SAMPLE_WIDTH
+            # frombuffer exports the bytearray; drop the view before releasing the lock so append can grow it.
+            raw = np.frombuffer(self._data, dtype="<i2", count=count, offset=start)
+            samples = raw.astype(np.float32)
+            del raw
+        samples /= 32768.0
+        return resample_to_whisper_rate(samples, sample_rate=sample_rate)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._size = 0
+
+
+def resample_to_whisper_rate(samples: np.ndarray, sample_rate: int) -> np.ndarray:
+    if sample_rate == WHISPER_SAMPLE_RATE or samples.size == 0:
+        return samples
+    target_size = max(1, int(round(samples.size * WHISPER_SAMPLE_RATE / float(sample_rate))))
+    source_positions = np.arange(samples.size, dtype=np.float64)
+    target_positions = np.linspace(0.0, samples.size - 1, num=target_size)
+    return np.interp(target_positions, source_positions, samples).astype(np.float32)
+
+
+class PipeRecorder:
+    """Runs a recorder command and drains its stdout into a PcmBuffer on a reader thread."""
+
+    def __init__(self, command: list[str], sample_rate: int):
+        self.command = command
+        self.sample_rate = sample_rate
+        self.buffer = PcmBuffer(sample_rate * PCM_SAMPLE_WIDTH * DEFAULT_PREALLOCATED_SECONDS)
+        self.process: Optional[subprocess.Popen] = None
+        self._reader: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self.process = subprocess.Popen(
+            self.command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=0,
+            text=False,
+        )
+        self._reader = threading.Thread(target=self._drain_stdout, name="pcm-pipe-reader", daemon=True)
+        self._reader.start()
+
+    def _drain_stdout(self) -> None:
+        process = self.process
+        if process is None or process.stdout is None:
+            return
+        scratch = bytearray(PIPE_READ_CHUNK_BYTES)
+        view = memoryview(scratch)
+        while True:
+            try:
+                count = process.stdout.readinto(scratch)
+            except (OSError, ValueError):
+                break
+            if not count:
+                break
+            self.buffer.append(view[:count])
+
+    def stop(self) -> str:
+        """Terminate the recorder, wait for the pipe to drain, and return recorder stderr text."""
+        process = self.process
+        if process is None:
+            return ""
+        if process.poll() is None:
+            try:
+                process.terminate()
+                process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait(timeout=1)
+        if self._reader is not None:
+            self._reader.join(timeout=2)
+        stderr_text = ""
+        if process.stderr is not None:
+            try:
+                stderr_text = process.stderr.read().decode("utf-8", errors="ignore").strip()
+            except Exception:
+                stderr_text = ""
+        for stream in (process.stdout, process.stderr):
+            if stream is not None:
+                try:
+                    stream.close()
+                except OSError:
+                    pass
+        return stderr_text
+
+
+class PcmRing:
+    """Fixed-size rolling window over the most recent bytes of a PCM stream."""
+
+    def __init__(self, capacity_bytes: int):
+        capacity = max(PCM_SAMPLE_WIDTH, capacity_bytes)
+        self._data = bytearray(capacity - capacity % PCM_SAMPLE_WIDTH)
+        self._total = 0
+
+    @property
+    def capacity(self) -> int:
+        return len(self._data)
+
+    def write(self, chunk) -> None:
+        view = memoryview(chunk)
+        capacity = len(self._data)
+        if len(view) >= capacity:
+            self._total += len(view) - capacity
+            view = view[len(view) - capacity:]
+        position = self._total % capacity
+        first = min(len(view), capacity - position)
+        self._data[position:position + first] = view[:first]
+        self._data[: len(view) - first] = view[first:]
+        self._total += len(view)
+
+    def tail(self, length: int) -> bytes:
+        """Return up to `length` of the newest bytes, starting on a sample boundary of the stream."""
+        length = max(0, min(length, self._total, len(self._data)))
+        if (self._total - length) % PCM_SAMPLE_WIDTH:
+            length -= 1
+        if length <= 0:
+            return b""
+        capacity = len(self._data)
+        start = (self._total - length) % capacity
+        if start + length <= capacity:
+            return bytes(self._data[start:start + length])
+        return bytes(self._data[start:]) + bytes(self._data[: start + length - capacity])
+
+
+class ArmedCapture:
+    """One hotkey-delimited capture taken from an ArmedRecorder; mirrors PipeRecorder's surface."""
+
+    def __init__(self, armed: "ArmedRecorder", buffer: PcmBuffer):
+        self._armed = armed
+        self.buffer = buffer
+        self.process = armed.process
+
+    def stop(self) -> str:
+        self._armed.end_capture(self.buffer)
+        return ""
+
+
+class ArmedRecorder:
+    """Keeps a recorder running into a pre-roll ring so a hotkey press starts capture instantly."""
+
+    def __init__(self, command: list[str], sample_rate: int, max_pre_roll_seconds: float):
+        self.command = command
+        self.sample_rate = sample_rate
+        self.ring = PcmRing(int(sample_rate * max(0.0, max_pre_roll_seconds)) * PCM_SAMPLE_WIDTH)
+        self.process: Optional[subprocess.Popen] = None
+        self._active: Optional[PcmBuffer] = None
+        self._lock = threading.Lock()
+        self._reader: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self.process = subprocess.Popen(
+            self.command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=0,
+            text=False,
+        )
+        self._reader = threading.Thread(target=self._drain_stdout, name="armed-pipe-reader", daemon=True)
+        self._reader.start()
+
+    def is_running(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def _drain_stdout(self) -> None:
+        process = self.process
+        if process is None or process.stdout is None:
+            return
+        scratch = bytearray(PIPE_READ_CHUNK_BYTES)
+        view = memoryview(scratch)
+        while True:
+            try:
+                count = process.stdout.readinto(scratch)
+            except (OSError, ValueError):
+                break
+            if not count:
+                break
+            with self._lock:
+                self.ring.write(view[:count])
+                if self._active is not None:
+                    self._active.append(view[:count])
+
+    def begin_capture(self, pre_roll_seconds: float) -> ArmedCapture:
+        buffer = PcmBuffer(self.sample_rate * PCM_SAMPLE_WIDTH * DEFAULT_PREALLOCATED_SECONDS)
+        pre_roll_bytes = int(self.sample_rate * max(0.0, pre_roll_seconds)) * PCM_SAMPLE_WIDTH
+        with self._lock:
+            buffer.append(self.ring.tail(pre_roll_bytes))
+            self._active = buffer
+        return ArmedCapture(self, buffer)
+
+    def end_capture(self, buffer: PcmBuffer) -> None:
+        with self._lock:
+            if self._active is buffer:
+                self._active = None
+
+    def stop(self) -> None:
+        process = self.process
+        if process is None:
+            return
+        if process.poll() is None:
+            try:
+                process.terminate()
+                process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait(timeout=1)
+        if self._reader is not None:
+            self._reader.join(timeout=2)
+        if process.stdout is not None:
+            try:
+                process.stdout.close()
+            except OSError:
+                pass
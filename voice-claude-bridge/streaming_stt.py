@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+import threading
+import time
+from typing import Callable, Optional
+
+from pcm_capture import PCM_SAMPLE_WIDTH, WHISPER_SAMPLE_RATE, PcmBuffer
+from vad import find_commit_boundary
+
+
+DEFAULT_POLL_INTERVAL = 0.25
+DEFAULT_MIN_CHUNK_SECONDS = 4.0
+DEFAULT_MAX_CHUNK_SECONDS = 20.0
+DEFAULT_MIN_SILENCE_MS = 450
+# Partials are redrawn at most this often; each one re-decodes the uncommitted audio.
+DEFAULT_PARTIAL_INTERVAL = 0.5
+MIN_PARTIAL_SECONDS = 0.5
+
+
+class StreamingTranscriber:
+    """Transcribes silence-bounded chunks of an in-progress capture on a background worker.
+
+    The worker commits audio up to each detected pause, so when recording stops only the
+    uncommitted tail still has to be decoded. With `on_partial`, it also decodes the
+    uncommitted audio with the engine's cheap `partial` pass between commits and reports the
+    running hypothesis (committed text plus the guess for the rest) from the worker thread.
+    """
+
+    def __init__(
+        self,
+        stt_engine,
+        buffer: PcmBuffer,
+        sample_rate: int,
+        language: str,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        min_chunk_seconds: float = DEFAULT_MIN_CHUNK_SECONDS,
+        max_chunk_seconds: float = DEFAULT_MAX_CHUNK_SECONDS,
+        min_silence_ms: int = DEFAULT_MIN_SILENCE_MS,
+        on_partial: Optional[Callable[[str], None]] = None,
+        partial_interval: float = DEFAULT_PARTIAL_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+        model: Optional[str] = None,
+    ):
+        self.stt_engine = stt_engine
+        self.buffer = buffer
+        self.sample_rate = sample_rate
+        self.language = language
+        # Fixed for the whole recording, so a language switch mid-recording applies to the next one.
+        self.model = model
+        self.poll_interval = poll_interval
+        self.min_chunk_seconds = min_chunk_seconds
+        self.max_chunk_seconds = max_chunk_seconds
+        self.min_silence_ms = min_silence_ms
+        self.on_partial = on_partial
+        self.partial_interval = partial_interval
+        self.clock = clock
+
+        self._committed_bytes = 0
+        self._texts: list[str] = []
+        self._stop_event = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+        self._last_partial_at: Optional[float] = None
+        self._last_partial_bytes = 0
+
+    @property
+    def committed_bytes(self) -> int:
+        return self._committed_bytes
+
+    def start(self) -> None:
+        self._worker = threading.Thread(target=self._run, name="streaming-stt", daemon=True)
+        self._worker.start()
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                if self._commit_ready_chunk():
+                    self._report_partial(pending_text="")
+                elif self.on_partial is not None:
+                    self._decode_partial()
+            except Exception as error:
+                # Leave the failed region uncommitted; finish() decodes it with the tail.
+                self._error = error
+                return
+
+    def _commit_ready_chunk(self) -> bool:
+        start = self._committed_bytes
+        pending = self.buffer.to_float32(sample_rate=self.sample_rate, start=start)
+        boundary = find_commit_boundary(
+            pending,
+            min_chunk_seconds=self.min_chunk_seconds,
+            max_chunk_seconds=self.max_chunk_seconds,
+            min_silence_ms=self.min_silence_ms,
+        )
+        if boundary <= 0:
+            return False
+        text = self.stt_engine.transcribe(pending[:boundary], language=self.language, model=self.model)
+        if text:
+            self._texts.append(text)
+        source_samples = int(round(boundary * self.sample_rate / float(WHISPER_SAMPLE_RATE)))
+        self._committed_bytes = start + source_samples * PCM_SAMPLE_WIDTH
+        return True
+
+    def _decode_partial(self) -> None:
+        if self._last_partial_at is not None and self.clock() - self._last_partial_at < self.partial_interval:
+            return
+        available = len(self.buffer)
+        if available == self._last_partial_bytes:
+            return
+        pending = self.buffer.to_float32(sample_rate=self.sample_rate, start=self._committed_bytes)
+        if pending.size < MIN_PARTIAL_SECONDS * WHISPER_SAMPLE_RATE:
+            return
+        self._last_partial_bytes = available
+        self._report_partial(self.stt_engine.partial(pending, language=self.language, model=self.model) or "")
+
+    def _report_partial(self, pending_text: str) -> None:
+        if self.on_partial is None or self._stop_event.is_set():
+            return
+        # Measured after the decode, so a slow host gets fewer partials instead of a backlog.
+        self._last_partial_at = self.clock()
+        text = " ".join([*self._texts, pending_text]).strip()
+        if text:
+            self.on_partial(text)
+
+    def _stop_worker(self) -> None:
+        self._stop_event.set()
+        if self._worker is not None:
+            self._worker.join()
+            self._worker = None
+
+    def finish(self) -> str:
+        """Stop the worker, decode the uncommitted tail, and return the full transcript."""
+        self._stop_worker()
+        tail = self.buffer.to_float32(sample_rate=self.sample_rate, start=self._committed_bytes)
+        if tail.size > 0:
+            text = self.stt_engine.transcribe(tail, language=self.language, model=self.model)
+            if text:
+                self._texts.append(text)
+        self._committed_bytes = len(self.buffer)
+        return " ".join(self._texts).strip()
+
+    def cancel(self) -> None:
+        """Stop without waiting: called on the PTY loop, which must not block on a decode in flight.
+
+        The worker exits after its current decode and reports nothing more.
+        """
+        self._stop_event.set()
+        self._worker = None
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+import json
+import os
+import socket
+import struct
+import tempfile
+from typing import Optional
+
+
+HEADER_LENGTH = struct.Struct(">I")
+MAX_HEADER_BYTES = 1 << 20
+DEFAULT_CONNECT_TIMEOUT = 0.5
+
+
+def default_socket_path() -> str:
+    configured = (os.environ.get("VOICE_STT_SOCKET") or "").strip()
+    if configured:
+        return configured
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(runtime_dir, f"voice-bridge-stt-{os.getuid()}.sock")
+
+
+class SttServiceUnavailable(RuntimeError):
+    pass
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks = bytearray()
+    while len(chunks) < size:
+        chunk = sock.recv(min(size - len(chunks), 1 << 16))
+        if not chunk:
+            raise ConnectionError("stt service closed the connection.")
+        chunks.extend(chunk)
+    return bytes(chunks)
+
+
+def send_message(sock: socket.socket, header: dict, payload: bytes = b"") -> None:
+    """Frame: 4-byte big-endian header length, UTF-8 JSON header, then `payload_bytes` of payload."""
+    encoded = json.dumps(dict(header, payload_bytes=len(payload))).encode("utf-8")
+    sock.sendall(HEADER_LENGTH.pack(len(encoded)) + encoded)
+    if payload:
+        sock.sendall(payload)
+
+
+def recv_message(sock: socket.socket) -> tuple[dict, bytes]:
+    (length,) = HEADER_LENGTH.unpack(_recv_exact(sock, HEADER_LENGTH.size))
+    if length > MAX_HEADER_BYTES:
+        raise ConnectionError("stt service header too large.")
+    header = json.loads(_recv_exact(sock, length).decode("utf-8"))
+    payload_bytes = int(header.get("payload_bytes") or 0)
+    payload = _recv_exact(sock, payload_bytes) if payload_bytes > 0 else b""
+    return header, payload
+
+
+class SttServiceClient:
+    """Client for the shared per-host STT daemon (stt_server.py) over a Unix domain socket."""
+
+    def __init__(self, socket_path: str, connect_timeout: float = DEFAULT_CONNECT_TIMEOUT):
+        self.socket_path = socket_path
+        self.connect_timeout = connect_timeout
+
+    def _connect(self) -> socket.socket:
+        if not os.path.exists(self.socket_path):
+            raise SttServiceUnavailable(f"no stt service socket at {self.socket_path}")
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.connect_timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError as error:
+            sock.close()
+            raise SttServiceUnavailable(f"stt service unreachable: {error}") from error
+        # Transcription can take as long as the model needs; only the connect is time-bounded.
+        sock.settimeout(None)
+        return sock
+
+    def _request(self, header: dict, payload: bytes = b"") -> dict:
+        sock = self._connect()
+        try:
+            try:
+                send_message(sock, header, payload)
+                response, _ = recv_message(sock)
+            except (OSError, ValueError) as error:
+                raise SttServiceUnavailable(f"stt service request failed: {error}") from error
+        finally:
+            sock.close()
+        if not response.get("ok"):
+            raise RuntimeError(response.get("error") or "stt service error.")
+        return response
+
+    def is_available(self) -> bool:
+        try:
+            self._request({"op": "ping"})
+        except (SttServiceUnavailable, RuntimeError):
+            return False
+        return True
+
+    def warm(self, model: str, device: str, compute_type: str, model_profile: Optional[str] = None) -> None:
+        """Have the daemon start loading `model` if it is not loaded; does not wait for the load."""
+        header = {"op": "warm", "model": model, "device": device, "compute_type": compute_type}
+        if model_profile:
+            header["model_profile"] = model_profile
+        self._request(header)
+
+    def transcribe(
+        self,
+        audio,
+        language: str,
+        model: str,
+        device: str,
+        compute_type: str,
+        profile: Optional[str] = None,
+        model_profile: Optional[str] = None,
+        session: Optional[str] = None,
+        update_language: bool = True,
+    ) -> str:
+        """Transcribe a WAV path or 16 kHz float32 samples (anything exposing `tobytes`).
+
+        `profile` picks the decode options for this clip; `model_profile` the threads/workers
+        the daemon loads the model with. Both default to the daemon's default profile.
+        """
+        return self.transcribe_detailed(
+            audio,
+            language=language,
+            model=model,
+            device=device,
+            compute_type=compute_type,
+            profile=profile,
+            model_profile=model_profile,
+            session=session,
+            update_language=update_language,
+        )[0]
+
+    def transcribe_detailed(
+        self,
+        audio,
+        language: str,
+        model: str,
+        device: str,
+        compute_type: str,
+        profile: Optional[str] = None,
+        model_profile: Optional[str] = None,
+        session: Optional[str] = None,
+        update_language: bool = True,
+    ) -> tuple[str, Optional[str]]:
+        """Like `transcribe`, but returns (text, language the daemon decoded with).
+
+        With `language="auto"`, `session` keeps this client's detected language apart from other
+        clients of the same daemon; `update_language=False` only reads it (previews).
+        """
+        header = {
+            "op": "transcribe",
+            "language": language,
+            "model": model,
+            "device": device,
+            "compute_type": compute_type,
+        }
+        if profile:
+            header["profile"] = profile
+        if model_profile:
+            header["model_profile"] = model_profile
+        if session:
+            header["session"] = session
+        if not update_language:
+            header["update_language"] = False
+        payload = b""
+        if isinstance(audio, str):
+            header["path"] = os.path.abspath(audio)
+        else:
+            header["format"] = "f32le"
+            payload = audio.astype("<f4", copy=False).tobytes()
+        response = self._request(header, payload)
+        return str(response.get("text") or ""), response.get("language") or None
@@ -0,0 +1,649 @@
+#!/usr/bin/env python3
+import contextlib
+import threading
+import time
+import uuid
+import wave
+from collections import OrderedDict
+from typing import Callable, Optional, Union
+
+import numpy as np
+
+from cpu_budget import CpuBudget, ThreadBudgetGuard
+from language_detect import AUTO_LANGUAGE, DEFAULT_DETECT_THRESHOLD, StickyLanguage, pick_language
+from load_monitor import AdaptivePolicy, LoadDecision, LoadMonitor
+from model_cache import ModelCache, estimate_model_bytes, release_freed_memory, resident_bytes
+from pcm_capture import resample_to_whisper_rate
+from stt_client import SttServiceClient, SttServiceUnavailable
+from stt_profiles import DEFAULT_PROFILE_NAME, DecodeProfile, ProfileRule, get_profile, select_profile
+from vad import split_at_pauses
+
+
+# A captured clip is either a WAV path (file capture mode) or 16 kHz float32 samples (memory mode).
+AudioInput = Union[str, np.ndarray]
+WHISPER_SAMPLE_RATE = 16000
+# Whisper decodes 30s windows one after another; only longer clips gain from batching.
+LONG_CLIP_SECONDS = 30.0
+CHUNK_MAX_SECONDS = 28.0
+CHUNK_MIN_SECONDS = 8.0
+CHUNK_MIN_SILENCE_MS = 300
+DEFAULT_BATCH_SIZE = 8
+# The draft pass must not starve the final decode that follows it.
+DRAFT_THREADS = 2
+# Enough for small + base + tiny at int8; the model in use is kept even if it alone is larger.
+DEFAULT_MODEL_CACHE_BYTES = 2048 * 1024 * 1024
+# Sticky languages kept per client session by a shared engine (the daemon); the oldest are dropped.
+MAX_SESSION_LANGUAGES = 64
+
+
+def read_wav_samples(wav_path: str) -> Optional[np.ndarray]:
+    """16 kHz float32 samples of a mono s16le WAV, or None when it cannot be read."""
+    try:
+        with wave.open(wav_path, "rb") as wav_file:
+            rate = wav_file.getframerate()
+            frames = wav_file.readframes(wav_file.getnframes())
+    except (OSError, EOFError, wave.Error):
+        return None
+    samples = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    return resample_to_whisper_rate(samples, sample_rate=rate)
+
+
+def join_segments(segments) -> tuple[str, Optional[float]]:
+    """Segment texts joined in order, with their duration-weighted average log probability."""
+    parts = []
+    weighted = 0.0
+    total = 0.0
+    for segment in segments:
+        text = (segment.text or "").strip()
+        if text:
+            parts.append(text)
+        avg_logprob = getattr(segment, "avg_logprob", None)
+        if avg_logprob is not None:
+            weight = max(0.01, float(getattr(segment, "end", 1.0)) - float(getattr(segment, "start", 0.0)))
+            weighted += avg_logprob * weight
+            total += weight
+    return " ".join(parts).strip(), (weighted / total if total else None)
+
+
+def audio_duration_seconds(audio: AudioInput) -> Optional[float]:
+    if isinstance(audio, str):
+        try:
+            with wave.open(audio, "rb") as wav_file:
+                return wav_file.getnframes() / float(wav_file.getframerate() or 1)
+        except (OSError, EOFError, wave.Error):
+            return None
+    return audio.size / float(WHISPER_SAMPLE_RATE)
+
+
+class SttEngine:
+    def __init__(
+        self,
+        model: str,
+        device: str,
+        compute_type: str,
+        service_socket: Optional[str] = None,
+        profile: str = DEFAULT_PROFILE_NAME,
+        profile_rules: Optional[list[ProfileRule]] = None,
+        cpu_budget: Optional[CpuBudget] = None,
+        load_monitor: Optional[LoadMonitor] = None,
+        adaptive_policy: Optional[AdaptivePolicy] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        draft_model: str = "",
+        model_cache_bytes: int = DEFAULT_MODEL_CACHE_BYTES,
+        detect_threshold: float = DEFAULT_DETECT_THRESHOLD,
+        language_candidates: Optional[list[str]] = None,
+        idle_unload_seconds: float = 0.0,
+    ):
+        self.model_name = model
+        self.device = device
+        self.compute_type = compute_type
+        # The base profile also fixes the model's threads/workers; length rules only swap decode options.
+        self.profile = get_profile(profile)
+        self.profile_rules = list(profile_rules or [])
+        self.cpu_budget = cpu_budget or CpuBudget()
+        self._budget_guard = ThreadBudgetGuard(self.cpu_budget)
+        # With both set, every clip is planned against current host and agent load.
+        self.load_monitor = load_monitor
+        self.adaptive_policy = adaptive_policy
+        self.last_decision: Optional[LoadDecision] = None
+        self._fallback_models: dict[str, object] = {}
+        self._unavailable_fallbacks: set[str] = set()
+        # Clips over LONG_CLIP_SECONDS are cut at pauses and decoded this many chunks at a time.
+        self.batch_size = max(0, int(batch_size))
+        # A small model whose quick pass is shown as a preview before the main model's result.
+        self.draft_model = draft_model if draft_model != model else ""
+        # Draft model per primary model, so a clip queued before a switch keeps its own draft.
+        self._draft_models: dict[str, str] = {model: self.draft_model}
+        # language="auto": detected on the first clip and kept until decoding confidence drops.
+        self.sticky_language = StickyLanguage(threshold=detect_threshold)
+        self.language_candidates = frozenset(language_candidates or ())
+        self.last_language: Optional[str] = None
+        # Daemon requests carry this id, so the daemon keeps this bridge's sticky language apart
+        # from other bridges sharing its engine.
+        self.session_id = uuid.uuid4().hex
+        self._session_languages: "OrderedDict[str, StickyLanguage]" = OrderedDict()
+        self._session_lock = threading.Lock()
+        self.service_socket = service_socket
+        self._service = SttServiceClient(service_socket) if service_socket else None
+        self._model = None
+        # Models loaded earlier in the session, so switching back (e.g. en -> zh -> en) skips the load.
+        self._model_cache = ModelCache(max_bytes=model_cache_bytes)
+        # Serializes loading so a transcription racing the preload thread waits for it instead of loading twice.
+        self._model_lock = threading.Lock()
+        # Guards `model_name`/`_model`/`draft_model` only; never held during a load, so the PTY loop can take it.
+        self._state_lock = threading.Lock()
+        self._preload_thread: Optional[threading.Thread] = None
+        # (start, end) monotonic times of the model load, for dictation traces.
+        self.load_span: Optional[tuple[float, float]] = None
+        # After this long without a decode, every loaded model is released (0 keeps them forever).
+        self.idle_unload_seconds = max(0.0, float(idle_unload_seconds))
+        self.idle_unloaded = False
+        # Called from the idle timer thread after an unload; callers marshal it to their own loop.
+        self.on_idle_unload: Optional[Callable[[], None]] = None
+        self._last_used = time.monotonic()
+        # Decodes and model loads in progress; the idle timer never unloads under them.
+        self._active_uses = 0
+        self._idle_lock = threading.Lock()
+        self._idle_timer: Optional[threading.Timer] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    @property
+    def loaded_bytes(self) -> int:
+        """Measured size of the models in this engine's cache (0 when nothing is loaded)."""
+        return self._model_cache.total_bytes
+
+    @property
+    def budget_problem(self) -> Optional[str]:
+        """Why the CPU affinity/nice budget could not be applied, if it could not."""
+        return self._budget_guard.last_problem
+
+    def service_available(self) -> bool:
+        return self._service is not None and self._service.is_available()
+
+    def _cache_key(self, model_name: Optional[str] = None) -> tuple[str, str, str]:
+        return (model_name or self.model_name, self.device, self.compute_type)
+
+    def _ensure_model(self, model_name: Optional[str] = None):
+        """The loaded `model_name` (default: the primary), loading it on first use."""
+        with self._state_lock:
+            name = model_name or self.model_name
+            model = self._model if name == self.model_name else None
+        if model is not None:
+            return model
+        self._budget_guard.ensure()
+        # Counted as in use, so the idle timer cannot release the model while it is loading.
+        with self._in_use(), self._model_lock:
+            key = self._cache_key(name)
+            model = self._model_cache.get(key)
+            if model is None:
+                started = time.monotonic()
+                rss_before = resident_bytes()
+                model = self._load_model(name)
+                self.load_span = (started, time.monotonic())
+                # RSS growth catches what the estimate misses (e.g. local checkpoints).
+                size = max(resident_bytes() - rss_before, estimate_model_bytes(name, self.compute_type))
+                self._model_cache.put(key, model, size)
+            self.idle_unloaded = False
+            with self._state_lock:
+                # A switch during the load leaves this model cached but not primary.
+                if name == self.model_name:
+                    self._model = model
+        return model
+
+    def unload(self) -> bool:
+        """Release every loaded model; the next decode (or `preload`) loads the primary again."""
+        with self._model_lock:
+            released = self._model_cache.clear() + len(self._fallback_models)
+            with self._state_lock:
+                if self._model is not None:
+                    released += 1
+                self._model = None
+                self._preload_thread = None
+            self._fallback_models.clear()
+        if released:
+            release_freed_memory()
+        return bool(released)
+
+    def _touch(self) -> None:
+        with self._idle_lock:
+            self._last_used = time.monotonic()
+            if self.idle_unload_seconds > 0 and self._idle_timer is None:
+                self._arm_idle_timer(self.idle_unload_seconds)
+
+    def _arm_idle_timer(self, delay: float) -> None:
+        timer = threading.Timer(delay, self._on_idle_timer)
+        timer.daemon = True
+        self._idle_timer = timer
+        timer.start()
+
+    def _on_idle_timer(self) -> None:
+        # One timer at a time: decodes only refresh `_last_used`, and the timer re-arms itself
+        # for the remaining time instead of being restarted on every clip.
+        with self._idle_lock:
+            self._idle_timer = None
+            remaining = self._last_used + self.idle_unload_seconds - time.monotonic()
+            if remaining > 0 or self._active_uses:
+                self._arm_idle_timer(max(remaining, 1.0))
+                return
+            if not self.unload():
+                return
+            self.idle_unloaded = True
+        if self.on_idle_unload is not None:
+            self.on_idle_unload()
+
+    @contextlib.contextmanager
+    def _in_use(self):
+        with self._idle_lock:
+            self._active_uses += 1
+        try:
+            yield
+        finally:
+            with self._idle_lock:
+                self._active_uses -= 1
+            self._touch()
+
+    def switch_model(self, model: str, draft_model: Optional[str] = None) -> bool:
+        """Make `model` the primary model for later clips; True when it still has to be loaded.
+
+        Called from the PTY loop, so it never waits for a load in progress. The previous model
+        stays in the LRU cache, and clips that name their model keep decoding with it.
+        """
+        with self._state_lock:
+            if draft_model is not None:
+                self.draft_model = draft_model if draft_model != model else ""
+                self._draft_models[model] = self.draft_model
+            if model != self.model_name:
+                self.model_name = model
+                self._model = self._model_cache.get(self._cache_key(model))
+                self._preload_thread = None
+            return self._model is None
+
+    def draft_model_for(self, model: Optional[str] = None) -> str:
+        """Draft model paired with primary `model` (default: the current one); "" when there is none."""
+        with self._state_lock:
+            if model is None or model == self.model_name:
+                return self.draft_model
+            return self._draft_models.get(model, "")
+
+    def _load_model(self, model_name: Optional[str] = None):
+        return self._build_model(model_name or self.model_name, self._model_kwargs())
+
+    def _build_model(self, model_name: str, model_kwargs: dict):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as error:
+            raise RuntimeError(
+                "faster-whisper is not installed. Run: pip install -r requirements.txt"
+            ) from error
+        try:
+            return WhisperModel(
+                model_name,
+                device=self.device,
+                compute_type=self.compute_type,
+                **model_kwargs,
+            )
+        except Exception as error:
+            if self.device.lower() == "auto" and "libcublas" in str(error).lower():
+                return WhisperModel(
+                    model_name,
+                    device="cpu",
+                    compute_type="int8",
+                    **model_kwargs,
+                )
+            raise
+
+    def _fallback_model(self, model_name: str, threads: int):
+        """A small secondary model (load fallback or draft), loaded once with at most `threads` cores."""
+        model = self._fallback_models.get(model_name)
+        if model is not None or model_name in self._unavailable_fallbacks:
+            return model
+        with self._in_use(), self._model_lock:
+            model = self._fallback_models.get(model_name)
+            if model is None and model_name not in self._unavailable_fallbacks:
+                model_kwargs = self.cpu_budget.model_kwargs({"cpu_threads": threads, "num_workers": 1})
+                if threads > 0:
+                    model_kwargs["cpu_threads"] = min(model_kwargs["cpu_threads"], threads)
+                try:
+                    model = self._build_model(model_name, model_kwargs)
+                except Exception:
+                    # Not downloaded (offline) or otherwise unusable: keep using the primary model.
+                    self._unavailable_fallbacks.add(model_name)
+                    return None
+                self._fallback_models[model_name] = model
+        return model
+
+    def _model_kwargs(self) -> dict:
+        return self.cpu_budget.model_kwargs(self.profile.model_kwargs())
+
+    def load(self) -> None:
+        self._ensure_model()
+
+    def preload(self, on_done: Optional[Callable[[Optional[Exception], float], None]] = None) -> None:
+        """Load the model on a background thread; on_done receives (error, elapsed_seconds).
+
+        Does nothing while the model is loaded or a preload is running; after a failed or
+        finished preload, a later call starts a new one.
+        """
+
+        def worker() -> None:
+            started = time.monotonic()
+            error: Optional[Exception] = None
+            try:
+                self._ensure_model()
+                if self.draft_model:
+                    self._fallback_model(self.draft_model, DRAFT_THREADS)
+            except Exception as load_error:
+                error = load_error
+            finally:
+                with self._state_lock:
+                    if self._preload_thread is thread:
+                        self._preload_thread = None
+            if on_done is not None:
+                on_done(error, time.monotonic() - started)
+
+        with self._state_lock:
+            if self._model is not None or self._preload_thread is not None:
+                return
+            thread = threading.Thread(target=worker, name="stt-preload", daemon=True)
+            self._preload_thread = thread
+        thread.start()
+
+    def warm_service(self) -> None:
+        """Ask the daemon to load the primary model in the background, e.g. after it unloaded it idle.
+
+        Returns at once; a daemon that is down or fails the load is left to the next clip,
+        which falls back to in-process inference or reports the error.
+        """
+        if self._service is None:
+            return
+        with self._state_lock:
+            model = self.model_name
+
+        def worker() -> None:
+            try:
+                self._service.warm(
+                    model=model,
+                    device=self.device,
+                    compute_type=self.compute_type,
+                    model_profile=self.profile.name,
+                )
+            except (SttServiceUnavailable, RuntimeError):
+                pass
+
+        threading.Thread(target=worker, name="stt-warm", daemon=True).start()
+
+    def decode_profile_for(self, audio: AudioInput) -> DecodeProfile:
+        if not self.profile_rules:
+            return self.profile
+        return select_profile(self.profile, self.profile_rules, audio_duration_seconds(audio))
+
+    def plan(self, audio: AudioInput) -> tuple[DecodeProfile, Optional[LoadDecision]]:
+        """Decode profile for this clip, downgraded when the load policy says the host is busy."""
+        decode = self.decode_profile_for(audio)
+        if self.load_monitor is None or self.adaptive_policy is None:
+            return decode, None
+        decision = self.adaptive_policy.decide(self.load_monitor.snapshot())
+        self.last_decision = decision
+        if decision.profile:
+            decode = get_profile(decision.profile)
+        return decode, decision
+
+    def transcribe(self, audio: AudioInput, language: str, model: Optional[str] = None) -> str:
+        """Decode with `model` (default: the current primary), e.g. the one active when the clip was recorded."""
+        model = model or self.model_name
+        decode, decision = self.plan(audio)
+        fallback = decision.model if decision is not None and decision.model != model else None
+        if self._service is not None:
+            try:
+                text, used = self._service.transcribe_detailed(
+                    audio,
+                    language=language,
+                    model=fallback or model,
+                    device=self.device,
+                    compute_type=self.compute_type,
+                    profile=decode.name,
+                    model_profile=self.profile.name,
+                    session=self.session_id,
+                )
+                if language == AUTO_LANGUAGE:
+                    self.last_language = used
+                return text
+            except SttServiceUnavailable:
+                # Daemon absent or gone: fall back to in-process inference for this clip.
+                pass
+        return self.transcribe_local(
+            audio,
+            language=language,
+            profile=decode,
+            fallback_model=fallback,
+            fallback_threads=decision.threads if decision is not None else 0,
+            model=model,
+        )
+
+    def draft(self, audio: AudioInput, language: str, model: Optional[str] = None) -> Optional[str]:
+        """Quick preview text from the draft model paired with `model`; None when drafting is off or fails."""
+        model = model or self.model_name
+        draft_model = self.draft_model_for(model)
+        if not draft_model:
+            return None
+        return self._quick_pass(audio, language, draft_model, model)
+
+    def partial(self, audio: AudioInput, language: str, model: Optional[str] = None) -> Optional[str]:
+        """Cheap hypothesis for audio that is still being recorded.
+
+        Uses the draft model when there is one, else the main model with the `fastest` profile.
+        """
+        model = model or self.model_name
+        return self._quick_pass(audio, language, self.draft_model_for(model) or model, model)
+
+    def _quick_pass(self, audio: AudioInput, language: str, model_name: str, primary: str) -> Optional[str]:
+        # Previews are best effort: errors are swallowed and the main decode decides what the user gets.
+        decode = get_profile("fastest")
+        secondary = model_name != primary
+        try:
+            if self._service is not None:
+                try:
+                    return self._service.transcribe(
+                        audio,
+                        language=language,
+                        model=model_name,
+                        device=self.device,
+                        compute_type=self.compute_type,
+                        profile=decode.name,
+                        # The main model keeps its own threads, so the daemon reuses the loaded engine.
+                        model_profile=decode.name if secondary else self.profile.name,
+                        session=self.session_id,
+                        update_language=False,
+                    )
+                except SttServiceUnavailable:
+                    pass
+            self._budget_guard.ensure()
+            if secondary and self._fallback_model(model_name, DRAFT_THREADS) is None:
+                return None
+            return self.transcribe_local(
+                audio,
+                language=language,
+                profile=decode,
+                fallback_model=model_name if secondary else None,
+                fallback_threads=DRAFT_THREADS,
+                model=primary,
+                update_language=False,
+            )
+        except Exception:
+            return None
+
+    def transcribe_local(
+        self,
+        audio: AudioInput,
+        language: str,
+        profile: Optional[DecodeProfile] = None,
+        fallback_model: Optional[str] = None,
+        fallback_threads: int = 0,
+        model: Optional[str] = None,
+        session: Optional[str] = None,
+        update_language: bool = True,
+    ) -> str:
+        return self.transcribe_local_detailed(
+            audio,
+            language,
+            profile=profile,
+            fallback_model=fallback_model,
+            fallback_threads=fallback_threads,
+            model=model,
+            session=session,
+            update_language=update_language,
+        )[0]
+
+    def transcribe_local_detailed(
+        self,
+        audio: AudioInput,
+        language: str,
+        profile: Optional[DecodeProfile] = None,
+        fallback_model: Optional[str] = None,
+        fallback_threads: int = 0,
+        model: Optional[str] = None,
+        session: Optional[str] = None,
+        update_language: bool = True,
+    ) -> tuple[str, Optional[str]]:
+        """(text, language used); in `auto` mode the language is None when faster-whisper picked it.
+
+        `session` selects whose sticky language `auto` uses (default: this engine's own). Quick
+        passes set `update_language=False`: they only read the sticky language, and detection
+        and the doubt check are left to the final decode.
+        """
+        with self._in_use():
+            return self._transcribe_loaded(
+                audio, language, profile, fallback_model, fallback_threads, model, session, update_language
+            )
+
+    def sticky_language_for(self, session: Optional[str]) -> StickyLanguage:
+        if session is None:
+            return self.sticky_language
+        with self._session_lock:
+            sticky = self._session_languages.get(session)
+            if sticky is None:
+                sticky = StickyLanguage(
+                    threshold=self.sticky_language.threshold,
+                    doubt_avg_logprob=self.sticky_language.doubt_avg_logprob,
+                )
+                self._session_languages[session] = sticky
+                while len(self._session_languages) > MAX_SESSION_LANGUAGES:
+                    self._session_languages.popitem(last=False)
+            self._session_languages.move_to_end(session)
+            return sticky
+
+    def _transcribe_loaded(
+        self,
+        audio: AudioInput,
+        language: str,
+        profile: Optional[DecodeProfile],
+        fallback_model: Optional[str],
+        fallback_threads: int,
+        model_name: Optional[str],
+        session: Optional[str],
+        update_language: bool,
+    ) -> tuple[str, Optional[str]]:
+        self._budget_guard.ensure()
+        model = self._fallback_model(fallback_model, fallback_threads) if fallback_model else None
+        if model is None:
+            model = self._ensure_model(model_name)
+        decode = profile or self.decode_profile_for(audio)
+        if language != AUTO_LANGUAGE:
+            return self._decode(model, audio, language, decode)[0], language
+
+        session_language = self.sticky_language_for(session)
+        sticky = session_language.language
+        if not update_language:
+            return self._decode(model, audio, sticky, decode)[0], sticky
+        used = sticky or self._detect_language(model, audio, session_language)
+        text, avg_logprob = self._decode(model, audio, used, decode)
+        if sticky is not None and session_language.doubts(avg_logprob):
+            # A poor decode in the session language usually means the speaker switched: detect
+            # again, and redo this clip if the language changed.
+            session_language.forget()
+            used = self._detect_language(model, audio, session_language)
+            if used != sticky:
+                text = self._decode(model, audio, used, decode)[0]
+        if session is None:
+            self.last_language = used
+        return text, used
+
+    def _detect_language(self, model, audio: AudioInput, sticky: StickyLanguage) -> Optional[str]:
+        """Detect the language and offer it to `sticky`; None leaves detection to faster-whisper's decode."""
+        if not getattr(getattr(model, "model", None), "is_multilingual", True):
+            return "en"
+        samples = read_wav_samples(audio) if isinstance(audio, str) else audio
+        if samples is None:
+            return None
+        _language, _probability, detections = model.detect_language(audio=samples)
+        picked = pick_language(detections, self.language_candidates)
+        if picked is None:
+            return None
+        sticky.observe(*picked)
+        return picked[0]
+
+    def _decode(
+        self,
+        model,
+        audio: AudioInput,
+        language: Optional[str],
+        decode: DecodeProfile,
+    ) -> tuple[str, Optional[float]]:
+        long_clip = self._long_clip_samples(audio)
+        if long_clip is not None:
+            pipeline = self._batched_pipeline(model)
+            if pipeline is not None:
+                return self._transcribe_chunked(pipeline, long_clip, language, decode)
+        segments, _info = model.transcribe(audio, language=language, **decode.transcribe_kwargs())
+        return join_segments(segments)
+
+    def _long_clip_samples(self, audio: AudioInput) -> Optional[np.ndarray]:
+        if self.batch_size < 2:
+            return None
+        seconds = audio_duration_seconds(audio)
+        if seconds is None or seconds <= LONG_CLIP_SECONDS:
+            return None
+        return read_wav_samples(audio) if isinstance(audio, str) else audio
+
+    def _batched_pipeline(self, model):
+        try:
+            from faster_whisper import BatchedInferencePipeline
+        except ImportError:
+            # faster-whisper < 1.1: long clips keep the serial path.
+            return None
+        # A thin wrapper; not cached, so it never keeps an evicted model alive.
+        return BatchedInferencePipeline(model=model)
+
+    def _transcribe_chunked(
+        self,
+        pipeline,
+        samples: np.ndarray,
+        language: Optional[str],
+        decode: DecodeProfile,
+    ) -> tuple[str, Optional[float]]:
+        """Cut at pauses, decode up to `batch_size` chunks per forward pass, and join in order."""
+        bounds = split_at_pauses(
+            samples,
+            max_chunk_seconds=CHUNK_MAX_SECONDS,
+            min_chunk_seconds=CHUNK_MIN_SECONDS,
+            min_silence_ms=CHUNK_MIN_SILENCE_MS,
+        )
+        options = decode.transcribe_kwargs()
+        segments, _info = pipeline.transcribe(
+            samples,
+            language=language,
+            clip_timestamps=[
+                {"start": start / WHISPER_SAMPLE_RATE, "end": end / WHISPER_SAMPLE_RATE} for start, end in bounds
+            ],
+            vad_filter=False,
+            batch_size=self.batch_size,
+            beam_size=options["beam_size"],
+            best_of=options["best_of"],
+            # The batched pipeline decodes each chunk once at the first temperature; no fallback.
+            temperature=options["temperature"][0],
+            condition_on_previous_text=False,
+        )
+        return join_segments(segments)
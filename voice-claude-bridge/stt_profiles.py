@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+import os
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from cpu_budget import usable_cpus
+
+
+@dataclass(frozen=True)
+class DecodeProfile:
+    """faster-whisper settings for one latency/accuracy trade-off.
+
+    `cpu_threads` and `num_workers` are fixed when the model loads; everything else is per clip.
+    `cpu_threads=0` keeps the CTranslate2 default.
+    """
+
+    name: str
+    beam_size: int
+    best_of: int
+    temperature: tuple[float, ...]
+    vad_filter: bool
+    vad_min_silence_ms: int
+    vad_speech_pad_ms: int
+    cpu_threads: int
+    num_workers: int
+
+    def model_kwargs(self) -> dict:
+        return {"cpu_threads": self.cpu_threads, "num_workers": self.num_workers}
+
+    def transcribe_kwargs(self) -> dict:
+        kwargs = {
+            "beam_size": self.beam_size,
+            "best_of": self.best_of,
+            "temperature": list(self.temperature),
+            "condition_on_previous_text": False,
+            "vad_filter": self.vad_filter,
+        }
+        if self.vad_filter:
+            kwargs["vad_parameters"] = {
+                "min_silence_duration_ms": self.vad_min_silence_ms,
+                "speech_pad_ms": self.vad_speech_pad_ms,
+            }
+        return kwargs
+
+
+FALLBACK_TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+DECODE_PROFILES = {
+    # Greedy, no temperature retries, tight VAD: lowest time-to-text for short dictation.
+    "fastest": DecodeProfile(
+        name="fastest",
+        beam_size=1,
+        best_of=1,
+        temperature=(0.0,),
+        vad_filter=True,
+        vad_min_silence_ms=300,
+        vad_speech_pad_ms=100,
+        cpu_threads=min(usable_cpus(), 8),
+        num_workers=1,
+    ),
+    # The long-standing defaults: greedy with temperature fallback on low-confidence segments.
+    "balanced": DecodeProfile(
+        name="balanced",
+        beam_size=1,
+        best_of=5,
+        temperature=FALLBACK_TEMPERATURES,
+        vad_filter=True,
+        vad_min_silence_ms=2000,
+        vad_speech_pad_ms=400,
+        cpu_threads=0,
+        num_workers=1,
+    ),
+    "accurate": DecodeProfile(
+        name="accurate",
+        beam_size=5,
+        best_of=5,
+        temperature=FALLBACK_TEMPERATURES,
+        vad_filter=True,
+        vad_min_silence_ms=2000,
+        vad_speech_pad_ms=400,
+        cpu_threads=min(usable_cpus(), 8),
+        num_workers=1,
+    ),
+}
+DEFAULT_PROFILE_NAME = "balanced"
+DEFAULT_PROFILE = (os.environ.get("VOICE_STT_PROFILE") or DEFAULT_PROFILE_NAME).strip().lower()
+DEFAULT_PROFILE_RULE = (os.environ.get("VOICE_STT_PROFILE_RULE") or "").strip()
+PROFILE_RULE_PATTERN = re.compile(r"^\s*([a-z]+)\s*([<>])\s*(\d+(?:\.\d+)?)\s*$")
+
+# (profile name, "<" or ">", clip seconds)
+ProfileRule = tuple[str, str, float]
+
+
+def get_profile(name: Optional[str]) -> DecodeProfile:
+    """Look up a profile; unknown names (e.g. from a newer bridge) fall back to the default."""
+    return DECODE_PROFILES.get((name or "").strip().lower(), DECODE_PROFILES[DEFAULT_PROFILE_NAME])
+
+
+def normalize_profile_name(value: str) -> str:
+    normalized = (value or "").strip().lower()
+    if normalized in DECODE_PROFILES:
+        return normalized
+    return DEFAULT_PROFILE_NAME
+
+
+def parse_profile_rule(spec: str) -> list[ProfileRule]:
+    """Parse `accurate<4,fastest>20`: clips under 4s use accurate, over 20s use fastest.
+
+    Rules are checked in order and the first match wins; other clips keep the base profile.
+    """
+    rules: list[ProfileRule] = []
+    for item in (spec or "").split(","):
+        if not item.strip():
+            continue
+        match = PROFILE_RULE_PATTERN.match(item.lower())
+        if match is None or match.group(1) not in DECODE_PROFILES:
+            known = ", ".join(DECODE_PROFILES)
+            raise ValueError(f"invalid profile rule '{item.strip()}'; expected <profile><|><seconds> with one of {known}.")
+        rules.append((match.group(1), match.group(2), float(match.group(3))))
+    return rules
+
+
+def select_profile(base: DecodeProfile, rules: list[ProfileRule], clip_seconds: Optional[float]) -> DecodeProfile:
+    if clip_seconds is None:
+        return base
+    for name, comparison, seconds in rules:
+        if (comparison == "<" and clip_seconds < seconds) or (comparison == ">" and clip_seconds > seconds):
+            return DECODE_PROFILES[name]
+    return base
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import signal
+import socketserver
+import sys
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+from cpu_budget import CpuBudget, parse_cpu_list
+from stt_client import SttServiceClient, default_socket_path, recv_message, send_message
+from model_cache import estimate_model_bytes
+from stt_engine import DEFAULT_BATCH_SIZE, DEFAULT_MODEL_CACHE_BYTES, SttEngine
+from stt_profiles import DECODE_PROFILES, DEFAULT_PROFILE, get_profile, normalize_profile_name
+
+
+DEFAULT_MODEL = os.environ.get("STT_MODEL", "tiny.en")
+DEFAULT_DEVICE = os.environ.get("STT_DEVICE", "cpu")
+DEFAULT_COMPUTE_TYPE = os.environ.get("STT_COMPUTE_TYPE", "int8")
+DEFAULT_STT_THREADS = int(os.environ.get("VOICE_STT_THREADS", "0"))
+DEFAULT_STT_WORKERS = int(os.environ.get("VOICE_STT_WORKERS", "0"))
+DEFAULT_STT_CPUS = os.environ.get("VOICE_STT_CPUS", "").strip()
+DEFAULT_STT_NICE = int(os.environ.get("VOICE_STT_NICE", "0"))
+DEFAULT_STT_IDLE_UNLOAD_MINUTES = float(os.environ.get("VOICE_STT_IDLE_UNLOAD_MINUTES", "0"))
+DEFAULT_STT_BATCH_SIZE = int(os.environ.get("VOICE_STT_BATCH_SIZE", str(DEFAULT_BATCH_SIZE)))
+DEFAULT_STT_MODEL_CACHE_MB = int(
+    os.environ.get("VOICE_STT_MODEL_CACHE_MB", str(DEFAULT_MODEL_CACHE_BYTES // (1024 * 1024)))
+)
+
+
+class SttRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self) -> None:
+        try:
+            header, payload = recv_message(self.request)
+        except (OSError, ValueError):
+            return
+        try:
+            response = self.server.dispatch(header, payload)
+        except Exception as error:
+            response = {"ok": False, "error": str(error)}
+        try:
+            send_message(self.request, response)
+        except OSError:
+            pass
+
+
+class SttServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serves transcription for every voice bridge on the host from one set of loaded models."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        socket_path: str,
+        cpu_budget: Optional[CpuBudget] = None,
+        batch_size: int = DEFAULT_STT_BATCH_SIZE,
+        idle_unload_minutes: float = DEFAULT_STT_IDLE_UNLOAD_MINUTES,
+        model_cache_bytes: int = DEFAULT_MODEL_CACHE_BYTES,
+    ):
+        self.cpu_budget = cpu_budget or CpuBudget()
+        self.batch_size = batch_size
+        self.idle_unload_seconds = max(0.0, idle_unload_minutes) * 60.0
+        # Every engine holds its own model, so the daemon bounds them together, least recently used first.
+        self.model_cache_bytes = max(0, int(model_cache_bytes))
+        self._engines: "OrderedDict[tuple[str, str, str, str], SttEngine]" = OrderedDict()
+        self._engines_lock = threading.Lock()
+        super().__init__(socket_path, SttRequestHandler)
+
+    def engine_for(self, model: str, device: str, compute_type: str, profile: str = DEFAULT_PROFILE) -> SttEngine:
+        # Profiles differ in cpu_threads/num_workers, which are fixed when a model loads.
+        profile = get_profile(profile).name
+        key = (model, device, compute_type, profile)
+        evicted: list[SttEngine] = []
+        with self._engines_lock:
+            engine = self._engines.get(key)
+            if engine is None:
+                engine = SttEngine(
+                    model=model,
+                    device=device,
+                    compute_type=compute_type,
+                    profile=profile,
+                    cpu_budget=self.cpu_budget,
+                    batch_size=self.batch_size,
+                    model_cache_bytes=self.model_cache_bytes,
+                    idle_unload_seconds=self.idle_unload_seconds,
+                )
+                self._engines[key] = engine
+                evicted = self._evict_engines()
+            else:
+                self._engines.move_to_end(key)
+        # Outside the lock: unloading waits for a load in progress. A decode already running on
+        # an evicted engine keeps its model and finishes normally.
+        for old_engine in evicted:
+            old_engine.unload()
+        return engine
+
+    def _evict_engines(self) -> list[SttEngine]:
+        """Drop the least recently used engines until the rest fit `model_cache_bytes`; the newest always stays."""
+        sizes = {
+            key: max(engine.loaded_bytes, estimate_model_bytes(key[0], key[2])) for key, engine in self._engines.items()
+        }
+        total = sum(sizes.values())
+        evicted = []
+        while total > self.model_cache_bytes and len(self._engines) > 1:
+            key, engine = self._engines.popitem(last=False)
+            total -= sizes[key]
+            evicted.append(engine)
+        return evicted
+
+    def dispatch(self, header: dict, payload: bytes) -> dict:
+        op = header.get("op")
+        if op == "ping":
+            return {"ok": True, "pid": os.getpid()}
+        if op not in ("transcribe", "warm"):
+            return {"ok": False, "error": f"unknown op '{op}'"}
+
+        engine = self.engine_for(
+            model=str(header.get("model") or DEFAULT_MODEL),
+            device=str(header.get("device") or DEFAULT_DEVICE),
+            compute_type=str(header.get("compute_type") or DEFAULT_COMPUTE_TYPE),
+            profile=str(header.get("model_profile") or DEFAULT_PROFILE),
+        )
+        if op == "warm":
+            # Sent when a bridge starts recording; the load overlaps the speech instead of the first decode.
+            engine.preload()
+            return {"ok": True, "loaded": engine.is_loaded}
+        if header.get("path"):
+            audio = str(header["path"])
+        elif header.get("format") == "f32le":
+            audio = np.frombuffer(payload, dtype="<f4")
+        else:
+            return {"ok": False, "error": "transcribe request has no audio."}
+        session = header.get("session")
+        text, language = engine.transcribe_local_detailed(
+            audio,
+            language=str(header.get("language") or "en"),
+            profile=get_profile(header.get("profile") or header.get("model_profile") or DEFAULT_PROFILE),
+            # Without a session id (older clients), `auto` shares the engine's own sticky language.
+            session=str(session) if session else None,
+            update_language=bool(header.get("update_language", True)),
+        )
+        return {"ok": True, "text": text, "language": language}
+
+
+def claim_socket_path(socket_path: str) -> bool:
+    """Remove a stale socket file; return False when a live daemon already owns the path."""
+    if not os.path.exists(socket_path):
+        return True
+    if SttServiceClient(socket_path).is_available():
+        return False
+    try:
+        os.remove(socket_path)
+    except OSError:
+        pass
+    return True
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Shared speech-to-text daemon for voice bridges.")
+    parser.add_argument("--socket", default=default_socket_path(), help="Unix socket path to listen on.")
+    parser.add_argument("--stt-model", dest="model", default=DEFAULT_MODEL, help="Model to preload.")
+    parser.add_argument("--stt-device", dest="device", default=DEFAULT_DEVICE, help="STT device (cpu|auto|cuda).")
+    parser.add_argument("--stt-compute-type", dest="compute_type", default=DEFAULT_COMPUTE_TYPE, help="STT compute type.")
+    parser.add_argument(
+        "--stt-profile",
+        dest="profile",
+        choices=sorted(DECODE_PROFILES),
+        default=normalize_profile_name(DEFAULT_PROFILE),
+        help="Decoding profile whose thread settings the preloaded model uses.",
+    )
+    parser.add_argument("--stt-threads", type=int, default=DEFAULT_STT_THREADS, help="CTranslate2 intra-op threads.")
+    parser.add_argument("--stt-workers", type=int, default=DEFAULT_STT_WORKERS, help="CTranslate2 inter-op workers.")
+    parser.add_argument("--stt-cpus", default=DEFAULT_STT_CPUS, help="Pin the daemon to these CPUs, e.g. '4-7'.")
+    parser.add_argument(
+        "--stt-batch-size",
+        type=int,
+        default=DEFAULT_STT_BATCH_SIZE,
+        help="Chunks of a long clip decoded per batch (below 2 disables).",
+    )
+    parser.add_argument(
+        "--stt-idle-unload-minutes",
+        type=float,
+        default=DEFAULT_STT_IDLE_UNLOAD_MINUTES,
+        help="Release a model after this many minutes without requests (0 keeps models loaded).",
+    )
+    parser.add_argument(
+        "--stt-model-cache-mb",
+        type=int,
+        default=DEFAULT_STT_MODEL_CACHE_MB,
+        help="Memory budget for loaded models across all clients (least recently used go first).",
+    )
+    parser.add_argument("--stt-nice", type=int, default=DEFAULT_STT_NICE, help="Niceness (0-19) for the daemon.")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    try:
+        cpus = parse_cpu_list(args.stt_cpus)
+    except ValueError as error:
+        sys.stderr.write(f"[voice-stt] {error}\n")
+        return 2
+    cpu_budget = CpuBudget(
+        threads=max(0, args.stt_threads),
+        workers=max(0, args.stt_workers),
+        cpus=cpus,
+        nice=max(0, min(args.stt_nice, 19)),
+    )
+    if not claim_socket_path(args.socket):
+        sys.stderr.write(f"[voice-stt] already running at {args.socket}\n")
+        return 0
+
+    old_umask = os.umask(0o177)
+    try:
+        server = SttServer(
+            args.socket,
+            cpu_budget=cpu_budget,
+            batch_size=args.stt_batch_size,
+            idle_unload_minutes=args.stt_idle_unload_minutes,
+            model_cache_bytes=max(0, args.stt_model_cache_mb) * 1024 * 1024,
+        )
+    finally:
+        os.umask(old_umask)
+
+    def shutdown_handler(signum, frame):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, shutdown_handler)
+    signal.signal(signal.SIGINT, shutdown_handler)
+
+    # Request handler threads and CTranslate2 pools start after this and inherit the budget.
+    problem = cpu_budget.apply_to_process()
+    if problem:
+        sys.stderr.write(f"[voice-stt] cpu budget not fully applied: {problem}\n")
+    engine = server.engine_for(args.model, args.device, args.compute_type, args.profile)
+    sys.stderr.write(f"[voice-stt] loading model '{args.model}'...\n")
+    try:
+        engine.load()
+    except Exception as error:
+        sys.stderr.write(f"[voice-stt] model preload failed: {error}\n")
+    sys.stderr.write(f"[voice-stt] listening on {args.socket}\n")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        try:
+            os.remove(args.socket)
+        except OSError:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
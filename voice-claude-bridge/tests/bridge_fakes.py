@@ -0,0 +1,88 @@
+import importlib.util
+import select
+import sys
+import time
+from pathlib import Path
+
+
+module_dir = Path(__file__).resolve().parents[1]
+
+
+def load_cli_module():
+    # Add module directory to sys.path so it can find local imports like audio_capture
+    if str(module_dir) not in sys.path:
+        sys.path.insert(0, str(module_dir))
+
+    spec = importlib.util.spec_from_file_location("voice_claude_bridge_cli", module_dir / "cli.py")
+    module = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_bridge(cli, **overrides):
+    """A VoiceClaudeCliBridge running `cat` with tiny.en on the Linux backend; keyword arguments override."""
+    options = dict(
+        claude_command="cat",
+        language="en",
+        model="tiny.en",
+        device="cpu",
+        compute_type="int8",
+        record_source="",
+        sample_rate=16000,
+        auto_send=False,
+        record_key="ctrl-k",
+        audio_backend=cli.select_audio_backend("linux"),
+    )
+    options.update(overrides)
+    return cli.VoiceClaudeCliBridge(**options)
+
+
+def run_queued_transcriptions(bridge, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while bridge._transcriptions.pending and time.monotonic() < deadline:
+        select.select([bridge._wake_read_fd], [], [], 0.05)
+    bridge._drain_loop_callbacks()
+
+
+class FakeStt:
+    """Stands in for SttEngine: records every decode and answers without a model.
+
+    Each reply is a string, a list of strings handed out in order, or a callable taking
+    (audio, language, model); a call is recorded before its reply is computed.
+    """
+
+    is_loaded = True
+
+    def __init__(self, reply="hello world", draft_reply=None, partial_reply=None, model_name="tiny.en", draft_model=""):
+        self.reply = reply
+        self.draft_reply = draft_reply
+        self.partial_reply = partial_reply
+        self.model_name = model_name
+        self.draft_model = draft_model
+        self.calls = []
+        self.draft_calls = []
+        self.partial_calls = []
+
+    @staticmethod
+    def _answer(reply, audio, language, model):
+        if callable(reply):
+            return reply(audio, language, model)
+        if isinstance(reply, list):
+            return reply.pop(0)
+        return reply
+
+    def transcribe(self, audio, language, model=None):
+        self.calls.append((audio, language, model))
+        return self._answer(self.reply, audio, language, model)
+
+    def draft(self, audio, language, model=None):
+        self.draft_calls.append((audio, language, model))
+        return self._answer(self.draft_reply, audio, language, model)
+
+    def partial(self, audio, language, model=None):
+        self.partial_calls.append((audio, language, model))
+        return self._answer(self.partial_reply, audio, language, model)
+
+    def draft_model_for(self, model=None):
+        return self.draft_model
@@ -1,3 +1,6 @@
+import os
+import tempfile
+import time
 import unittest
 from unittest.mock import patch
 import sys
@@ -90,6 +93,66 @@ class AudioCaptureBackendTests(unittest.TestCase):
             ],
         )
 
+    def test_resolve_source_reuses_cached_source_while_fingerprint_matches(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = audio_capture.CaptureSourceCache(os.path.join(tmpdir, "sources.json"))
+            backend = audio_capture.PulseAudioBackend(source_cache=cache)
+            sources = ["alsa_input.pci", "usb_mic", "default"]
+            probed = []
+
+            def probe(candidates, sample_rate):
+                probed.append(list(candidates))
+                return "usb_mic"
+
+            with patch.object(backend, "candidate_sources", return_value=sources), patch.object(
+                backend, "probe_sources", side_effect=probe
+            ):
+                self.assertEqual(backend.resolve_source("", 16000), "usb_mic")
+                self.assertEqual(probed, [sources])
+
+                probed.clear()
+                self.assertEqual(backend.resolve_source("", 16000), "usb_mic")
+                self.assertEqual(probed, [])
+
+                backend.forget_cached_source(16000)
+                self.assertEqual(backend.resolve_source("", 16000), "usb_mic")
+                self.assertEqual(probed, [sources])
+
+    def test_source_cache_invalidated_when_source_list_changes(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = audio_capture.CaptureSourceCache(os.path.join(tmpdir, "sources.json"))
+            before = audio_capture.sources_fingerprint(["a", "b"])
+            cache.store("linux-pulse", 16000, before, "b")
+            self.assertEqual(cache.lookup("linux-pulse", 16000, before), "b")
+            self.assertIsNone(cache.lookup("linux-pulse", 48000, before))
+            self.assertIsNone(cache.lookup("linux-pulse", 16000, audio_capture.sources_fingerprint(["a", "b", "c"])))
+
+    def test_probe_sources_runs_concurrently_and_prefers_priority_order(self):
+        scripts = {
+            "silent": "pass",
+            "hung": "import time; time.sleep(5)",
+            "slow": "import sys, time; time.sleep(0.2); sys.stdout.buffer.write(b'x' * 64); sys.stdout.flush(); time.sleep(5)",
+            "fast": "import sys, time; sys.stdout.buffer.write(b'x' * 64); sys.stdout.flush(); time.sleep(5)",
+        }
+        backend = audio_capture.PulseAudioBackend()
+        with patch.object(
+            backend,
+            "build_record_command",
+            side_effect=lambda source, sample_rate: [sys.executable, "-c", scripts[source]],
+        ):
+            started = time.monotonic()
+            self.assertEqual(backend.probe_sources(["silent", "slow", "fast"], 16000, window=2.0), "slow")
+            self.assertLess(time.monotonic() - started, 1.5)
+
+            started = time.monotonic()
+            self.assertEqual(backend.probe_sources(["hung", "silent", "fast"], 16000, window=0.5), "fast")
+            elapsed = time.monotonic() - started
+            self.assertGreaterEqual(elapsed, 0.5)
+            self.assertLess(elapsed, 1.5)
+
+            self.assertIsNone(backend.probe_sources(["silent", "silent"], 16000, window=2.0))
+            self.assertTrue(backend.source_supports_capture("fast", 16000))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,61 @@
+import sys
+import unittest
+from pathlib import Path
+
+module_dir = Path(__file__).resolve().parents[1]
+if str(module_dir) not in sys.path:
+    sys.path.insert(0, str(module_dir))
+
+import bench_latency
+
+
+class BenchLatencyTests(unittest.TestCase):
+    def test_percentile_uses_nearest_rank(self):
+        values = [0.4, 0.1, 0.3, 0.2]
+        self.assertEqual(bench_latency.percentile(values, 50), 0.2)
+        self.assertEqual(bench_latency.percentile(values, 90), 0.4)
+        self.assertEqual(bench_latency.percentile([0.5], 99), 0.5)
+
+    def test_synthetic_fixture_is_deterministic(self):
+        first = bench_latency.synthesize_fixture(0.5, 16000)
+        self.assertEqual(len(first), 16000)
+        self.assertEqual(first, bench_latency.synthesize_fixture(0.5, 16000))
+
+    def test_fake_stt_run_measures_every_stage_over_a_real_pty(self):
+        benchmark = bench_latency.LatencyBenchmark(
+            fixture=bench_latency.synthesize_fixture(0.3, 16000),
+            sample_rate=16000,
+            iterations=2,
+            bridge_args=[],
+            fake_text="run the tests",
+            fake_delay=0.05,
+            timeout=10.0,
+        )
+        result = benchmark.run("tiny.en", "int8")
+
+        self.assertEqual(result.outcomes, ["transcript updated", "transcript updated"])
+        for stage in bench_latency.STAGES:
+            self.assertEqual(len(result.samples[stage]), 2, stage)
+        self.assertGreaterEqual(min(result.samples["stt"]), 0.05)
+        rows = bench_latency.summarize(result)
+        self.assertEqual([row["stage"] for row in rows], list(bench_latency.STAGES))
+
+    def test_no_speech_clip_is_reported_as_skipped_without_waiting_for_timeout(self):
+        benchmark = bench_latency.LatencyBenchmark(
+            fixture=bytes(2 * 4800),
+            sample_rate=16000,
+            iterations=1,
+            bridge_args=[],
+            fake_text="unused",
+            timeout=10.0,
+        )
+        result = benchmark.run("tiny.en", "int8")
+
+        self.assertEqual(result.outcomes, ["no speech detected"])
+        self.assertEqual(result.no_speech, 1)
+        self.assertEqual(len(result.samples["start"]), 1)
+        self.assertEqual(result.samples["total"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,24 +1,20 @@
-import importlib.util
+import json
 import os
+import pty
+import subprocess
 import sys
 import tempfile
+import threading
+import time
 import unittest
 from pathlib import Path
 
 
-def load_cli_module():
-    module_dir = Path(__file__).resolve().parents[1]
-    module_path = module_dir / "cli.py"
-    
-    # Add module directory to sys.path so it can find local imports like audio_capture
-    if str(module_dir) not in sys.path:
-        sys.path.insert(0, str(module_dir))
-        
-    spec = importlib.util.spec_from_file_location("voice_claude_bridge_cli", module_path)
-    module = importlib.util.module_from_spec(spec)
-    assert spec and spec.loader
-    spec.loader.exec_module(module)
-    return module
+tests_dir = Path(__file__).resolve().parent
+if str(tests_dir) not in sys.path:
+    sys.path.insert(0, str(tests_dir))
+
+from bridge_fakes import FakeStt, load_cli_module, make_bridge, run_queued_transcriptions
 
 
 class VoiceClaudeCliHelperTests(unittest.TestCase):
@@ -105,12 +101,34 @@ class VoiceClaudeCliHelperTests(unittest.TestCase):
         self.assertTrue(self.cli.record_key_sequence_is_partial(b"\x1b[1", "f8"))
         self.assertFalse(self.cli.record_key_sequence_is_partial(b"\x1b[A", "f8"))
 
+    def test_record_key_scanner_forwards_spans_around_hotkeys(self):
+        scanner = self.cli.RecordKeyScanner("ctrl-k")
+        self.assertEqual(scanner.scan(b"abc\x0bdef\x0b"), (b"abcdef", 2, 8))
+        self.assertEqual(scanner.scan(b"plain"), (b"plain", 0, 5))
+
+        f8 = self.cli.RecordKeyScanner("f8")
+        self.assertEqual(f8.scan(b"x\x1b[19~y\x1b[A\x1b[1"), (b"xy\x1b[A", 1, 10))
+        self.assertEqual(f8.scan(b"\x1b[1" + b"9~"), (b"", 1, 5))
+
+    def test_record_key_scanner_handles_large_pastes_in_linear_time(self):
+        scanner = self.cli.RecordKeyScanner("ctrl-k")
+        paste = b"line of pasted source code\n" * 8000
+        started = time.monotonic()
+        forward, presses, consumed = scanner.scan(paste + b"\x0b")
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual((forward, presses, consumed), (paste, 1, len(paste) + 1))
+
     def test_resolve_stt_profile_switches_english_only_model_for_zh(self):
         language, model, notice = self.cli.resolve_stt_profile(language="zh", model="tiny.en")
         self.assertEqual(language, "zh")
         self.assertEqual(model, "small")
         self.assertIsNotNone(notice)
 
+    def test_resolve_stt_profile_switches_english_only_model_for_auto(self):
+        language, model, notice = self.cli.resolve_stt_profile(language="Auto", model="medium.en")
+        self.assertEqual((language, model), ("auto", "medium"))
+        self.assertIn("cannot detect languages", notice)
+
     def test_resolve_stt_profile_keeps_multilingual_model_for_zh(self):
         language, model, notice = self.cli.resolve_stt_profile(language="zh_cn", model="base")
         self.assertEqual(language, "zh")
@@ -118,63 +136,33 @@ class VoiceClaudeCliHelperTests(unittest.TestCase):
         self.assertIsNone(notice)
 
     def test_transcript_draft_accumulates(self):
-        backend = self.cli.select_audio_backend("linux")
-        bridge = self.cli.VoiceClaudeCliBridge(
-            claude_command="cat",
-            language="en",
-            model="tiny.en",
-            device="cpu",
-            compute_type="int8",
-            record_source="",
-            sample_rate=16000,
-            auto_send=False,
-            record_key="ctrl-k",
-            audio_backend=backend,
-        )
+        bridge = make_bridge(self.cli)
         self.assertEqual(bridge._append_transcript_draft("hello"), "hello")
         self.assertEqual(bridge._append_transcript_draft("world"), "hello world")
         self.assertEqual(bridge._append_transcript_draft(""), "hello world")
         self.assertEqual(bridge._append_transcript_draft(" again"), "hello world again")
 
     def test_auto_send_appends_multiple_transcripts_without_enter(self):
-        backend = self.cli.select_audio_backend("linux")
-
-        class FakeStt:
-            def __init__(self):
-                self._items = ["first chunk", "second chunk"]
-
-            def transcribe_file(self, wav_path: str, language: str) -> str:
-                _ = (wav_path, language)
-                return self._items.pop(0)
-
-        bridge = self.cli.VoiceClaudeCliBridge(
-            claude_command="cat",
-            language="en",
-            model="tiny.en",
-            device="cpu",
-            compute_type="int8",
-            record_source="",
-            sample_rate=16000,
-            auto_send=True,
-            record_key="ctrl-k",
-            audio_backend=backend,
-        )
-        bridge.stt_engine = FakeStt()
+        bridge = make_bridge(self.cli, auto_send=True)
+        bridge.stt_engine = FakeStt(reply=["first chunk", "second chunk"])
 
         read_fd, write_fd = os.pipe()
         bridge._master_fd = write_fd
+        bridge._open_wake_pipe()
         try:
             tmp1 = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
             tmp1.close()
             tmp2 = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
             tmp2.close()
 
-            bridge._transcribe_and_maybe_send(tmp1.name)
-            bridge._transcribe_and_maybe_send(tmp2.name)
+            bridge._queue_transcription(lambda: bridge._transcribe_audio(tmp1.name))
+            bridge._queue_transcription(lambda: bridge._transcribe_audio(tmp2.name))
+            run_queued_transcriptions(bridge)
 
             os.close(write_fd)
             payload = os.read(read_fd, 1024).decode("utf-8", errors="ignore")
         finally:
+            bridge._close_wake_pipe()
             os.close(read_fd)
             try:
                 os.close(write_fd)
@@ -182,8 +170,460 @@ class VoiceClaudeCliHelperTests(unittest.TestCase):
                 pass
 
         self.assertEqual(payload, "first chunk second chunk ")
+        self.assertFalse(os.path.exists(tmp1.name))
         self.assertEqual(bridge._transcript_draft, "first chunk second chunk")
 
+    def test_recorder_command_runs_under_requested_nice(self):
+        backend = self.cli.select_audio_backend("linux")
+        backend.build_record_command = lambda source, sample_rate: ["parec", f"--device={source}"]
+        bridge = make_bridge(self.cli, audio_backend=backend, recorder_nice=-30)
+        self.assertEqual(bridge.recorder_nice, -20)
+        if not self.cli.nice_allowed(-20):
+            self.assertEqual(bridge._record_command("mic"), ["parec", "--device=mic"])
+        bridge.recorder_nice = 3
+        command = bridge._record_command("mic")
+        self.assertEqual(command[-4:], ["-n", "3", "parec", "--device=mic"])
+
+    def test_normalize_capture_mode_defaults_to_memory(self):
+        self.assertEqual(self.cli.normalize_capture_mode("file"), "file")
+        self.assertEqual(self.cli.normalize_capture_mode(" MEMORY "), "memory")
+        self.assertEqual(self.cli.normalize_capture_mode("bogus"), "memory")
+
+    def test_memory_capture_hands_float_samples_to_stt_without_temp_files(self):
+        bridge = make_bridge(self.cli, capture_mode="memory")
+        pcm = b"\x00\x40" * 1600
+        script = f"import sys; sys.stdout.buffer.write({pcm!r}); sys.stdout.flush()"
+        pipe = self.cli.PipeRecorder(command=[sys.executable, "-c", script], sample_rate=16000)
+        pipe.start()
+        pipe.process.wait(timeout=5)
+        bridge._recorder = self.cli.RecorderState(process=pipe.process, pipe=pipe)
+
+        audio = bridge._stop_recording()
+
+        self.assertEqual(audio.dtype.name, "float32")
+        self.assertEqual(audio.shape, (1600,))
+        self.assertAlmostEqual(float(audio[0]), 0.5)
+        self.assertIsNone(bridge._recorder.pipe)
+
+    def test_dictation_trace_records_capture_and_transcription_stages(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            trace_path = os.path.join(tmp, "trace.jsonl")
+            bridge = make_bridge(self.cli, tracer=self.cli.TraceRecorder(jsonl_path=trace_path))
+            bridge.stt_engine = FakeStt(reply="traced")
+            pcm = b"\x00\x40" * 8000
+            script = f"import sys; sys.stdout.buffer.write({pcm!r}); sys.stdout.flush()"
+            trace = bridge.tracer.begin()
+            spawned_at = time.monotonic()
+            pipe = self.cli.PipeRecorder(command=[sys.executable, "-c", script], sample_rate=16000)
+            pipe.start()
+            pipe.process.wait(timeout=5)
+            bridge._recorder = self.cli.RecorderState(process=pipe.process, pipe=pipe, trace=trace, spawned_at=spawned_at)
+            bridge._open_wake_pipe()
+            try:
+                audio = bridge._stop_recording()
+                bridge._queue_transcription(lambda: bridge._transcribe_audio(audio, trace), trace)
+                run_queued_transcriptions(bridge)
+            finally:
+                bridge._close_wake_pipe()
+            with open(trace_path, encoding="utf-8") as handle:
+                record = json.loads(handle.readline())
+
+        spans = {span["name"]: span for span in record["spans"]}
+        self.assertEqual(set(spans), {"first_audio", "stop_drain", "transcribe", "pty_inject"})
+        self.assertEqual(spans["transcribe"]["audio_seconds"], 0.5)
+        self.assertIn("rtf", spans["transcribe"])
+        self.assertEqual(record["outcome"], "transcribed")
+
+    def test_silent_capture_reports_no_speech_without_calling_stt(self):
+        bridge = make_bridge(self.cli)
+        bridge.stt_engine = FakeStt(reply="hallucinated")
+        messages = []
+        bridge._print_status = messages.append
+        pcm = b"\x00\x00" * 16000
+        script = f"import sys; sys.stdout.buffer.write({pcm!r}); sys.stdout.flush()"
+        pipe = self.cli.PipeRecorder(command=[sys.executable, "-c", script], sample_rate=16000)
+        pipe.start()
+        pipe.process.wait(timeout=5)
+        bridge._recorder = self.cli.RecorderState(process=pipe.process, pipe=pipe)
+
+        bridge._toggle_recording()
+
+        self.assertEqual(bridge.stt_engine.calls, [])
+        self.assertEqual(messages, ["no speech detected."])
+        self.assertEqual(bridge._transcriptions.pending, 0)
+
+    def test_hands_free_transcribes_each_utterance_and_hotkey_pauses_listening(self):
+        backend = self.cli.select_audio_backend("linux")
+        bridge = make_bridge(self.cli, audio_backend=backend, armed=True, hands_free=True, end_silence_ms=300)
+        self.assertFalse(bridge.armed)
+        stt = FakeStt(reply=lambda audio, language, model: f"utterance {len(stt.calls)}")
+        bridge.stt_engine = stt
+        messages = []
+        bridge._print_status = messages.append
+        script = (
+            "import math, struct, sys\n"
+            "tone = b''.join(struct.pack('<h', int(9000 * math.sin(2 * math.pi * 220 * i / 16000))) for i in range(8000))\n"
+            "gap = bytes(2 * 8000)\n"
+            "sys.stdout.buffer.write(gap + tone + gap + tone + gap)\n"
+            "sys.stdout.flush()\n"
+        )
+        backend.build_record_command = lambda source, sample_rate: [sys.executable, "-c", script]
+        bridge._open_wake_pipe()
+        try:
+            bridge._start_hands_free("mic")
+            bridge._hands_free_listener._reader.join(timeout=5)
+            bridge._drain_loop_callbacks()
+            run_queued_transcriptions(bridge)
+
+            self.assertEqual(len(stt.calls), 2)
+            self.assertEqual(bridge._transcript_draft, "utterance 1 utterance 2")
+            bridge._toggle_recording()
+            self.assertTrue(bridge._hands_free_listener.paused)
+            self.assertIsNone(bridge._recorder.process)
+            self.assertEqual(messages[-1], "listening paused.")
+        finally:
+            bridge._stop_hands_free()
+            bridge._close_wake_pipe()
+
+    def test_stt_preload_loads_model_once_in_background(self):
+        engine = self.cli.SttEngine(model="tiny.en", device="cpu", compute_type="int8")
+        loads = []
+        engine._load_model = lambda name=None: loads.append("load") or object()
+        results = []
+        done = threading.Event()
+        engine.preload(on_done=lambda error, elapsed: results.append(error) or done.set())
+        self.assertTrue(done.wait(5))
+
+        self.assertTrue(engine.is_loaded)
+        self.assertEqual(results, [None])
+        engine._ensure_model()
+        engine.preload()
+        self.assertEqual(loads, ["load"])
+
+    def test_loop_callbacks_run_when_wake_pipe_is_drained(self):
+        bridge = make_bridge(self.cli)
+        bridge._open_wake_pipe()
+        try:
+            calls = []
+            bridge._call_soon_threadsafe(lambda: calls.append("ready"))
+            self.assertEqual(calls, [])
+            bridge._drain_loop_callbacks()
+            self.assertEqual(calls, ["ready"])
+        finally:
+            bridge._close_wake_pipe()
+
+    def test_failing_loop_callback_is_reported_and_later_callbacks_still_run(self):
+        bridge = make_bridge(self.cli)
+        messages = []
+        bridge._print_status = messages.append
+        bridge._open_wake_pipe()
+        try:
+            calls = []
+
+            def fail():
+                raise OSError(28, "No space left on device")
+
+            bridge._call_soon_threadsafe(fail)
+            bridge._call_soon_threadsafe(lambda: calls.append("ready"))
+            self.assertTrue(bridge._drain_loop_callbacks())
+        finally:
+            bridge._close_wake_pipe()
+
+        self.assertEqual(calls, ["ready"])
+        self.assertEqual(messages, ["background task failed: [Errno 28] No space left on device"])
+
+    def test_draft_preview_is_shown_before_final_text_is_delivered(self):
+        bridge = make_bridge(self.cli, model="small.en", trim_silence=False, draft_model="auto")
+        self.assertEqual(bridge.stt_engine.draft_model, "tiny.en")
+
+        drafted = threading.Event()
+
+        def final(audio, language, model):
+            # The draft runs beside the final decode; hold the final until it has posted.
+            drafted.wait(5)
+            time.sleep(0.05)
+            return "hello world"
+
+        bridge.stt_engine = FakeStt(
+            reply=final,
+            draft_reply=lambda audio, language, model: drafted.set() or "helo wrld",
+            draft_model="tiny.en",
+        )
+        messages = []
+        bridge._print_status = messages.append
+        trace = self.cli.DictationTrace(1)
+        bridge._open_wake_pipe()
+        try:
+            bridge._queue_transcription(lambda: bridge._transcribe_audio(self.cli.np.zeros(16000, dtype="float32"), trace))
+            run_queued_transcriptions(bridge)
+        finally:
+            bridge._close_wake_pipe()
+
+        self.assertIn("draft (refining): helo wrld", messages)
+        self.assertLess(messages.index("draft (refining): helo wrld"), messages.index("transcript updated."))
+        self.assertEqual(bridge._transcript_draft, "hello world")
+        self.assertIn("time_to_final_ms", trace.attributes)
+        self.assertIn("time_to_draft_ms", trace.attributes)
+
+    def test_final_decode_does_not_wait_for_draft_and_late_preview_is_dropped(self):
+        bridge = make_bridge(self.cli, model="small.en", trim_silence=False)
+        release_draft = threading.Event()
+        draft_finished = threading.Event()
+
+        def slow_draft(audio, language, model):
+            release_draft.wait(5)
+            draft_finished.set()
+            return "helo wrld"
+
+        bridge.stt_engine = FakeStt(draft_reply=slow_draft, draft_model="tiny.en")
+        messages = []
+        bridge._print_status = messages.append
+        bridge._open_wake_pipe()
+        try:
+            bridge._queue_transcription(lambda: bridge._transcribe_audio(self.cli.np.zeros(16000, dtype="float32")))
+            run_queued_transcriptions(bridge)
+            self.assertEqual(bridge._transcript_draft, "hello world")
+            release_draft.set()
+            self.assertTrue(draft_finished.wait(5))
+            time.sleep(0.05)
+            bridge._drain_loop_callbacks()
+        finally:
+            release_draft.set()
+            bridge._close_wake_pipe()
+
+        self.assertNotIn("draft (refining): helo wrld", messages)
+
+    def test_draft_preview_waits_for_earlier_clips_to_be_delivered(self):
+        bridge = make_bridge(self.cli, model="small.en", trim_silence=False)
+        release_first = threading.Event()
+        second_drafted = threading.Event()
+
+        def draft(audio, language, model):
+            if len(audio) == 16000:
+                return ""
+            second_drafted.set()
+            return "secnd"
+
+        def final(audio, language, model):
+            release_first.wait(5)
+            return "first" if len(audio) == 16000 else "second"
+
+        bridge.stt_engine = FakeStt(reply=final, draft_reply=draft, draft_model="tiny.en")
+        bridge._transcriptions = self.cli.TranscriptionQueue(deliver=bridge._call_soon_threadsafe, workers=2)
+        messages = []
+        bridge._print_status = messages.append
+        bridge._open_wake_pipe()
+        try:
+            bridge._queue_clip(self.cli.np.zeros(16000, dtype="float32"), None, "en", "small.en")
+            bridge._queue_clip(self.cli.np.zeros(32000, dtype="float32"), None, "en", "small.en")
+            self.assertTrue(second_drafted.wait(5))
+            time.sleep(0.05)
+            bridge._drain_loop_callbacks()
+            release_first.set()
+            run_queued_transcriptions(bridge)
+        finally:
+            release_first.set()
+            bridge._close_wake_pipe()
+
+        self.assertNotIn("draft (refining): secnd", messages)
+        self.assertEqual(bridge._transcript_draft, "first second")
+
+    def test_live_partials_draw_newest_words_only_while_recording(self):
+        bridge = make_bridge(self.cli, live_partials=True)
+        self.assertTrue(bridge.streaming)
+        messages = []
+        bridge._print_status = messages.append
+        pipe = object()
+        bridge._recorder = self.cli.RecorderState(pipe=pipe)
+        long_text = " ".join(f"word{index}" for index in range(100))
+
+        bridge._show_partial(pipe, "hello")
+        bridge._show_partial(pipe, "hello")
+        bridge._show_partial(pipe, long_text)
+        bridge._show_partial(object(), "late")
+
+        self.assertEqual(messages[0], "hearing: hello")
+        self.assertEqual(len(messages), 2)
+        self.assertTrue(messages[1].startswith("hearing: ..."))
+        self.assertTrue(messages[1].endswith("word99"))
+
+    def test_parse_language_choices_resolves_models_per_language(self):
+        self.assertEqual(
+            self.cli.parse_language_choices("en,zh", language="en", model="tiny.en"),
+            [("en", "tiny.en"), ("zh", "small")],
+        )
+        self.assertEqual(
+            self.cli.parse_language_choices("zh:medium, en", language="en", model="small.en"),
+            [("en", "small.en"), ("zh", "medium")],
+        )
+        self.assertEqual(self.cli.parse_language_choices("", language="en", model="tiny.en"), [("en", "tiny.en")])
+
+    def test_language_key_switches_language_and_model_between_forwarded_bytes(self):
+        bridge = make_bridge(
+            self.cli,
+            preload=False,
+            draft_model="auto",
+            language_choices=[("en", "tiny.en"), ("zh", "small")],
+        )
+        messages = []
+        bridge._print_status = messages.append
+        read_fd, write_fd = os.pipe()
+        bridge._master_fd = write_fd
+        try:
+            bridge._forward_to_agent(b"ab\x1ecd\x1e")
+            os.close(write_fd)
+            forwarded = os.read(read_fd, 64)
+        finally:
+            os.close(read_fd)
+
+        self.assertEqual(forwarded, b"abcd")
+        self.assertEqual(bridge.language, "en")
+        self.assertEqual(bridge.stt_engine.model_name, "tiny.en")
+        self.assertEqual(bridge.stt_engine.draft_model, "")
+        self.assertEqual(messages, ["stt language 'zh' (model 'small').", "stt language 'en' (model 'tiny.en')."])
+        bridge._cycle_language()
+        self.assertEqual((bridge.language, bridge.stt_engine.model_name, bridge.stt_engine.draft_model), ("zh", "small", "tiny"))
+
+    def test_clip_queued_before_language_switch_keeps_its_language_and_model(self):
+        bridge = make_bridge(
+            self.cli,
+            preload=False,
+            trim_silence=False,
+            language_choices=[("en", "tiny.en"), ("zh", "small")],
+        )
+        calls = []
+        switched = threading.Event()
+
+        def transcribe(audio, language, model=None):
+            switched.wait(5)
+            calls.append((language, model))
+            return "ok"
+
+        bridge.stt_engine.transcribe = transcribe
+        bridge._print_status = lambda message: None
+        bridge._recorder = self.cli.RecorderState(process=object(), language="en", model="tiny.en")
+        bridge._stop_recording = lambda: self.cli.np.zeros(16000, dtype="float32")
+        bridge._open_wake_pipe()
+        try:
+            bridge._toggle_recording()
+            bridge._cycle_language()
+            switched.set()
+            run_queued_transcriptions(bridge)
+        finally:
+            bridge._close_wake_pipe()
+
+        self.assertEqual(bridge.language, "zh")
+        self.assertEqual(calls, [("en", "tiny.en")])
+
+    def test_record_hotkey_rewarms_idle_unloaded_model(self):
+        bridge = make_bridge(self.cli, idle_unload_minutes=10)
+        engine = bridge.stt_engine
+        self.assertEqual(engine.idle_unload_seconds, 600)
+        loads = []
+        engine._load_model = lambda name=None: loads.append("load") or object()
+
+        bridge._rewarm_model()
+        self.assertIsNone(engine._preload_thread)
+
+        engine.idle_unloaded = True
+        bridge._rewarm_model()
+        deadline = time.monotonic() + 5
+        while engine._preload_thread is not None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(loads, ["load"])
+        self.assertTrue(engine.is_loaded)
+        self.assertFalse(engine.idle_unloaded)
+        engine._idle_timer.cancel()
+
+    def test_record_hotkey_warms_shared_daemon(self):
+        bridge = make_bridge(self.cli, stt_socket="/nonexistent/voice-stt.sock")
+        warmed = []
+        bridge.stt_engine.warm_service = lambda: warmed.append(True)
+
+        bridge._rewarm_model()
+        self.assertEqual(warmed, [True])
+        self.assertIsNone(bridge.stt_engine._preload_thread)
+
+    def test_write_all_finishes_partial_writes_on_a_full_nonblocking_pipe(self):
+        read_fd, write_fd = os.pipe()
+        os.set_blocking(write_fd, False)
+        payload = bytes(range(256)) * 2048
+        received = bytearray()
+
+        def reader():
+            while True:
+                chunk = os.read(read_fd, 65536)
+                if not chunk:
+                    return
+                received.extend(chunk)
+
+        thread = threading.Thread(target=reader)
+        thread.start()
+        try:
+            self.cli.write_all(write_fd, payload)
+        finally:
+            os.close(write_fd)
+            thread.join(timeout=5)
+            os.close(read_fd)
+        self.assertEqual(bytes(received), payload)
+
+    def test_pump_drains_large_pty_bursts_into_coalesced_writes(self):
+        bridge = make_bridge(self.cli)
+        # Several PTY-sized reads' worth, but small enough to sit in the pipe without a reader.
+        payload = b"0123456789abcdef" * 3750
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, payload)
+        os.close(write_fd)
+        os.set_blocking(read_fd, False)
+        bridge._master_fd = read_fd
+        writes = []
+        original_write_all = self.cli.write_all
+        self.cli.write_all = lambda fd, data: writes.append(bytes(data))
+        try:
+            self.assertFalse(bridge._pump_claude_output())
+        finally:
+            self.cli.write_all = original_write_all
+            os.close(read_fd)
+        self.assertEqual(writes, [payload])
+
+    def test_run_loop_returns_child_exit_code_without_polling(self):
+        module_dir = Path(__file__).resolve().parents[1]
+        script = (
+            "import sys\n"
+            f"sys.path.insert(0, {str(module_dir)!r})\n"
+            "import cli\n"
+            "backend = cli.select_audio_backend('linux')\n"
+            "backend.ensure_prereqs = lambda: None\n"
+            "backend.resolve_source = lambda configured_source, sample_rate: 'default'\n"
+            "bridge = cli.VoiceClaudeCliBridge(\n"
+            "    claude_command='sleep 0.3; echo child-done; exit 3', language='en', model='tiny.en',\n"
+            "    device='cpu', compute_type='int8', record_source='', sample_rate=16000, auto_send=False,\n"
+            "    record_key='ctrl-k', audio_backend=backend, preload=False)\n"
+            "sys.exit(bridge.run())\n"
+        )
+        master_fd, slave_fd = pty.openpty()
+        started = time.monotonic()
+        proc = subprocess.Popen(
+            [sys.executable, "-c", script], stdin=slave_fd, stdout=slave_fd, stderr=slave_fd, close_fds=True
+        )
+        os.close(slave_fd)
+        output = bytearray()
+        try:
+            while True:
+                try:
+                    chunk = os.read(master_fd, 4096)
+                except OSError:
+                    break
+                if not chunk:
+                    break
+                output.extend(chunk)
+            returncode = proc.wait(timeout=5)
+        finally:
+            os.close(master_fd)
+        self.assertEqual(returncode, 3, output.decode("utf-8", errors="ignore"))
+        self.assertIn(b"child-done", output)
+        self.assertLess(time.monotonic() - started, 3.0)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,94 @@
+import os
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+module_dir = Path(__file__).resolve().parents[1]
+if str(module_dir) not in sys.path:
+    sys.path.insert(0, str(module_dir))
+
+import cpu_budget
+from stt_engine import SttEngine
+
+
+def run_in_thread(target):
+    results = []
+    thread = threading.Thread(target=lambda: results.append(target()))
+    thread.start()
+    thread.join(timeout=5)
+    return results[0]
+
+
+class CpuBudgetTests(unittest.TestCase):
+    def test_parse_cpu_list_accepts_ranges_and_singles(self):
+        self.assertEqual(cpu_budget.parse_cpu_list("0-2, 5"), frozenset({0, 1, 2, 5}))
+        self.assertEqual(cpu_budget.parse_cpu_list(""), frozenset())
+        for spec in ("a", "3-1", "-2"):
+            with self.assertRaises(ValueError):
+                cpu_budget.parse_cpu_list(spec)
+
+    def test_explicit_threads_and_workers_override_profile(self):
+        profile_kwargs = {"cpu_threads": 8, "num_workers": 1}
+        self.assertEqual(
+            cpu_budget.CpuBudget(threads=2, workers=3).model_kwargs(profile_kwargs),
+            {"cpu_threads": 2, "num_workers": 3},
+        )
+        pinned = cpu_budget.CpuBudget(cpus=frozenset({4, 5}))
+        self.assertEqual(pinned.model_kwargs(profile_kwargs)["cpu_threads"], 2)
+        self.assertEqual(cpu_budget.CpuBudget().model_kwargs(profile_kwargs), profile_kwargs)
+
+    def test_engine_builds_model_with_budgeted_threads(self):
+        engine = SttEngine(
+            model="tiny.en",
+            device="cpu",
+            compute_type="int8",
+            profile="accurate",
+            cpu_budget=cpu_budget.CpuBudget(threads=3, workers=2),
+        )
+        self.assertEqual(engine._model_kwargs(), {"cpu_threads": 3, "num_workers": 2})
+
+    def test_prioritized_command_wraps_with_nice(self):
+        command = ["parec", "--raw"]
+        self.assertEqual(cpu_budget.prioritized_command(command, 0), command)
+        wrapped = cpu_budget.prioritized_command(command, -5)
+        if wrapped is not command:
+            self.assertEqual(wrapped[1:], ["-n", "-5", "parec", "--raw"])
+        self.assertTrue(cpu_budget.nice_allowed(5))
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "per-thread nice and affinity are Linux behavior")
+    def test_budget_applies_to_the_calling_thread_only(self):
+        own_cpus = os.sched_getaffinity(0)
+        pinned = frozenset({min(own_cpus)})
+        main_priority = os.getpriority(os.PRIO_PROCESS, 0)
+        budget = cpu_budget.CpuBudget(cpus=pinned, nice=min(19, main_priority + 5))
+
+        def worker():
+            problem = budget.apply_to_current_thread()
+            return problem, os.sched_getaffinity(0), os.getpriority(os.PRIO_PROCESS, 0)
+
+        problem, worker_cpus, worker_priority = run_in_thread(worker)
+        self.assertIsNone(problem)
+        self.assertEqual(worker_cpus, set(pinned))
+        self.assertEqual(worker_priority, budget.nice)
+        self.assertEqual(os.sched_getaffinity(0), own_cpus)
+        self.assertEqual(os.getpriority(os.PRIO_PROCESS, 0), main_priority)
+
+    def test_thread_guard_applies_once_per_thread(self):
+        calls = []
+
+        class CountingBudget(cpu_budget.CpuBudget):
+            def apply_to_current_thread(self):
+                calls.append(threading.get_ident())
+                return "nope"
+
+        guard = cpu_budget.ThreadBudgetGuard(CountingBudget(nice=1))
+        guard.ensure()
+        guard.ensure()
+        run_in_thread(guard.ensure)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(guard.last_problem, "nope")
+
+
+if __name__ == "__main__":
+    unittest.main()
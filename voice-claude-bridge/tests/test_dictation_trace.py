@@ -0,0 +1,61 @@
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+module_dir = Path(__file__).resolve().parents[1]
+if str(module_dir) not in sys.path:
+    sys.path.insert(0, str(module_dir))
+
+from dictation_trace import TraceRecorder
+
+
+class DictationTraceTests(unittest.TestCase):
+    def test_record_orders_spans_relative_to_dictation_start(self):
+        trace = TraceRecorder().begin()
+        with trace.span("transcribe", audio_seconds=2.0) as span:
+            span["rtf"] = 0.1
+        trace.add_span("source_resolve", trace.started, trace.started + 0.005, source=None)
+
+        record = trace.to_record()
+
+        self.assertEqual([span["name"] for span in record["spans"]], ["source_resolve", "transcribe"])
+        self.assertEqual(record["spans"][0]["duration_ms"], 5.0)
+        self.assertNotIn("source", record["spans"][0])
+        self.assertEqual(record["spans"][1]["audio_seconds"], 2.0)
+        self.assertEqual(record["spans"][1]["rtf"], 0.1)
+
+    def test_emit_appends_json_lines_and_chrome_events(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            jsonl_path = os.path.join(tmp, "trace.jsonl")
+            chrome_path = os.path.join(tmp, "trace.json")
+            recorder = TraceRecorder(jsonl_path=jsonl_path, chrome_trace_path=chrome_path)
+            for _ in range(2):
+                trace = recorder.begin()
+                start = time.monotonic()
+                trace.add_span("stop_drain", start, start + 0.01)
+                recorder.emit(trace)
+
+            with open(jsonl_path, encoding="utf-8") as handle:
+                records = [json.loads(line) for line in handle]
+            with open(chrome_path, encoding="utf-8") as handle:
+                chrome = handle.read()
+
+        self.assertEqual([record["dictation"] for record in records], [1, 2])
+        # The closing bracket is optional in the Chrome JSON array format.
+        events = json.loads(chrome.rstrip().rstrip(",") + "]")
+        self.assertEqual([event["tid"] for event in events], [1, 2])
+        self.assertEqual(events[0]["ph"], "X")
+        self.assertAlmostEqual(events[0]["dur"], 10000.0, delta=1.0)
+
+    def test_disabled_recorder_writes_nothing(self):
+        recorder = TraceRecorder()
+        self.assertFalse(recorder.enabled)
+        recorder.emit(recorder.begin())
+
+
+if __name__ == "__main__":
+    unittest.main()
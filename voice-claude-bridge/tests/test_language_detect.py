@@ -0,0 +1,147 @@
+import sys
+import unittest
+from pathlib import Path
+
+module_dir = Path(__file__).resolve().parents[1]
+if str(module_dir) not in sys.path:
+    sys.path.insert(0, str(module_dir))
+
+import numpy as np
+
+from language_detect import StickyLanguage, multilingual_model, pick_language
+from stt_engine import SttEngine
+
+
+class Segment:
+    def __init__(self, text, avg_logprob):
+        self.text = text
+        self.avg_logprob = avg_logprob
+        self.start = 0.0
+        self.end = 1.0
+
+
+class SpeakerModel:
+    """Detects `spoken` and decodes well only when asked for it."""
+
+    def __init__(self):
+        self.spoken = "zh"
+        self.detections = 0
+        self.decodes = []
+
+    def detect_language(self, audio):
+        self.detections += 1
+        other = "en" if self.spoken == "zh" else "zh"
+        return self.spoken, 0.9, [(self.spoken, 0.9), ("ja", 0.06), (other, 0.04)]
+
+    def transcribe(self, audio, language, **options):
+        self.decodes.append(language)
+        return iter([Segment(f"{language}-text", -0.3 if language == self.spoken else -1.6)]), None
+
+
+class LanguageHelperTests(unittest.TestCase):
+    def test_multilingual_model_drops_english_only_suffix(self):
+        self.assertEqual(multilingual_model("tiny.en"), "small")
+        self.assertEqual(multilingual_model("medium.en"), "medium")
+        self.assertEqual(multilingual_model("large-v3"), "large-v3")
+
+    def test_pick_language_renormalizes_over_candidates(self):
+        detections = [("ja", 0.5), ("zh", 0.3), ("en", 0.1)]
+        self.assertEqual(pick_language(detections), ("ja", 0.5))
+        language, probability = pick_language(detections, frozenset({"en", "zh"}))
+        self.assertEqual(language, "zh")
+        self.assertAlmostEqual(probability, 0.75)
+        self.assertIsNone(pick_language(detections, frozenset({"fr"})))
+
+    def test_low_confidence_detection_is_not_kept(self):
+        sticky = StickyLanguage(threshold=0.7)
+        sticky.observe("zh", 0.5)
+        self.assertIsNone(sticky.language)
+        sticky.observe("zh", 0.8)
+        self.assertEqual(sticky.language, "zh")
+        self.assertTrue(sticky.doubts(-1.4))
+        self.assertFalse(sticky.doubts(None))
+
+
+class StickyLanguageEngineTests(unittest.TestCase):
+    def make_engine(self, **options):
+        engine = SttEngine(model="small", device="cpu", compute_type="int8", **options)
+        engine._model = SpeakerModel()
+        return engine
+
+    def test_detects_once_then_reuses_session_language(self):
+        engine = self.make_engine()
+        audio = np.zeros(16000, dtype=np.float32)
+        self.assertEqual(engine.transcribe(audio, language="auto"), "zh-text")
+        self.assertEqual(engine.transcribe(audio, language="auto"), "zh-text")
+        self.assertEqual(engine._model.detections, 1)
+        self.assertEqual(engine.last_language, "zh")
+
+    def test_low_decode_confidence_redetects_and_redoes_clip(self):
+        engine = self.make_engine()
+        audio = np.zeros(16000, dtype=np.float32)
+        engine.transcribe(audio, language="auto")
+        engine._model.spoken = "en"
+        self.assertEqual(engine.transcribe(audio, language="auto"), "en-text")
+        self.assertEqual(engine._model.decodes, ["zh", "zh", "en"])
+        self.assertEqual(engine._model.detections, 2)
+        self.assertEqual(engine.sticky_language.language, "en")
+
+    def test_candidates_restrict_detection(self):
+        engine = self.make_engine(language_candidates=["en", "ja"])
+        audio = np.zeros(16000, dtype=np.float32)
+        engine.transcribe(audio, language="auto")
+        engine.transcribe(audio, language="auto")
+        self.assertEqual(engine._model.decodes, ["ja", "ja"])
+        # 0.06 / (0.06 + 0.04) is below the threshold, so each clip detects again.
+        self.assertIsNone(engine.sticky_language.language)
+        self.assertEqual(engine._model.detections, 2)
+
+    def test_partial_reads_session_language_without_detecting_or_forgetting(self):
+        engine = self.make_engine()
+        audio = np.zeros(16000, dtype=np.float32)
+        engine.partial(audio, language="auto")
+        self.assertEqual(engine._model.decodes, [None])
+        self.assertEqual(engine._model.detections, 0)
+        self.assertIsNone(engine.sticky_language.language)
+
+        engine.transcribe(audio, language="auto")
+        engine._model.spoken = "en"
+        engine.partial(audio, language="auto")
+        self.assertEqual(engine._model.decodes, [None, "zh", "zh"])
+        self.assertEqual(engine.sticky_language.language, "zh")
+        self.assertEqual(engine.last_language, "zh")
+
+    def test_sessions_keep_separate_sticky_languages(self):
+        engine = self.make_engine()
+        audio = np.zeros(16000, dtype=np.float32)
+        self.assertEqual(engine.transcribe_local_detailed(audio, language="auto", session="a"), ("zh-text", "zh"))
+        engine._model.spoken = "en"
+        self.assertEqual(engine.transcribe_local_detailed(audio, language="auto", session="b"), ("en-text", "en"))
+        self.assertEqual(engine.sticky_language_for("a").language, "zh")
+        self.assertEqual(engine.sticky_language_for("b").language, "en")
+        self.assertIsNone(engine.sticky_language.language)
+        self.assertEqual(engine._model.detections, 2)
+
+    def test_service_mode_reports_language_the_daemon_used(self):
+        engine = SttEngine(model="small", device="cpu", compute_type="int8", service_socket="/nonexistent/stt.sock")
+        requests = []
+
+        def transcribe_detailed(audio, **options):
+            requests.append(options)
+            return "hallo", "de"
+
+        engine._service.transcribe_detailed = transcribe_detailed
+        self.assertEqual(engine.transcribe(np.zeros(16000, dtype=np.float32), language="auto"), "hallo")
+        self.assertEqual(engine.last_language, "de")
+        self.assertEqual(requests[0]["session"], engine.session_id)
+        engine.partial(np.zeros(16000, dtype=np.float32), language="auto")
+        self.assertEqual((requests[1]["session"], requests[1]["update_language"]), (engine.session_id, False))
+
+    def test_fixed_language_skips_detection(self):
+        engine = self.make_engine()
+        engine.transcribe(np.zeros(16000, dtype=np.float32), language="zh")
+        self.assertEqual(engine._model.detections, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+module_dir = Path(__file__).resolve().parents[1]
+if str(module_dir) not in sys.path:
+    sys.path.insert(0, str(module_dir))
+
+import numpy as np
+
+import load_monitor
+from stt_engine import SttEngine
+
+
+class FakeProc:
+    """A throwaway /proc tree with loadavg and per-process stat/children files."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.ticks = os.sysconf("SC_CLK_TCK")
+
+    def set_load(self, load_1m: float) -> None:
+        Path(self.root, "loadavg").write_text(f"{load_1m:.2f} 0.50 0.40 2/300 12345\n")
+
+    def set_process(self, pid: int, cpu_seconds: float, children: tuple[int, ...] = ()) -> None:
+        task = Path(self.root, str(pid), "task", str(pid))
+        task.mkdir(parents=True, exist_ok=True)
+        (task / "children").write_text(" ".join(str(child) for child in children))
+        utime = int(cpu_seconds * self.ticks)
+        fields = ["S", "1", str(pid), str(pid), "0", "-1", "0", "0", "0", "0", "0", str(utime), "0", "0", "0"]
+        Path(self.root, str(pid), "stat").write_text(f"{pid} (node (agent)) {' '.join(fields)}\n")
+
+
+class LoadMonitorTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.proc = FakeProc(self.tmpdir.name)
+        self.now = 100.0
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def monitor(self, agent_pids):
+        return load_monitor.LoadMonitor(
+            agent_pids=lambda: agent_pids, proc_root=self.tmpdir.name, cpus=8, clock=lambda: self.now
+        )
+
+    def test_agent_cores_include_descendants_between_snapshots(self):
+        self.proc.set_load(2.0)
+        self.proc.set_process(10, cpu_seconds=5.0, children=(11,))
+        self.proc.set_process(11, cpu_seconds=1.0)
+        monitor = self.monitor([10])
+        first = monitor.snapshot()
+        self.assertEqual(first.agent_cores, 0.0)
+        self.assertAlmostEqual(first.pressure, 0.25)
+
+        self.now += 2.0
+        self.proc.set_process(10, cpu_seconds=6.0, children=(11,))
+        self.proc.set_process(11, cpu_seconds=3.0)
+        self.assertAlmostEqual(monitor.snapshot().agent_cores, 1.5)
+
+    def test_policy_levels(self):
+        policy = load_monitor.AdaptivePolicy(fallback_model="tiny.en")
+        self.assertEqual(policy.decide(load_monitor.LoadSnapshot(1.0, 8)).level, load_monitor.LOAD_NORMAL)
+        busy = policy.decide(load_monitor.LoadSnapshot(1.0, 8, agent_cores=1.2))
+        self.assertEqual((busy.level, busy.profile, busy.model), (load_monitor.LOAD_BUSY, "fastest", None))
+        self.assertEqual(policy.decide(load_monitor.LoadSnapshot(6.0, 8)).level, load_monitor.LOAD_BUSY)
+        saturated = policy.decide(load_monitor.LoadSnapshot(8.5, 8))
+        self.assertEqual((saturated.level, saturated.model, saturated.threads), ("saturated", "tiny.en", 1))
+        self.assertEqual(policy.decide(load_monitor.LoadSnapshot(None, 8)).level, load_monitor.LOAD_NORMAL)
+
+    def test_default_fallback_model_matches_language_coverage(self):
+        self.assertEqual(load_monitor.default_fallback_model("small.en"), "tiny.en")
+        self.assertEqual(load_monitor.default_fallback_model("small"), "tiny")
+        self.assertEqual(load_monitor.default_fallback_model("tiny"), "")
+
+
+class AdaptiveEngineTests(unittest.TestCase):
+    def make_engine(self, load_1m: float):
+        class FixedMonitor:
+            def snapshot(self):
+                return load_monitor.LoadSnapshot(load_1m, 4)
+
+        engine = SttEngine(
+            model="small.en",
+            device="cpu",
+            compute_type="int8",
+            load_monitor=FixedMonitor(),
+            adaptive_policy=load_monitor.AdaptivePolicy(fallback_model="tiny.en"),
+        )
+        self.calls = []
+        calls = self.calls
+
+        class RecordingModel:
+            def __init__(self, name):
+                self.name = name
+
+            def transcribe(self, audio, language, **options):
+                calls.append((self.name, options["beam_size"], options["temperature"]))
+                return iter(()), None
+
+        self.built = []
+        engine._build_model = lambda name, kwargs: self.built.append((name, kwargs)) or RecordingModel(name)
+        return engine
+
+    def test_saturated_host_uses_fallback_model_with_free_cores(self):
+        engine = self.make_engine(load_1m=4.5)
+        engine.transcribe(np.zeros(16000, dtype=np.float32), language="en")
+        engine.transcribe(np.zeros(16000, dtype=np.float32), language="en")
+        self.assertEqual(self.calls, [("tiny.en", 1, [0.0]), ("tiny.en", 1, [0.0])])
+        self.assertEqual(self.built, [("tiny.en", {"cpu_threads": 1, "num_workers": 1})])
+        self.assertEqual(engine.last_decision.level, "saturated")
+
+    def test_missing_fallback_model_keeps_primary(self):
+        engine = self.make_engine(load_1m=4.5)
+        build = engine._build_model
+
+        def offline(name, kwargs):
+            if name == "tiny.en":
+                raise RuntimeError("not cached")
+            return build(name, kwargs)
+
+        engine._build_model = offline
+        engine.transcribe(np.zeros(16000, dtype=np.float32), language="en")
+        self.assertEqual(self.calls[0][0], "small.en")
+
+    def test_idle_host_keeps_configured_profile(self):
+        engine = self.make_engine(load_1m=0.5)
+        engine.transcribe(np.zeros(16000, dtype=np.float32), language="en")
+        self.assertEqual(self.calls, [("small.en", 1, [0.0, 0.2, 0.4, 0.6, 0.8, 1.0])])
+
+
+if __name__ == "__main__":
+    unittest.main()
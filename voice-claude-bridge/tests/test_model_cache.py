@@ -0,0 +1,114 @@
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+module_dir = Path(__file__).resolve().parents[1]
+if str(module_dir) not in sys.path:
+    sys.path.insert(0, str(module_dir))
+
+import numpy as np
+
+from model_cache import ModelCache, estimate_model_bytes
+from stt_engine import SttEngine
+
+
+MB = 1024 * 1024
+
+
+class ModelCacheTests(unittest.TestCase):
+    def test_evicts_least_recently_used_models_over_budget(self):
+        cache = ModelCache(max_bytes=550 * MB)
+        cache.put("small.en", "A", 250 * MB)
+        cache.put("small", "B", 250 * MB)
+        self.assertEqual(cache.get("small.en"), "A")
+        self.assertEqual(cache.put("tiny", "C", 100 * MB), ["small"])
+        self.assertEqual(cache.keys(), ["small.en", "tiny"])
+        self.assertEqual(cache.total_bytes, 350 * MB)
+        self.assertIsNone(cache.get("small"))
+
+    def test_newest_model_is_kept_even_when_it_alone_exceeds_budget(self):
+        cache = ModelCache(max_bytes=100 * MB)
+        cache.put("tiny", "A", 40 * MB)
+        self.assertEqual(cache.put("medium", "B", 800 * MB), ["tiny"])
+        self.assertEqual(cache.keys(), ["medium"])
+
+    def test_estimates_weight_size_from_checkpoint_name(self):
+        self.assertEqual(estimate_model_bytes("small.en", "int8"), 244_000_000)
+        self.assertEqual(estimate_model_bytes("medium", "float16"), 2 * 769_000_000)
+        self.assertEqual(estimate_model_bytes("distil-large-v3", "int8"), 756_000_000)
+        self.assertEqual(estimate_model_bytes("large-v3-turbo", "int8"), 809_000_000)
+        self.assertEqual(estimate_model_bytes("/models/custom", "int8"), 0)
+
+
+class EngineModelSwitchTests(unittest.TestCase):
+    def test_switching_back_reuses_cached_model(self):
+        engine = SttEngine(model="small.en", device="cpu", compute_type="int8")
+        loads = []
+
+        class NamedModel:
+            def __init__(self, name):
+                self.name = name
+
+            def transcribe(self, audio, language, **options):
+                return iter(()), None
+
+        engine._build_model = lambda name, kwargs: loads.append(name) or NamedModel(name)
+        audio = np.zeros(16000, dtype=np.float32)
+        engine.transcribe(audio, language="en")
+
+        self.assertTrue(engine.switch_model("small"))
+        self.assertFalse(engine.is_loaded)
+        engine.transcribe(audio, language="zh")
+        self.assertFalse(engine.switch_model("small.en"))
+        engine.transcribe(audio, language="en")
+
+        self.assertEqual(loads, ["small.en", "small"])
+        self.assertEqual(engine._model.name, "small.en")
+
+    def test_switch_updates_draft_model(self):
+        engine = SttEngine(model="small.en", device="cpu", compute_type="int8", draft_model="tiny.en")
+        engine.switch_model("small", draft_model="tiny")
+        self.assertEqual(engine.draft_model, "tiny")
+        engine.switch_model("tiny", draft_model="tiny")
+        self.assertEqual(engine.draft_model, "")
+
+    def test_switch_does_not_wait_for_a_load_and_clip_keeps_its_model(self):
+        engine = SttEngine(model="small.en", device="cpu", compute_type="int8", draft_model="tiny.en")
+        loading = threading.Event()
+        release = threading.Event()
+        used = []
+
+        class NamedModel:
+            def __init__(self, name):
+                self.name = name
+
+            def transcribe(self, audio, language, **options):
+                used.append((self.name, language))
+                return iter(()), None
+
+        def build(name, kwargs):
+            loading.set()
+            release.wait(5)
+            return NamedModel(name)
+
+        engine._build_model = build
+        audio = np.zeros(16000, dtype=np.float32)
+        worker = threading.Thread(target=lambda: engine.transcribe(audio, language="en", model="small.en"))
+        worker.start()
+        self.assertTrue(loading.wait(5))
+
+        # The load holds the load lock; switching only swaps the primary and returns at once.
+        self.assertTrue(engine.switch_model("small", draft_model="tiny"))
+        self.assertEqual(engine.draft_model_for("small.en"), "tiny.en")
+        self.assertEqual(engine.draft_model_for("small"), "tiny")
+        release.set()
+        worker.join(5)
+
+        self.assertEqual(used, [("small.en", "en")])
+        self.assertFalse(engine.is_loaded)
+        self.assertEqual(engine.model_name, "small")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import os
+import pty
+import subprocess
+import sys
+import time
+import unittest
+from pathlib import Path
+
+module_dir = Path(__file__).resolve().parents[1]
+if str(module_dir) not in sys.path:
+    sys.path.insert(0, str(module_dir))
+
+import multi_session
+from cli import select_audio_backend
+
+
+def make_bridge(agents):
+    return multi_session.MultiSessionBridge(
+        agents=agents,
+        language="en",
+        model="tiny.en",
+        device="cpu",
+        compute_type="int8",
+        record_source="",
+        sample_rate=16000,
+        auto_send=True,
+        record_key="ctrl-k",
+        audio_backend=select_audio_backend("linux"),
+        preload=False,
+    )
+
+
+class MultiSessionTests(unittest.TestCase):
+    def test_agent_specs_and_duplicate_names(self):
+        self.assertEqual(multi_session.parse_agent_spec("review=claude --model x"), ("review", "claude --model x"))
+        self.assertEqual(multi_session.parse_agent_spec("codex")[0], "codex")
+        with self.assertRaises(ValueError):
+            multi_session.parse_agent_spec("vim")
+        self.assertEqual(
+            multi_session.unique_session_names(["claude", "codex", "claude"]),
+            ["claude", "codex", "claude-2"],
+        )
+
+    def test_focus_key_splits_typed_bytes_between_sessions(self):
+        bridge = make_bridge([("claude", "cat"), ("codex", "cat")])
+        pipes = []
+        for session in bridge.sessions:
+            read_fd, write_fd = os.pipe()
+            pipes.append(read_fd)
+            session.master_fd = write_fd
+        bridge._set_focus(bridge.sessions[0], repaint=False)
+        bridge._write_terminal = lambda data: None
+        try:
+            bridge._forward_to_agent(b"to-claude\x1dto-codex")
+            self.assertIs(bridge._focused, bridge.sessions[1])
+            self.assertEqual(os.read(pipes[0], 1024), b"to-claude")
+            self.assertEqual(os.read(pipes[1], 1024), b"to-codex")
+        finally:
+            for session in bridge.sessions:
+                os.close(session.master_fd)
+            for fd in pipes:
+                os.close(fd)
+
+    def test_transcript_goes_to_the_session_focused_at_stop_time(self):
+        bridge = make_bridge([("claude", "cat"), ("gemini", "cat")])
+        pipes = []
+        for session in bridge.sessions:
+            read_fd, write_fd = os.pipe()
+            pipes.append(read_fd)
+            session.master_fd = write_fd
+        bridge._set_focus(bridge.sessions[0], repaint=False)
+        bridge._write_terminal = lambda data: None
+        try:
+            target = bridge._focused
+            bridge._set_focus(bridge.sessions[1])
+            bridge._on_session_transcription_done(target, "fix the tests", None)
+            self.assertEqual(os.read(pipes[0], 1024), b"fix the tests ")
+            self.assertEqual(bridge.sessions[0].transcript_draft, "fix the tests")
+            self.assertEqual(bridge._transcript_draft, "")
+        finally:
+            for session in bridge.sessions:
+                os.close(session.master_fd)
+            for fd in pipes:
+                os.close(fd)
+
+    def test_run_hosts_sessions_until_all_exit(self):
+        script = (
+            "import sys\n"
+            f"sys.path.insert(0, {str(module_dir)!r})\n"
+            "import cli, multi_session\n"
+            "backend = cli.select_audio_backend('linux')\n"
+            "backend.ensure_prereqs = lambda: None\n"
+            "backend.resolve_source = lambda configured_source, sample_rate: 'default'\n"
+            "bridge = multi_session.MultiSessionBridge(\n"
+            "    agents=[('first', 'echo first-out; sleep 0.2'), ('second', 'sleep 0.4; exit 4')],\n"
+            "    language='en', model='tiny.en', device='cpu', compute_type='int8', record_source='',\n"
+            "    sample_rate=16000, auto_send=False, record_key='ctrl-k', audio_backend=backend, preload=False)\n"
+            "sys.exit(bridge.run())\n"
+        )
+        master_fd, slave_fd = pty.openpty()
+        proc = subprocess.Popen(
+            [sys.executable, "-c", script], stdin=slave_fd, stdout=slave_fd, stderr=slave_fd, close_fds=True
+        )
+        os.close(slave_fd)
+        started = time.monotonic()
+        output = bytearray()
+        try:
+            while True:
+                try:
+                    chunk = os.read(master_fd, 4096)
+                except OSError:
+                    break
+                if not chunk:
+                    break
+                output.extend(chunk)
+            returncode = proc.wait(timeout=5)
+        finally:
+            os.close(master_fd)
+        self.assertEqual(returncode, 4, output.decode("utf-8", errors="ignore"))
+        self.assertIn(b"first-out", output)
+        self.assertIn(b"first exited (0); switched to second", output)
+        self.assertLess(time.monotonic() - started, 3.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
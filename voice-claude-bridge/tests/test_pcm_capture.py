@@ -0,0 +1,92 @@
+import sys
+import time
+import unittest
+from pathlib import Path
+
+module_dir = Path(__file__).resolve().parents[1]
+if str(module_dir) not in sys.path:
+    sys.path.insert(0, str(module_dir))
+
+import numpy as np
+
+import pcm_capture
+
+
+class PcmCaptureTests(unittest.TestCase):
+    def test_buffer_grows_past_preallocated_capacity(self):
+        buffer = pcm_capture.PcmBuffer(capacity_bytes=4)
+        buffer.append(b"\x01\x00\x02\x00")
+        buffer.append(memoryview(b"\x03\x00\x04\x00\x05\x00"))
+        self.assertEqual(len(buffer), 10)
+        self.assertEqual(buffer.to_bytes(), b"\x01\x00\x02\x00\x03\x00\x04\x00\x05\x00")
+        buffer.clear()
+        self.assertEqual(len(buffer), 0)
+
+    def test_to_float32_scales_and_drops_odd_trailing_byte(self):
+        buffer = pcm_capture.PcmBuffer(capacity_bytes=16)
+        buffer.append(b"\x00\x40\x00\xc0\x7f")
+        samples = buffer.to_float32(sample_rate=16000)
+        self.assertEqual(samples.dtype, np.float32)
+        np.testing.assert_allclose(samples, [0.5, -0.5])
+
+    def test_to_float32_resamples_to_whisper_rate(self):
+        buffer = pcm_capture.PcmBuffer(capacity_bytes=16)
+        buffer.append(b"\x00\x10" * 48000)
+        samples = buffer.to_float32(sample_rate=48000)
+        self.assertEqual(samples.shape, (16000,))
+        np.testing.assert_allclose(samples[:3], [0.125, 0.125, 0.125])
+
+    def test_pipe_recorder_drains_stdout_into_buffer(self):
+        script = "import sys; sys.stdout.buffer.write(b'\\x01\\x00' * 50000); sys.stdout.flush()"
+        recorder = pcm_capture.PipeRecorder(command=[sys.executable, "-c", script], sample_rate=16000)
+        recorder.start()
+        recorder.process.wait(timeout=5)
+        stderr_text = recorder.stop()
+        self.assertEqual(stderr_text, "")
+        self.assertEqual(len(recorder.buffer), 100000)
+
+    def test_ring_keeps_newest_bytes_across_wraparound(self):
+        ring = pcm_capture.PcmRing(capacity_bytes=8)
+        ring.write(b"\x01\x00\x02\x00\x03\x00")
+        ring.write(b"\x04\x00\x05\x00")
+        self.assertEqual(ring.tail(4), b"\x04\x00\x05\x00")
+        self.assertEqual(ring.tail(100), b"\x02\x00\x03\x00\x04\x00\x05\x00")
+        ring.write(bytes(range(20)))
+        self.assertEqual(ring.tail(8), bytes(range(12, 20)))
+
+    def test_ring_tail_starts_on_sample_boundary(self):
+        ring = pcm_capture.PcmRing(capacity_bytes=8)
+        ring.write(b"\x01\x00\x02")
+        self.assertEqual(ring.tail(2), b"\x02")
+        self.assertEqual(ring.tail(3), b"\x01\x00\x02")
+
+    def test_armed_recorder_captures_pre_roll_and_keeps_running(self):
+        script = (
+            "import sys, time\n"
+            "while True:\n"
+            "    sys.stdout.buffer.write(b'\\x01\\x00' * 160)\n"
+            "    sys.stdout.flush()\n"
+            "    time.sleep(0.01)\n"
+        )
+        armed = pcm_capture.ArmedRecorder(
+            command=[sys.executable, "-c", script], sample_rate=16000, max_pre_roll_seconds=1.0
+        )
+        armed.start()
+        try:
+            time.sleep(0.3)
+            capture = armed.begin_capture(pre_roll_seconds=0.1)
+            self.assertEqual(len(capture.buffer), 3200)
+            time.sleep(0.1)
+            self.assertEqual(capture.stop(), "")
+            captured = len(capture.buffer)
+            self.assertGreater(captured, 3200)
+            time.sleep(0.05)
+            self.assertEqual(len(capture.buffer), captured)
+            self.assertTrue(armed.is_running())
+        finally:
+            armed.stop()
+        self.assertFalse(armed.is_running())
+
+
+if __name__ == "__main__":
+    unittest.main()
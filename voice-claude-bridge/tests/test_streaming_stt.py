@@ -0,0 +1,139 @@
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+module_dir = Path(__file__).resolve().parents[1]
+for path in (module_dir, module_dir / "tests"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+import numpy as np
+
+from bridge_fakes import FakeStt
+from pcm_capture import PcmBuffer
+from streaming_stt import StreamingTranscriber
+
+
+def recording_stt() -> FakeStt:
+    """Numbers each committed chunk and answers a partial with its sample count."""
+    stt = FakeStt(partial_reply=lambda audio, language, model: f"guess{audio.size}")
+    stt.reply = lambda audio, language, model: f"chunk{len(stt.calls)}"
+    return stt
+
+
+def decoded_sizes(stt: FakeStt) -> list[int]:
+    return [audio.size for audio, _language, _model in stt.calls]
+
+
+def pcm(samples: np.ndarray) -> bytes:
+    return (samples * 32767).astype("<i2").tobytes()
+
+
+def speech(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * 16000), dtype=np.float32) / 16000
+    return (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+class StreamingTranscriberTests(unittest.TestCase):
+    def test_commits_chunk_at_pause_and_decodes_only_tail_on_finish(self):
+        buffer = PcmBuffer(capacity_bytes=1024)
+        stt = recording_stt()
+        streamer = StreamingTranscriber(
+            stt_engine=stt, buffer=buffer, sample_rate=16000, language="en", min_chunk_seconds=1.0
+        )
+        buffer.append(pcm(np.concatenate([speech(2.0), np.zeros(8000, dtype=np.float32)])))
+
+        self.assertTrue(streamer._commit_ready_chunk())
+        self.assertGreater(streamer.committed_bytes, 2 * 16000 * 2)
+        self.assertFalse(streamer._commit_ready_chunk())
+
+        buffer.append(pcm(speech(1.0)))
+        self.assertEqual(streamer.finish(), "chunk1 chunk2")
+        self.assertEqual(len(stt.calls), 2)
+        self.assertLess(decoded_sizes(stt)[1], int(1.3 * 16000))
+
+    def test_finish_without_commits_decodes_whole_clip(self):
+        buffer = PcmBuffer(capacity_bytes=1024)
+        buffer.append(pcm(speech(0.5)))
+        stt = recording_stt()
+        streamer = StreamingTranscriber(stt_engine=stt, buffer=buffer, sample_rate=16000, language="en")
+        streamer.start()
+        self.assertEqual(streamer.finish(), "chunk1")
+        self.assertEqual(decoded_sizes(stt), [8000])
+
+    def test_partials_show_committed_text_and_are_rate_limited(self):
+        buffer = PcmBuffer(capacity_bytes=1024)
+        stt = recording_stt()
+        partials = []
+        now = [100.0]
+        streamer = StreamingTranscriber(
+            stt_engine=stt,
+            buffer=buffer,
+            sample_rate=16000,
+            language="en",
+            min_chunk_seconds=1.0,
+            on_partial=partials.append,
+            partial_interval=0.5,
+            clock=lambda: now[0],
+        )
+        buffer.append(pcm(speech(0.3)))
+        streamer._decode_partial()
+        self.assertEqual(partials, [])
+
+        buffer.append(pcm(speech(0.7)))
+        streamer._decode_partial()
+        self.assertEqual(partials, ["guess16000"])
+        buffer.append(pcm(speech(0.2)))
+        streamer._decode_partial()
+        self.assertEqual(len(partials), 1)
+
+        now[0] += 0.6
+        streamer._decode_partial()
+        streamer._decode_partial()
+        self.assertEqual(partials, ["guess16000", "guess19200"])
+
+        buffer.append(pcm(np.zeros(8000, dtype=np.float32)))
+        self.assertTrue(streamer._commit_ready_chunk())
+        buffer.append(pcm(speech(0.6)))
+        now[0] += 0.6
+        streamer._decode_partial()
+        self.assertTrue(partials[-1].startswith("chunk1 guess"))
+
+    def test_cancel_returns_without_waiting_for_a_partial_decode(self):
+        buffer = PcmBuffer(capacity_bytes=1024)
+        buffer.append(pcm(speech(1.0)))
+        decoding = threading.Event()
+        release = threading.Event()
+        partials = []
+
+        def blocking_partial(audio, language, model):
+            decoding.set()
+            release.wait(5)
+            return "late"
+
+        streamer = StreamingTranscriber(
+            stt_engine=FakeStt(partial_reply=blocking_partial),
+            buffer=buffer,
+            sample_rate=16000,
+            language="en",
+            poll_interval=0.01,
+            on_partial=partials.append,
+        )
+        streamer.start()
+        worker = streamer._worker
+        self.assertTrue(decoding.wait(5))
+
+        started = time.monotonic()
+        streamer.cancel()
+        self.assertLess(time.monotonic() - started, 0.5)
+
+        release.set()
+        worker.join(5)
+        self.assertFalse(worker.is_alive())
+        self.assertEqual(partials, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
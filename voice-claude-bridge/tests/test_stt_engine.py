@@ -0,0 +1,240 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+import wave
+from pathlib import Path
+
+module_dir = Path(__file__).resolve().parents[1]
+if str(module_dir) not in sys.path:
+    sys.path.insert(0, str(module_dir))
+
+import numpy as np
+
+import stt_engine
+from stt_engine import SttEngine
+
+
+def speech_like(seconds: float, pause_every: float = 10.0) -> np.ndarray:
+    """A tone broken by a 0.6s pause every `pause_every` seconds."""
+    t = np.arange(int(seconds * 16000), dtype=np.float32) / 16000
+    samples = (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+    samples[(t % pause_every) > pause_every - 0.6] = 0.0
+    return samples
+
+
+class Segment:
+    def __init__(self, text):
+        self.text = text
+
+
+class SerialModel:
+    def __init__(self):
+        self.calls = 0
+
+    def transcribe(self, audio, language, **options):
+        self.calls += 1
+        return iter([Segment(" serial ")]), None
+
+
+class FakePipeline:
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, audio, language, **options):
+        self.calls.append(options)
+        clips = options["clip_timestamps"]
+        return iter(Segment(f" chunk{index} ") for index in range(len(clips))), None
+
+
+class ChunkedTranscriptionTests(unittest.TestCase):
+    def make_engine(self, batch_size=8):
+        engine = SttEngine(model="small.en", device="cpu", compute_type="int8", batch_size=batch_size)
+        engine._model = SerialModel()
+        self.pipeline = FakePipeline()
+        engine._batched_pipeline = lambda model: self.pipeline
+        return engine
+
+    def test_long_clip_is_batched_in_pause_bounded_chunks(self):
+        engine = self.make_engine()
+        text = engine.transcribe(speech_like(75.0), language="en")
+
+        options = self.pipeline.calls[0]
+        clips = options["clip_timestamps"]
+        self.assertEqual(text, " ".join(f"chunk{index}" for index in range(len(clips))))
+        self.assertGreaterEqual(len(clips), 3)
+        self.assertEqual(clips[0]["start"], 0.0)
+        self.assertAlmostEqual(clips[-1]["end"], 75.0)
+        self.assertTrue(all(clip["end"] - clip["start"] <= stt_engine.CHUNK_MAX_SECONDS for clip in clips))
+        self.assertEqual(options["batch_size"], 8)
+        self.assertFalse(options["vad_filter"])
+        self.assertEqual(engine._model.calls, 0)
+
+    def test_short_clips_and_disabled_batching_stay_serial(self):
+        engine = self.make_engine()
+        self.assertEqual(engine.transcribe(speech_like(20.0), language="en"), "serial")
+        engine = self.make_engine(batch_size=1)
+        self.assertEqual(engine.transcribe(speech_like(75.0), language="en"), "serial")
+        self.assertEqual(self.pipeline.calls, [])
+
+    def test_long_wav_is_read_and_resampled_for_batching(self):
+        engine = self.make_engine()
+        samples = speech_like(40.0)
+        upsampled = np.repeat(samples, 3)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "clip.wav")
+            with wave.open(path, "wb") as wav_file:
+                wav_file.setnchannels(1)
+                wav_file.setsampwidth(2)
+                wav_file.setframerate(48000)
+                wav_file.writeframes((upsampled * 32767).astype("<i2").tobytes())
+            engine.transcribe(path, language="en")
+        self.assertAlmostEqual(self.pipeline.calls[0]["clip_timestamps"][-1]["end"], 40.0, places=2)
+
+
+
+class DraftTranscriptionTests(unittest.TestCase):
+    def make_engine(self, draft_model="tiny.en"):
+        engine = SttEngine(model="small.en", device="cpu", compute_type="int8", draft_model=draft_model)
+        self.calls = []
+        calls = self.calls
+
+        class NamedModel:
+            def __init__(self, name):
+                self.name = name
+
+            def transcribe(self, audio, language, **options):
+                calls.append((self.name, options["beam_size"]))
+                return iter([Segment(f" {self.name} ")]), None
+
+        self.built = []
+        engine._build_model = lambda name, kwargs: self.built.append((name, kwargs)) or NamedModel(name)
+        return engine
+
+    def test_draft_uses_small_model_with_few_threads(self):
+        engine = self.make_engine()
+        audio = np.zeros(16000, dtype=np.float32)
+        self.assertEqual(engine.draft(audio, language="en"), "tiny.en")
+        self.assertEqual(engine.transcribe(audio, language="en"), "small.en")
+        self.assertEqual(self.calls, [("tiny.en", 1), ("small.en", 1)])
+        self.assertEqual(self.built[0], ("tiny.en", {"cpu_threads": stt_engine.DRAFT_THREADS, "num_workers": 1}))
+
+    def test_draft_is_off_when_unset_same_as_model_or_unavailable(self):
+        audio = np.zeros(16000, dtype=np.float32)
+        self.assertIsNone(self.make_engine(draft_model="").draft(audio, language="en"))
+        self.assertEqual(SttEngine(model="tiny.en", device="cpu", compute_type="int8", draft_model="tiny.en").draft_model, "")
+
+        engine = self.make_engine()
+
+        def offline(name, kwargs):
+            raise RuntimeError("not cached")
+
+        engine._build_model = offline
+        self.assertIsNone(engine.draft(audio, language="en"))
+        self.assertEqual(self.calls, [])
+
+
+    def test_partial_prefers_draft_model_else_fastest_main_model(self):
+        audio = np.zeros(16000, dtype=np.float32)
+        self.assertEqual(self.make_engine().partial(audio, language="en"), "tiny.en")
+        engine = self.make_engine(draft_model="")
+        self.assertEqual(engine.partial(audio, language="en"), "small.en")
+        self.assertEqual(self.calls, [("small.en", 1)])
+        self.assertEqual([name for name, _kwargs in self.built], ["small.en"])
+
+
+
+class IdleUnloadTests(unittest.TestCase):
+    def make_engine(self, idle_unload_seconds):
+        engine = SttEngine(model="small.en", device="cpu", compute_type="int8", idle_unload_seconds=idle_unload_seconds)
+        self.loads = []
+        engine._load_model = lambda name=None: self.loads.append("load") or SerialModel()
+        return engine
+
+    def test_idle_engine_releases_model_and_reloads_on_next_clip(self):
+        engine = self.make_engine(idle_unload_seconds=0.05)
+        unloaded = threading.Event()
+        engine.on_idle_unload = unloaded.set
+        audio = np.zeros(16000, dtype=np.float32)
+        engine.transcribe(audio, language="en")
+
+        self.assertTrue(unloaded.wait(timeout=5))
+        self.assertFalse(engine.is_loaded)
+        self.assertTrue(engine.idle_unloaded)
+        self.assertEqual(len(engine._model_cache), 0)
+
+        engine.idle_unload_seconds = 0
+        self.assertEqual(engine.transcribe(audio, language="en"), "serial")
+        self.assertEqual(self.loads, ["load", "load"])
+        self.assertFalse(engine.idle_unloaded)
+
+    def test_timer_waits_for_running_decode_and_recent_use(self):
+        engine = self.make_engine(idle_unload_seconds=60)
+        engine.load()
+        engine._idle_timer.cancel()
+        engine._idle_timer = None
+
+        engine._active_uses = 1
+        engine._last_used -= 120
+        engine._on_idle_timer()
+        self.assertTrue(engine.is_loaded)
+        engine._idle_timer.cancel()
+        engine._idle_timer = None
+
+        engine._active_uses = 0
+        engine._last_used = stt_engine.time.monotonic()
+        engine._on_idle_timer()
+        self.assertTrue(engine.is_loaded)
+        self.assertGreater(engine._idle_timer.interval, 50)
+        engine._idle_timer.cancel()
+
+    def test_timer_keeps_model_that_is_still_loading(self):
+        engine = SttEngine(model="small.en", device="cpu", compute_type="int8", idle_unload_seconds=60)
+        loading = threading.Event()
+        release = threading.Event()
+
+        def slow_load(name=None):
+            loading.set()
+            release.wait(5)
+            return SerialModel()
+
+        engine._load_model = slow_load
+        done = threading.Event()
+        engine.preload(on_done=lambda error, elapsed: done.set())
+        self.assertTrue(loading.wait(5))
+        engine._last_used -= 120
+        engine._on_idle_timer()
+        release.set()
+        self.assertTrue(done.wait(5))
+
+        self.assertTrue(engine.is_loaded)
+        self.assertFalse(engine.idle_unloaded)
+        engine._idle_timer.cancel()
+
+    def test_failed_preload_can_be_retried(self):
+        engine = SttEngine(model="small.en", device="cpu", compute_type="int8")
+        attempts = []
+
+        def flaky_load(name=None):
+            attempts.append(name)
+            if len(attempts) == 1:
+                raise OSError("disk busy")
+            return SerialModel()
+
+        engine._load_model = flaky_load
+        results = []
+        for _ in range(2):
+            done = threading.Event()
+            engine.preload(on_done=lambda error, elapsed, done=done: results.append(error) or done.set())
+            self.assertTrue(done.wait(5))
+
+        self.assertIsInstance(results[0], OSError)
+        self.assertIsNone(results[1])
+        self.assertEqual(len(attempts), 2)
+        self.assertTrue(engine.is_loaded)
+        self.assertIsNone(engine._preload_thread)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import sys
+import unittest
+from pathlib import Path
+
+module_dir = Path(__file__).resolve().parents[1]
+if str(module_dir) not in sys.path:
+    sys.path.insert(0, str(module_dir))
+
+import numpy as np
+
+import stt_profiles
+from stt_engine import SttEngine
+
+
+class RecordingModel:
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, audio, language, **options):
+        self.calls.append(options)
+        return iter(()), None
+
+
+class SttProfileTests(unittest.TestCase):
+    def test_balanced_profile_keeps_the_previous_decode_options(self):
+        options = stt_profiles.get_profile("balanced").transcribe_kwargs()
+        self.assertEqual(options["beam_size"], 1)
+        self.assertTrue(options["vad_filter"])
+        self.assertFalse(options["condition_on_previous_text"])
+        self.assertEqual(options["temperature"], [0.0, 0.2, 0.4, 0.6, 0.8, 1.0])
+        self.assertEqual(stt_profiles.get_profile("balanced").model_kwargs(), {"cpu_threads": 0, "num_workers": 1})
+
+    def test_fastest_disables_fallback_and_accurate_uses_beam_search(self):
+        fastest = stt_profiles.get_profile("fastest").transcribe_kwargs()
+        accurate = stt_profiles.get_profile("accurate").transcribe_kwargs()
+        self.assertEqual(fastest["temperature"], [0.0])
+        self.assertLess(fastest["vad_parameters"]["min_silence_duration_ms"], 2000)
+        self.assertEqual(accurate["beam_size"], 5)
+
+    def test_unknown_profile_names_fall_back_to_default(self):
+        self.assertEqual(stt_profiles.get_profile("turbo").name, stt_profiles.DEFAULT_PROFILE_NAME)
+        self.assertEqual(stt_profiles.normalize_profile_name(" Accurate "), "accurate")
+
+    def test_profile_rule_first_match_wins(self):
+        rules = stt_profiles.parse_profile_rule("accurate<4, fastest>20")
+        self.assertEqual(rules, [("accurate", "<", 4.0), ("fastest", ">", 20.0)])
+        base = stt_profiles.get_profile("balanced")
+        self.assertEqual(stt_profiles.select_profile(base, rules, 2.5).name, "accurate")
+        self.assertEqual(stt_profiles.select_profile(base, rules, 10.0).name, "balanced")
+        self.assertEqual(stt_profiles.select_profile(base, rules, 30.0).name, "fastest")
+        self.assertIs(stt_profiles.select_profile(base, rules, None), base)
+
+    def test_invalid_profile_rules_are_rejected(self):
+        for spec in ("turbo<4", "accurate=4", "fastest>"):
+            with self.assertRaises(ValueError):
+                stt_profiles.parse_profile_rule(spec)
+        self.assertEqual(stt_profiles.parse_profile_rule(""), [])
+
+    def test_engine_applies_length_rule_per_clip(self):
+        engine = SttEngine(
+            model="tiny.en",
+            device="cpu",
+            compute_type="int8",
+            profile="fastest",
+            profile_rules=stt_profiles.parse_profile_rule("accurate<2"),
+        )
+        model = RecordingModel()
+        engine._model = model
+        engine.transcribe(np.zeros(16000, dtype=np.float32), language="en")
+        engine.transcribe(np.zeros(5 * 16000, dtype=np.float32), language="en")
+        self.assertEqual([call["beam_size"] for call in model.calls], [5, 1])
+        self.assertEqual(model.calls[1]["temperature"], [0.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
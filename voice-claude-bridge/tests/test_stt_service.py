@@ -0,0 +1,192 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+module_dir = Path(__file__).resolve().parents[1]
+if str(module_dir) not in sys.path:
+    sys.path.insert(0, str(module_dir))
+
+import numpy as np
+
+import stt_server
+from stt_client import SttServiceClient, SttServiceUnavailable
+from stt_engine import SttEngine
+
+
+class EchoEngine:
+    def __init__(self):
+        self.calls = []
+
+    def transcribe_local_detailed(self, audio, language: str, profile=None, session=None, update_language=True):
+        self.calls.append((audio, language, profile, session, update_language))
+        used = "de" if language == "auto" else language
+        if isinstance(audio, str):
+            return f"path:{os.path.basename(audio)}", used
+        return f"samples:{audio.size}:{float(audio[0]):.2f}", used
+
+    def preload(self, on_done=None):
+        self.calls.append("preload")
+
+    @property
+    def is_loaded(self):
+        return "preload" in self.calls
+
+
+class SttServiceTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.tmpdir.name, "stt.sock")
+        self.server = stt_server.SttServer(self.socket_path)
+        self.engine = EchoEngine()
+        self.requested_keys = []
+
+        def engine_for(model, device, compute_type, profile):
+            self.requested_keys.append((model, device, compute_type, profile))
+            return self.engine
+
+        self.server.engine_for = engine_for
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join(timeout=5)
+        self.tmpdir.cleanup()
+
+    def test_client_round_trips_samples_and_paths(self):
+        client = SttServiceClient(self.socket_path)
+        self.assertTrue(client.is_available())
+
+        text = client.transcribe(
+            np.full(320, 0.25, dtype=np.float32), language="zh", model="small", device="cpu", compute_type="int8"
+        )
+        self.assertEqual(text, "samples:320:0.25")
+        self.assertEqual(self.requested_keys, [("small", "cpu", "int8", stt_server.DEFAULT_PROFILE)])
+        self.assertEqual(self.engine.calls[0][1], "zh")
+
+        self.assertEqual(
+            client.transcribe("clip.wav", language="en", model="tiny.en", device="cpu", compute_type="int8"),
+            "path:clip.wav",
+        )
+
+    def test_client_sends_decode_and_model_profiles(self):
+        client = SttServiceClient(self.socket_path)
+        client.transcribe(
+            "clip.wav",
+            language="en",
+            model="tiny.en",
+            device="cpu",
+            compute_type="int8",
+            profile="accurate",
+            model_profile="fastest",
+        )
+        self.assertEqual(self.requested_keys, [("tiny.en", "cpu", "int8", "fastest")])
+        self.assertEqual(self.engine.calls[0][2].name, "accurate")
+
+    def test_client_sends_session_and_gets_language_used(self):
+        client = SttServiceClient(self.socket_path)
+        result = client.transcribe_detailed(
+            "clip.wav", language="auto", model="small", device="cpu", compute_type="int8", session="bridge-1"
+        )
+        client.transcribe(
+            "clip.wav",
+            language="auto",
+            model="small",
+            device="cpu",
+            compute_type="int8",
+            session="bridge-1",
+            update_language=False,
+        )
+        client.transcribe("clip.wav", language="en", model="small", device="cpu", compute_type="int8")
+
+        self.assertEqual(result, ("path:clip.wav", "de"))
+        self.assertEqual([call[3:] for call in self.engine.calls], [("bridge-1", True), ("bridge-1", False), (None, True)])
+
+    def test_warm_request_preloads_engine_without_decoding(self):
+        client = SttServiceClient(self.socket_path)
+        client.warm(model="small", device="cpu", compute_type="int8", model_profile="fastest")
+
+        self.assertEqual(self.requested_keys, [("small", "cpu", "int8", "fastest")])
+        self.assertEqual(self.engine.calls, ["preload"])
+
+    def test_engine_warms_daemon_in_background(self):
+        engine = SttEngine(model="small.en", device="cpu", compute_type="int8", service_socket=self.socket_path)
+        engine.warm_service()
+        deadline = time.monotonic() + 5
+        while not self.engine.calls and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(self.engine.calls, ["preload"])
+        self.assertEqual(self.requested_keys, [("small.en", "cpu", "int8", engine.profile.name)])
+        self.assertFalse(engine.is_loaded)
+
+    def test_server_errors_surface_as_runtime_errors(self):
+        def failing(audio, language, **options):
+            raise ValueError("model exploded")
+
+        self.engine.transcribe_local_detailed = failing
+        client = SttServiceClient(self.socket_path)
+        with self.assertRaises(RuntimeError) as context:
+            client.transcribe("clip.wav", language="en", model="tiny.en", device="cpu", compute_type="int8")
+        self.assertNotIsInstance(context.exception, SttServiceUnavailable)
+        self.assertIn("model exploded", str(context.exception))
+
+    def test_claim_socket_path_refuses_live_daemon(self):
+        self.assertFalse(stt_server.claim_socket_path(self.socket_path))
+
+
+class SttServerEngineBudgetTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.server = stt_server.SttServer(
+            os.path.join(self.tmpdir.name, "stt.sock"), model_cache_bytes=320 * 1024 * 1024
+        )
+
+    def tearDown(self):
+        self.server.server_close()
+        self.tmpdir.cleanup()
+
+    def loaded_engine(self, model):
+        engine = self.server.engine_for(model, "cpu", "int8")
+        engine._load_model = lambda name=None: object()
+        engine.load()
+        return engine
+
+    def test_least_recently_used_engine_is_unloaded_over_budget(self):
+        small = self.loaded_engine("small.en")
+        tiny = self.loaded_engine("tiny.en")
+        self.assertIs(self.server.engine_for("small.en", "cpu", "int8"), small)
+
+        self.server.engine_for("base.en", "cpu", "int8")
+
+        self.assertTrue(small.is_loaded)
+        self.assertFalse(tiny.is_loaded)
+        self.assertEqual([key[0] for key in self.server._engines], ["small.en", "base.en"])
+        self.assertIsNot(self.server.engine_for("tiny.en", "cpu", "int8"), tiny)
+
+    def test_newest_engine_is_kept_even_alone_over_budget(self):
+        small = self.loaded_engine("small.en")
+        medium = self.server.engine_for("medium.en", "cpu", "int8")
+
+        self.assertFalse(small.is_loaded)
+        self.assertEqual(list(self.server._engines.values()), [medium])
+        self.assertEqual(medium._model_cache.max_bytes, 320 * 1024 * 1024)
+
+
+class SttEngineFallbackTests(unittest.TestCase):
+    def test_missing_daemon_falls_back_to_in_process_inference(self):
+        engine = SttEngine(
+            model="tiny.en", device="cpu", compute_type="int8", service_socket="/nonexistent/voice-stt.sock"
+        )
+        engine.transcribe_local = lambda audio, language, **options: "local"
+        self.assertFalse(engine.service_available())
+        self.assertEqual(engine.transcribe("clip.wav", language="en"), "local")
+
+
+if __name__ == "__main__":
+    unittest.main()
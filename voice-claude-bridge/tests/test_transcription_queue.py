@@ -0,0 +1,75 @@
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+module_dir = Path(__file__).resolve().parents[1]
+if str(module_dir) not in sys.path:
+    sys.path.insert(0, str(module_dir))
+
+from transcription_queue import TranscriptionQueue
+
+
+class TranscriptionQueueTests(unittest.TestCase):
+    def test_results_are_delivered_in_submission_order(self):
+        delivered = []
+        ready = threading.Event()
+        callbacks = []
+        queue = TranscriptionQueue(deliver=callbacks.append, workers=2)
+        release_first = threading.Event()
+        second_ran = threading.Event()
+
+        def slow_first():
+            release_first.wait(timeout=5)
+            return "first"
+
+        def fast_second():
+            second_ran.set()
+            return "second"
+
+        def on_done(text, error):
+            delivered.append(text)
+            if len(delivered) == 2:
+                ready.set()
+
+        queue.submit(slow_first, on_done)
+        queue.submit(fast_second, on_done)
+        # The second clip finishes first but must wait for the first to be handed back.
+        self.assertTrue(second_ran.wait(timeout=5))
+        self.assertEqual(callbacks, [])
+        self.assertEqual(queue.pending, 2)
+        release_first.set()
+        while not ready.is_set():
+            while callbacks:
+                callbacks.pop(0)()
+            ready.wait(timeout=0.01)
+        queue.close()
+        self.assertEqual(delivered, ["first", "second"])
+        self.assertEqual(queue.pending, 0)
+
+    def test_job_errors_are_reported_to_the_callback(self):
+        results = []
+        done = threading.Event()
+
+        def deliver(callback):
+            callback()
+            done.set()
+
+        def failing_job():
+            raise RuntimeError("decoder crashed")
+
+        queue = TranscriptionQueue(deliver=deliver)
+        queue.submit(failing_job, lambda text, error: results.append((text, str(error))))
+        self.assertTrue(done.wait(timeout=5))
+        queue.close()
+        self.assertEqual(results, [("", "decoder crashed")])
+
+    def test_submit_after_close_is_rejected(self):
+        queue = TranscriptionQueue(deliver=lambda callback: callback())
+        queue.close()
+        with self.assertRaises(RuntimeError):
+            queue.submit(lambda: "late", lambda text, error: None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import sys
+import unittest
+from pathlib import Path
+
+module_dir = Path(__file__).resolve().parents[1]
+if str(module_dir) not in sys.path:
+    sys.path.insert(0, str(module_dir))
+
+import numpy as np
+
+import vad
+
+
+def tone(seconds: float, amplitude: float = 0.3, sample_rate: int = 16000) -> np.ndarray:
+    t = np.arange(int(seconds * sample_rate), dtype=np.float32) / sample_rate
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def silence(seconds: float, sample_rate: int = 16000) -> np.ndarray:
+    return np.zeros(int(seconds * sample_rate), dtype=np.float32)
+
+
+class VadTests(unittest.TestCase):
+    def test_frame_rms_ignores_partial_trailing_frame(self):
+        samples = np.concatenate([np.full(480, 0.5, dtype=np.float32), np.ones(100, dtype=np.float32)])
+        rms = vad.frame_rms(samples, frame_size=480)
+        np.testing.assert_allclose(rms, [0.5])
+
+    def test_commit_boundary_waits_for_min_chunk(self):
+        samples = np.concatenate([tone(1.0), silence(1.0)])
+        self.assertEqual(
+            vad.find_commit_boundary(samples, min_chunk_seconds=3.0, max_chunk_seconds=20.0, min_silence_ms=450),
+            0,
+        )
+
+    def test_commit_boundary_cuts_inside_latest_pause(self):
+        samples = np.concatenate([tone(3.0), silence(1.0), tone(2.0), silence(0.6), tone(0.5)])
+        boundary = vad.find_commit_boundary(
+            samples, min_chunk_seconds=2.0, max_chunk_seconds=20.0, min_silence_ms=450
+        )
+        self.assertGreater(boundary, int(6.0 * 16000))
+        self.assertLess(boundary, int(6.6 * 16000))
+
+    def test_commit_boundary_forces_cut_after_max_chunk(self):
+        samples = tone(6.0)
+        samples[int(4.5 * 16000) : int(4.53 * 16000)] = 0.0
+        boundary = vad.find_commit_boundary(samples, min_chunk_seconds=2.0, max_chunk_seconds=5.0, min_silence_ms=450)
+        self.assertEqual(boundary, int(4.5 * 16000))
+
+    def test_speech_bounds_trims_leading_and_trailing_silence(self):
+        samples = np.concatenate([silence(2.0), tone(1.0), silence(1.5)])
+        start, end = vad.speech_bounds(samples)
+        pad = int(16000 * vad.SPEECH_PAD_MS / 1000)
+        self.assertAlmostEqual(start, 2 * 16000 - pad, delta=480)
+        self.assertAlmostEqual(end, 3 * 16000 + pad, delta=480)
+
+    def test_speech_bounds_rejects_silence_noise_and_clicks(self):
+        rng = np.random.default_rng(3)
+        self.assertIsNone(vad.speech_bounds(silence(1.0)))
+        self.assertIsNone(vad.speech_bounds(rng.normal(0.0, 0.003, 16000).astype(np.float32)))
+        click = np.concatenate([silence(0.5), tone(0.03, amplitude=0.8), silence(0.5)])
+        self.assertIsNone(vad.speech_bounds(click))
+
+    def test_lower_rms_floor_keeps_quiet_speech(self):
+        quiet = np.concatenate([silence(0.5), tone(1.0, amplitude=0.005), silence(0.5)])
+        self.assertIsNone(vad.speech_bounds(quiet))
+        start, end = vad.speech_bounds(quiet, rms_floor=0.002)
+        self.assertLess(start, int(0.5 * 16000))
+        self.assertGreater(end, int(1.5 * 16000))
+
+    def test_endpointer_emits_utterance_with_pre_roll_after_silence_window(self):
+        endpointer = vad.StreamingEndpointer(pre_roll_ms=300, end_silence_ms=600)
+        stream = np.concatenate([silence(1.0), tone(1.0), silence(1.0), tone(0.5)])
+        utterances = []
+        for start in range(0, stream.size, 1000):
+            utterances.extend(endpointer.feed(stream[start : start + 1000]))
+
+        self.assertEqual(len(utterances), 1)
+        utterance = utterances[0]
+        # Pre-roll before onset + the tone + the silence window that closed it.
+        self.assertGreaterEqual(utterance.size, int(1.8 * 16000))
+        self.assertLessEqual(utterance.size, int(2.1 * 16000))
+        self.assertTrue(np.all(utterance[: int(0.25 * 16000)] == 0.0))
+        self.assertTrue(endpointer.in_speech)
+
+    def test_endpointer_ignores_noise_and_short_clicks(self):
+        rng = np.random.default_rng(5)
+        endpointer = vad.StreamingEndpointer()
+        noise = rng.normal(0.0, 0.003, 3 * 16000).astype(np.float32)
+        click = np.concatenate([silence(0.5), tone(0.03, amplitude=0.8), silence(1.0)])
+        self.assertEqual(endpointer.feed(noise), [])
+        self.assertEqual(endpointer.feed(click), [])
+        self.assertFalse(endpointer.in_speech)
+
+    def test_endpointer_cuts_overlong_utterances(self):
+        endpointer = vad.StreamingEndpointer(max_utterance_seconds=2.0)
+        utterances = endpointer.feed(tone(5.0))
+        self.assertEqual(len(utterances), 2)
+        self.assertTrue(all(item.size <= int(2.0 * 16000) for item in utterances))
+
+
+    def test_split_at_pauses_cuts_long_clips_inside_pauses(self):
+        samples = np.concatenate([tone(20.0), silence(0.6), tone(15.0), silence(0.6), tone(25.0), silence(0.5), tone(12.0)])
+        bounds = vad.split_at_pauses(samples, max_chunk_seconds=28.0, min_chunk_seconds=8.0, min_silence_ms=300)
+        self.assertEqual(bounds[0][0], 0)
+        self.assertEqual(bounds[-1][1], samples.size)
+        self.assertTrue(all(end == next_start for (_, end), (next_start, _) in zip(bounds, bounds[1:])))
+        self.assertTrue(all(end - start <= 28 * 16000 for start, end in bounds))
+        # Every cut falls in one of the pauses, never inside a tone.
+        for _, end in bounds[:-1]:
+            self.assertLess(float(np.max(np.abs(samples[end - 240 : end + 240]))), 0.01)
+
+    def test_split_at_pauses_forces_cuts_without_pauses(self):
+        bounds = vad.split_at_pauses(tone(70.0), max_chunk_seconds=28.0, min_chunk_seconds=8.0, min_silence_ms=300)
+        self.assertEqual(len(bounds), 3)
+        self.assertEqual(vad.split_at_pauses(tone(5.0), 28.0, 8.0, 300), [(0, 5 * 16000)])
+
+
+if __name__ == "__main__":
+    unittest.main()
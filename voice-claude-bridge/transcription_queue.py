@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+import queue
+import threading
+from typing import Callable, Optional
+
+
+TranscriptionJob = Callable[[], str]
+TranscriptionDone = Callable[[str, Optional[BaseException]], None]
+
+
+class TranscriptionQueue:
+    """Runs transcription jobs off the PTY loop and hands results back in submission order.
+
+    `deliver` marshals a completion callback onto the loop thread (the bridge passes
+    `_call_soon_threadsafe`); with several workers, a clip that finishes early is held
+    until every clip submitted before it has been delivered.
+    """
+
+    def __init__(self, deliver: Callable[[Callable[[], None]], None], workers: int = 1):
+        self.deliver = deliver
+        self.workers = max(1, workers)
+        self._jobs: queue.SimpleQueue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+        self._next_submit = 0
+        self._next_deliver = 0
+        self._finished: dict[int, tuple[TranscriptionDone, str, Optional[BaseException]]] = {}
+        self._closed = False
+
+    @property
+    def pending(self) -> int:
+        """Clips submitted but not yet handed to `deliver`."""
+        with self._lock:
+            return self._next_submit - self._next_deliver
+
+    def submit(self, job: TranscriptionJob, on_done: TranscriptionDone) -> int:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("transcription queue is closed.")
+            sequence = self._next_submit
+            self._next_submit += 1
+            if len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._run, name="stt-worker", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+        self._jobs.put((sequence, job, on_done))
+        return sequence
+
+    def _run(self) -> None:
+        while True:
+            item = self._jobs.get()
+            if item is None:
+                return
+            sequence, job, on_done = item
+            text = ""
+            error: Optional[BaseException] = None
+            try:
+                text = job()
+            except Exception as job_error:
+                error = job_error
+            self._complete(sequence, on_done, text, error)
+
+    def _complete(self, sequence: int, on_done: TranscriptionDone, text: str, error: Optional[BaseException]) -> None:
+        with self._lock:
+            self._finished[sequence] = (on_done, text, error)
+            while self._next_deliver in self._finished:
+                ready_done, ready_text, ready_error = self._finished.pop(self._next_deliver)
+                self._next_deliver += 1
+                self.deliver(lambda done=ready_done, t=ready_text, e=ready_error: done(t, e))
+
+    def close(self) -> None:
+        """Stop accepting work; idle workers exit and a running decode is abandoned with its daemon thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            count = len(self._threads)
+        for _ in range(count):
+            self._jobs.put(None)
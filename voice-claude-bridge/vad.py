@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+from typing import Optional
+
+import numpy as np
+
+from pcm_capture import WHISPER_SAMPLE_RATE
+
+
+FRAME_MS = 30
+SILENCE_RMS_FLOOR = 0.006
+SILENCE_RMS_CEILING = 0.02
+NOISE_FLOOR_PERCENTILE = 10
+NOISE_FLOOR_FACTOR = 2.5
+SPEECH_PAD_MS = 200
+MIN_SPEECH_MS = 120
+
+
+def frame_size_for(sample_rate: int = WHISPER_SAMPLE_RATE, frame_ms: int = FRAME_MS) -> int:
+    return max(1, int(sample_rate * frame_ms / 1000))
+
+
+def frame_rms(samples: np.ndarray, frame_size: int) -> np.ndarray:
+    """Per-frame RMS energy of float32 samples; a trailing partial frame is ignored."""
+    frame_count = samples.size // frame_size
+    if frame_count <= 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = samples[: frame_count * frame_size].reshape(frame_count, frame_size)
+    return np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+
+
+def silence_threshold(rms: np.ndarray, floor: float = SILENCE_RMS_FLOOR) -> float:
+    """RMS below which a frame is silence; `floor` is the lowest it goes (lower it for quiet microphones)."""
+    if rms.size == 0:
+        return floor
+    # Track the room's noise floor, but cap it so a clip that is all speech is never all "silence".
+    noise_floor = float(np.percentile(rms, NOISE_FLOOR_PERCENTILE))
+    return min(max(SILENCE_RMS_CEILING, floor), max(floor, noise_floor * NOISE_FLOOR_FACTOR))
+
+
+def silent_runs(silent: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Return (starts, ends) frame indexes of consecutive True runs; ends are exclusive."""
+    padded = np.concatenate(([0], silent.astype(np.int8), [0]))
+    edges = np.diff(padded)
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def find_commit_boundary(
+    samples: np.ndarray,
+    min_chunk_seconds: float,
+    max_chunk_seconds: float,
+    min_silence_ms: int,
+    sample_rate: int = WHISPER_SAMPLE_RATE,
+) -> int:
+    """Pick a sample index where an in-progress capture can be cut for transcription.
+
+    Returns the middle of the latest silence gap that leaves at least `min_chunk_seconds`
+    before it, or the quietest frame once `max_chunk_seconds` is exceeded; 0 means
+    "keep accumulating".
+    """
+    frame_size = frame_size_for(sample_rate)
+    min_chunk_frames = int(min_chunk_seconds * sample_rate) // frame_size
+    max_chunk_frames = int(max_chunk_seconds * sample_rate) // frame_size
+    rms = frame_rms(samples, frame_size)
+    if rms.size <= min_chunk_frames:
+        return 0
+
+    silent = rms < silence_threshold(rms)
+    starts, ends = silent_runs(silent)
+    min_silence_frames = max(1, int(min_silence_ms / FRAME_MS))
+    qualifying = (ends - starts >= min_silence_frames) & ((starts + ends) // 2 >= min_chunk_frames)
+    if np.any(qualifying):
+        index = np.flatnonzero(qualifying)[-1]
+        return int((starts[index] + ends[index]) // 2) * frame_size
+
+    if rms.size >= max_chunk_frames > min_chunk_frames:
+        window = rms[min_chunk_frames:max_chunk_frames]
+        return int(min_chunk_frames + int(np.argmin(window))) * frame_size
+    return 0
+
+
+def split_at_pauses(
+    samples: np.ndarray,
+    max_chunk_seconds: float,
+    min_chunk_seconds: float,
+    min_silence_ms: int,
+    sample_rate: int = WHISPER_SAMPLE_RATE,
+) -> list[tuple[int, int]]:
+    """Cut a long clip into [start, end) pieces of at most `max_chunk_seconds`.
+
+    Each cut lands in the latest pause of its window (see `find_commit_boundary`), so no
+    word is split unless someone talks for `max_chunk_seconds` without pausing.
+    """
+    max_samples = int(max_chunk_seconds * sample_rate)
+    bounds = []
+    start = 0
+    while samples.size - start > max_samples:
+        cut = find_commit_boundary(
+            samples[start : start + max_samples],
+            min_chunk_seconds=min_chunk_seconds,
+            max_chunk_seconds=max_chunk_seconds,
+            min_silence_ms=min_silence_ms,
+            sample_rate=sample_rate,
+        )
+        cut = cut if cut > 0 else max_samples
+        bounds.append((start, start + cut))
+        start += cut
+    if samples.size > start:
+        bounds.append((start, samples.size))
+    return bounds
+
+
+def speech_bounds(
+    samples: np.ndarray,
+    sample_rate: int = WHISPER_SAMPLE_RATE,
+    pad_ms: int = SPEECH_PAD_MS,
+    min_speech_ms: int = MIN_SPEECH_MS,
+    rms_floor: float = SILENCE_RMS_FLOOR,
+) -> Optional[tuple[int, int]]:
+    """Sample range [start, end) around the voiced frames, padded; None when the clip has no speech.
+
+    Fewer than `min_speech_ms` of voiced frames (a hotkey click, a cough) counts as no speech.
+    """
+    frame_size = frame_size_for(sample_rate)
+    rms = frame_rms(samples, frame_size)
+    if rms.size == 0:
+        return None
+    voiced = np.flatnonzero(rms >= silence_threshold(rms, floor=rms_floor))
+    if voiced.size < max(1, int(min_speech_ms / FRAME_MS)):
+        return None
+    pad = int(sample_rate * pad_ms / 1000)
+    start = max(0, int(voiced[0]) * frame_size - pad)
+    end = min(samples.size, (int(voiced[-1]) + 1) * frame_size + pad)
+    return start, end
+
+
+class StreamingEndpointer:
+    """Splits a live PCM stream into utterances: start on speech onset, end after a silence window.
+
+    Frames below the current threshold update an exponentially weighted noise floor, so
+    the detector follows the room without a calibration step.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = WHISPER_SAMPLE_RATE,
+        pre_roll_ms: int = 300,
+        end_silence_ms: int = 700,
+        min_speech_ms: int = MIN_SPEECH_MS,
+        max_utterance_seconds: float = 30.0,
+        rms_floor: float = SILENCE_RMS_FLOOR,
+    ):
+        self.sample_rate = sample_rate
+        self.rms_floor = rms_floor
+        self.frame_size = frame_size_for(sample_rate)
+        self.onset_frames = max(1, int(min_speech_ms / FRAME_MS))
+        self.pre_roll_frames = max(0, int(pre_roll_ms / FRAME_MS))
+        self.end_frames = max(1, int(end_silence_ms / FRAME_MS))
+        self.max_frames = max(self.onset_frames + 1, int(max_utterance_seconds * 1000 / FRAME_MS))
+        self.noise_rms = rms_floor / NOISE_FLOOR_FACTOR
+        self._remainder = np.zeros(0, dtype=np.float32)
+        self._pending: list[np.ndarray] = []
+        self._utterance: list[np.ndarray] = []
+        self._onset_run = 0
+        self._silence_run = 0
+
+    @property
+    def in_speech(self) -> bool:
+        return bool(self._utterance)
+
+    def threshold(self) -> float:
+        return min(max(SILENCE_RMS_CEILING, self.rms_floor), max(self.rms_floor, self.noise_rms * NOISE_FLOOR_FACTOR))
+
+    def reset(self) -> None:
+        self._remainder = np.zeros(0, dtype=np.float32)
+        self._pending = []
+        self._utterance = []
+        self._onset_run = 0
+        self._silence_run = 0
+
+    def feed(self, samples: np.ndarray) -> list[np.ndarray]:
+        """Consume float32 samples; return every utterance that ended inside them."""
+        if self._remainder.size:
+            samples = np.concatenate((self._remainder, samples))
+        frame_count = samples.size // self.frame_size
+        self._remainder = samples[frame_count * self.frame_size :].copy()
+        if frame_count == 0:
+            return []
+        frames = samples[: frame_count * self.frame_size].reshape(frame_count, self.frame_size)
+        rms = np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+        finished = []
+        for frame, energy in zip(frames, rms):
+            utterance = self._step(frame, float(energy))
+            if utterance is not None:
+                finished.append(utterance)
+        return finished
+
+    def _step(self, frame: np.ndarray, energy: float) -> Optional[np.ndarray]:
+        voiced = energy >= self.threshold()
+        if not self._utterance:
+            self._pending.append(frame)
+            if voiced:
+                self._onset_run += 1
+            else:
+                self._onset_run = 0
+                self.noise_rms += 0.05 * (energy - self.noise_rms)
+            if self._onset_run >= self.onset_frames:
+                self._utterance = self._pending
+                self._pending = []
+                self._onset_run = 0
+                self._silence_run = 0
+            else:
+                del self._pending[: max(0, len(self._pending) - self.pre_roll_frames - self.onset_frames)]
+            return None
+
+        self._utterance.append(frame)
+        self._silence_run = 0 if voiced else self._silence_run + 1
+        if self._silence_run >= self.end_frames or len(self._utterance) >= self.max_frames:
+            utterance = np.concatenate(self._utterance)
+            self._utterance = []
+            self._silence_run = 0
+            return utterance
+        return None
@@ -17,6 +17,26 @@ from typing import Optional
 
 from audio_capture import AudioCaptureBackend, select_audio_backend
 
+# The STT daemon client and decode profiles are shared with voice-claude-bridge rather than copied.
+SHARED_STT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "voice-claude-bridge")
+if SHARED_STT_DIR not in sys.path:
+    # Appended, so this bridge's own modules (e.g. audio_capture) still win.
+    sys.path.append(SHARED_STT_DIR)
+
+from stt_client import SttServiceClient, SttServiceUnavailable, default_socket_path
+from stt_profiles import (
+    DECODE_PROFILES,
+    DEFAULT_PROFILE,
+    DEFAULT_PROFILE_NAME,
+    DEFAULT_PROFILE_RULE,
+    DecodeProfile,
+    ProfileRule,
+    get_profile,
+    normalize_profile_name,
+    parse_profile_rule,
+    select_profile,
+)
+
 
 DEFAULT_LANGUAGE = (os.environ.get("STT_LANGUAGE") or os.environ.get("LANG_CODE") or "en").strip()
 DEFAULT_MODEL = os.environ.get("STT_MODEL", "tiny.en")
@@ -25,6 +45,7 @@ DEFAULT_COMPUTE_TYPE = os.environ.get("STT_COMPUTE_TYPE", "int8")
 DEFAULT_CODEX_CMD = os.environ.get("CODEX_CMD", "codex")
 DEFAULT_RECORD_SOURCE = os.environ.get("VOICE_CODEX_RECORD_SOURCE", "").strip()
 DEFAULT_SAMPLE_RATE = int(os.environ.get("VOICE_CODEX_SAMPLE_RATE", "16000"))
+DEFAULT_STT_SERVICE = (os.environ.get("VOICE_STT_SERVICE") or "1").strip().lower() in {"1", "true", "yes", "on"}
 DEFAULT_RECORD_KEY = os.environ.get("VOICE_CODEX_RECORD_KEY", "ctrl-x").strip().lower()
 
 CTRL_R_HOTKEY_BYTE = 0x12
@@ -123,10 +144,21 @@ class RecorderState:
 
 
 class SttEngine:
-    def __init__(self, model: str, device: str, compute_type: str):
+    def __init__(
+        self,
+        model: str,
+        device: str,
+        compute_type: str,
+        service_socket: Optional[str] = None,
+        profile: str = DEFAULT_PROFILE_NAME,
+        profile_rules: Optional[list[ProfileRule]] = None,
+    ):
         self.model_name = model
         self.device = device
         self.compute_type = compute_type
+        self.profile = get_profile(profile)
+        self.profile_rules = list(profile_rules or [])
+        self._service = SttServiceClient(service_socket) if service_socket else None
         self._model = None
 
     def _ensure_model(self):
@@ -143,6 +175,7 @@ class SttEngine:
                 self.model_name,
                 device=self.device,
                 compute_type=self.compute_type,
+                **self.profile.model_kwargs(),
             )
         except Exception as error:
             if self.device.lower() == "auto" and "libcublas" in str(error).lower():
@@ -150,20 +183,40 @@ class SttEngine:
                     self.model_name,
                     device="cpu",
                     compute_type="int8",
+                    **self.profile.model_kwargs(),
                 )
             else:
                 raise
         return self._model
 
+    def _decode_profile_for(self, wav_path: str) -> DecodeProfile:
+        if not self.profile_rules:
+            return self.profile
+        try:
+            with wave.open(wav_path, "rb") as wav_file:
+                seconds = wav_file.getnframes() / float(wav_file.getframerate() or 1)
+        except (OSError, EOFError, wave.Error):
+            seconds = None
+        return select_profile(self.profile, self.profile_rules, seconds)
+
     def transcribe_file(self, wav_path: str, language: str) -> str:
+        decode = self._decode_profile_for(wav_path)
+        if self._service is not None:
+            try:
+                return self._service.transcribe(
+                    wav_path,
+                    language=language,
+                    model=self.model_name,
+                    device=self.device,
+                    compute_type=self.compute_type,
+                    profile=decode.name,
+                    model_profile=self.profile.name,
+                )
+            except SttServiceUnavailable:
+                # Shared daemon (voice-claude-bridge/stt_server.py) absent: transcribe in-process.
+                pass
         model = self._ensure_model()
-        segments, _info = model.transcribe(
-            wav_path,
-            language=language,
-            vad_filter=True,
-            beam_size=1,
-            condition_on_previous_text=False,
-        )
+        segments, _info = model.transcribe(wav_path, language=language, **decode.transcribe_kwargs())
         parts = [segment.text.strip() for segment in segments if segment.text and segment.text.strip()]
         return " ".join(parts).strip()
 
@@ -181,6 +234,9 @@ class VoiceCodexCliBridge:
         auto_send: bool,
         record_key: str,
         audio_backend: AudioCaptureBackend,
+        stt_socket: Optional[str] = None,
+        stt_profile: str = DEFAULT_PROFILE_NAME,
+        stt_profile_rules: Optional[list[ProfileRule]] = None,
     ):
         self.codex_command = codex_command
         self.language = language
@@ -189,7 +245,14 @@ class VoiceCodexCliBridge:
         self.auto_send = auto_send
         self.record_key = normalize_record_key(record_key)
         self.audio_backend = audio_backend
-        self.stt_engine = SttEngine(model=model, device=device, compute_type=compute_type)
+        self.stt_engine = SttEngine(
+            model=model,
+            device=device,
+            compute_type=compute_type,
+            service_socket=stt_socket,
+            profile=stt_profile,
+            profile_rules=stt_profile_rules,
+        )
 
         self._master_fd: Optional[int] = None
         self._proc: Optional[subprocess.Popen] = None
@@ -467,6 +530,13 @@ class VoiceCodexCliBridge:
                 sys.stdout.flush()
 
 
+def profile_rule_argument(value: str) -> list[ProfileRule]:
+    try:
+        return parse_profile_rule(value)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(str(error)) from error
+
+
 def parse_args():
     parser = argparse.ArgumentParser(
         description="Run Codex in PTY with voice hotkey support.",
@@ -478,6 +548,18 @@ def parse_args():
     parser.add_argument("--stt-model", dest="model", default=DEFAULT_MODEL, help="STT model name (for faster-whisper).")
     parser.add_argument("--stt-device", dest="device", default=DEFAULT_DEVICE, help="STT device (cpu|auto|cuda).")
     parser.add_argument("--stt-compute-type", dest="compute_type", default=DEFAULT_COMPUTE_TYPE, help="STT compute type.")
+    parser.add_argument(
+        "--stt-profile",
+        choices=sorted(DECODE_PROFILES),
+        default=normalize_profile_name(DEFAULT_PROFILE),
+        help="Decoding preset: fastest (greedy, no fallback), balanced (default) or accurate (beam search).",
+    )
+    parser.add_argument(
+        "--stt-profile-rule",
+        type=profile_rule_argument,
+        default=DEFAULT_PROFILE_RULE,
+        help="Switch profile by clip length, e.g. 'accurate<4,fastest>20' (first match wins).",
+    )
     parser.add_argument(
         "--record-source",
         default=DEFAULT_RECORD_SOURCE,
@@ -495,6 +577,17 @@ def parse_args():
         default=normalize_record_key(DEFAULT_RECORD_KEY),
         help="Hotkey used to start/stop recording.",
     )
+    parser.add_argument(
+        "--stt-service",
+        action=argparse.BooleanOptionalAction,
+        default=DEFAULT_STT_SERVICE,
+        help="Use the shared STT daemon when it is running; falls back to in-process STT.",
+    )
+    parser.add_argument(
+        "--stt-socket",
+        default=default_socket_path(),
+        help="Unix socket of the shared STT daemon.",
+    )
     args, unknown = parser.parse_known_args()
     args.codex_args = unknown
     return args
@@ -525,6 +618,9 @@ def main() -> int:
         auto_send=not args.no_auto_send,
         record_key=args.record_key,
         audio_backend=audio_backend,
+        stt_socket=args.stt_socket if args.stt_service else None,
+        stt_profile=args.stt_profile,
+        stt_profile_rules=args.stt_profile_rule,
     )
     try:
         return bridge.run()
@@ -1,5 +1,6 @@
 import importlib.util
 import os
+import sys
 import tempfile
 import unittest
 from pathlib import Path
@@ -110,6 +111,42 @@ class VoiceGeminiCliHelperTests(unittest.TestCase):
         self.assertEqual(model, "base")
         self.assertIsNone(notice)
 
+    def test_stt_modules_are_shared_with_voice_claude_bridge(self):
+        for shared in (self.cli.SttServiceClient, self.cli.DecodeProfile):
+            module_file = Path(sys.modules[shared.__module__].__file__).resolve()
+            self.assertEqual(module_file.parent.name, "voice-claude-bridge")
+
+    def test_stt_engine_falls_back_when_service_missing(self):
+        engine = self.cli.SttEngine(
+            model="tiny.en", device="cpu", compute_type="int8", service_socket="/nonexistent/voice-stt.sock"
+        )
+
+        class FakeModel:
+            def transcribe(self, audio, **kwargs):
+                _ = kwargs
+
+                class Segment:
+                    text = f" local {audio} "
+
+                return [Segment()], None
+
+        engine._model = FakeModel()
+        self.assertEqual(engine.transcribe_file("clip.wav", language="en"), "local clip.wav")
+
+    def test_stt_engine_uses_profile_decode_options(self):
+        engine = self.cli.SttEngine(model="tiny.en", device="cpu", compute_type="int8", profile="accurate")
+        calls = []
+
+        class FakeModel:
+            def transcribe(self, audio, **kwargs):
+                calls.append(kwargs)
+                return [], None
+
+        engine._model = FakeModel()
+        engine.transcribe_file("clip.wav", language="en")
+        self.assertEqual(calls[0]["beam_size"], 5)
+        self.assertTrue(calls[0]["vad_filter"])
+
     def test_transcript_draft_accumulates(self):
         backend = self.cli.select_audio_backend("linux")
         bridge = self.cli.VoiceGeminiCliBridge(